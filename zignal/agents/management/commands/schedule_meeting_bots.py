@@ -0,0 +1,51 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.tasks import schedule_meeting_bots_for_day
+
+
+class Command(BaseCommand):
+    help = ("Create Meeting BaaS bots for the day's scheduled meetings that don't have one yet, "
+            "e.g. when queueing a bot from an incoming email was lost in a restart")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--day',
+            help='Day to schedule, as YYYY-MM-DD (default: today)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Schedule once and exit',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=900,
+            help='Seconds between runs (default: 900)',
+        )
+
+    def handle(self, *args, **options):
+        day = None
+        if options['day']:
+            try:
+                day = date.fromisoformat(options['day'])
+            except ValueError:
+                raise CommandError(f"Invalid --day: {options['day']}")
+
+        while True:
+            try:
+                result = schedule_meeting_bots_for_day(day)
+                message = f"Scheduled {result['scheduled']} meeting bots"
+                if result['failed']:
+                    self.stdout.write(self.style.ERROR(f"{message}, {result['failed']} failed"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(message))
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Error scheduling meeting bots: {str(e)}'))
+
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-19 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0006_alter_agent_model'),
+        ('datasilo', '0006_datafilechunk_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetingtranscript',
+            name='data_file',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='meeting_transcript', to='datasilo.datafile'),
+        ),
+        migrations.CreateModel(
+            name='MeetingTranscriptSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_offset', models.PositiveIntegerField(help_text='Character offset of the segment in the full transcript')),
+                ('end_offset', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='agents.meetingtranscript')),
+            ],
+            options={
+                'verbose_name': 'Meeting Transcript Segment',
+                'verbose_name_plural': 'Meeting Transcript Segments',
+                'ordering': ['meeting', 'start_offset'],
+                'constraints': [models.UniqueConstraint(fields=('meeting', 'start_offset'), name='unique_segment_offset_per_meeting')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 09:26
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('agents', '0007_meetingtranscriptsegment'),
+        ('companies', '0004_company_ai_status'),
+        ('datasilo', '0009_datafile_indexes'),
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='meetingtranscript',
+            index=models.Index(fields=['company', 'created_at'], name='meeting_company_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'timestamp'], name='agentmessage_conv_ts_idx'),
+        ),
+    ]
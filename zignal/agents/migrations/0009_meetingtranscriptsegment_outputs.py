@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 09:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0008_message_and_meeting_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetingtranscriptsegment',
+            name='chunk_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='meetingtranscriptsegment',
+            name='first_chunk_index',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meetingtranscriptsegment',
+            name='message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='agents.message'),
+        ),
+    ]
@@ -98,6 +98,9 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['conversation', 'timestamp'], name='agentmessage_conv_ts_idx'),
+        ]
 
 
 class MeetingTranscript(models.Model):
@@ -173,10 +176,62 @@ class MeetingTranscript(models.Model):
         blank=True
     )
     
+    # Data silo file the transcript is chunked and embedded into
+    data_file = models.OneToOneField(
+        'datasilo.DataFile',
+        on_delete=models.SET_NULL,
+        related_name='meeting_transcript',
+        null=True,
+        blank=True
+    )
+    
     class Meta:
         ordering = ['-scheduled_time']
         verbose_name = "Meeting Transcript"
         verbose_name_plural = "Meeting Transcripts"
+        indexes = [
+            models.Index(fields=['company', 'created_at'], name='meeting_company_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.meeting_title} ({self.get_platform_display()}) - {self.get_status_display()}"
+
+
+class MeetingTranscriptSegment(models.Model):
+    """
+    An append-only piece of a meeting transcript. Each transcription event
+    stores only the text that was new since the previous event. A corrected
+    full transcript replaces the segments from the first changed character
+    on, together with the conversation message and embedded chunks they
+    produced.
+    """
+    meeting = models.ForeignKey(
+        MeetingTranscript,
+        on_delete=models.CASCADE,
+        related_name='segments'
+    )
+    start_offset = models.PositiveIntegerField(help_text="Character offset of the segment in the full transcript")
+    end_offset = models.PositiveIntegerField()
+    text = models.TextField()
+    # What the segment produced, so a correction can remove it
+    message = models.ForeignKey(
+        Message,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+        blank=True
+    )
+    first_chunk_index = models.PositiveIntegerField(blank=True, null=True)
+    chunk_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['meeting', 'start_offset']
+        verbose_name = "Meeting Transcript Segment"
+        verbose_name_plural = "Meeting Transcript Segments"
+        constraints = [
+            models.UniqueConstraint(fields=['meeting', 'start_offset'], name='unique_segment_offset_per_meeting')
+        ]
+    
+    def __str__(self):
+        return f"{self.meeting.meeting_title} [{self.start_offset}:{self.end_offset}]"
@@ -4,15 +4,119 @@ Service for integrating with Meeting BaaS
 import os
 import json
 import logging
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
 from django.urls import reverse
+from django.core.files.base import ContentFile
+from django.db import transaction
 from django.utils import timezone
-from ..models import Agent, Conversation, Message, MeetingTranscript
+from core.openai_scheduler import BATCH
+from core.profiling import track_external
+from ..models import Agent, Conversation, Message, MeetingTranscript, MeetingTranscriptSegment
 
 logger = logging.getLogger(__name__)
 
+SUMMARY_PROMPT = (
+    "Please summarize the following meeting transcript. Include main topics discussed, "
+    "key decisions, action items, and any deadlines mentioned:"
+)
+
+PARTIAL_SUMMARY_PROMPT = (
+    "The following is one part of a longer meeting transcript. Write concise notes on this part: "
+    "topics discussed, decisions, action items with owners, and any deadlines mentioned. "
+    "Do not add an introduction or conclusion:"
+)
+
+COMBINE_NOTES_PROMPT = (
+    "The following are notes from consecutive parts of one meeting. Merge them into a single set of "
+    "concise notes, keeping every decision, action item and deadline:"
+)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling Meeting BaaS while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Fail fast after repeated connection failures or server errors
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail immediately. Once reset_timeout seconds have passed a single trial
+    call is let through; success closes the circuit, failure re-opens it.
+    """
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+    
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_progress:
+                return False
+            self._trial_in_progress = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_progress = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+_session = None
+_session_lock = threading.Lock()
+_circuit_breaker = CircuitBreaker(
+    failure_threshold=getattr(settings, 'MEETINGBAAS_CIRCUIT_FAILURE_THRESHOLD', 5),
+    reset_timeout=getattr(settings, 'MEETINGBAAS_CIRCUIT_RESET_TIMEOUT', 30)
+)
+
+
+def get_session():
+    """
+    Shared, connection-pooled session for Meeting BaaS calls
+
+    Only idempotent methods are retried (with jittered exponential backoff), so
+    a timed-out bot creation is never sent twice.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                backoff_jitter=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
 class MeetingBaaSService:
     """
     Service for interacting with Meeting BaaS API
@@ -26,6 +130,44 @@ class MeetingBaaSService:
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
         }
+        self.timeout = (
+            getattr(settings, 'MEETINGBAAS_CONNECT_TIMEOUT', 3.05),
+            getattr(settings, 'MEETINGBAAS_READ_TIMEOUT', 15)
+        )
+    
+    def _request(self, method, path, **kwargs):
+        """
+        Send a request to the Meeting BaaS API through the shared session
+        
+        Raises:
+            CircuitOpenError: If the API has been failing and the circuit is open
+            requests.exceptions.RequestException: On connection errors, timeouts
+                or error responses
+        """
+        if not _circuit_breaker.allow():
+            raise CircuitOpenError("Meeting BaaS is unavailable (circuit open), not sending request")
+        
+        try:
+            with track_external('meetingbaas'):
+                response = get_session().request(
+                    method,
+                    f"{self.api_url}{path}",
+                    headers=self.headers,
+                    timeout=self.timeout,
+                    **kwargs
+                )
+        except requests.exceptions.RequestException:
+            # Any failure to get a response also ends a trial call, so the circuit can't stay stuck half-open
+            _circuit_breaker.record_failure()
+            raise
+        
+        if response.status_code >= 500:
+            _circuit_breaker.record_failure()
+        else:
+            _circuit_breaker.record_success()
+        
+        response.raise_for_status()
+        return response
     
     def create_bot(self, meeting_transcript, host_url):
         """
@@ -38,6 +180,65 @@ class MeetingBaaSService:
         Returns:
             dict: Response from the API
         """
+        try:
+            data = self._request('POST', '/bots', json=self._bot_config(meeting_transcript, host_url)).json()
+            
+            # Update the meeting transcript with the bot ID and webhook ID
+            self._save_bot(meeting_transcript, data)
+            
+            return data
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error creating Meeting BaaS bot: {str(e)}")
+            meeting_transcript.status = 'failed'
+            meeting_transcript.save()
+            raise
+    
+    def schedule_bots(self, meeting_transcripts, host_url, max_workers=None):
+        """
+        Create bots for many meetings at once, e.g. all of a day's meetings
+        
+        API calls run concurrently over the shared session; database updates
+        happen on the calling thread. Once the circuit breaker opens, the
+        remaining meetings fail fast instead of waiting on timeouts.
+        
+        Args:
+            meeting_transcripts: Iterable of MeetingTranscript objects
+            host_url: Host URL for webhook callbacks
+            max_workers: Maximum concurrent API calls
+        
+        Returns:
+            dict: Meeting ID to True on success or the error message
+        """
+        meeting_transcripts = list(meeting_transcripts)
+        if not meeting_transcripts:
+            return {}
+        
+        def post_bot(meeting_transcript):
+            try:
+                return self._request('POST', '/bots', json=self._bot_config(meeting_transcript, host_url)).json()
+            except requests.exceptions.RequestException as e:
+                return e
+        
+        max_workers = min(max_workers or getattr(settings, 'MEETINGBAAS_BULK_CONCURRENCY', 4), len(meeting_transcripts))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            responses = list(executor.map(post_bot, meeting_transcripts))
+        
+        results = {}
+        for meeting_transcript, response in zip(meeting_transcripts, responses):
+            if isinstance(response, Exception):
+                logger.error(f"Error creating Meeting BaaS bot for meeting {meeting_transcript.id}: {str(response)}")
+                meeting_transcript.status = 'failed'
+                meeting_transcript.save(update_fields=['status', 'updated_at'])
+                results[meeting_transcript.id] = str(response)
+            else:
+                self._save_bot(meeting_transcript, response)
+                results[meeting_transcript.id] = True
+        
+        logger.info(f"Scheduled {sum(1 for r in results.values() if r is True)} of {len(results)} meeting bots")
+        return results
+    
+    def _bot_config(self, meeting_transcript, host_url):
+        """Bot configuration payload for a meeting"""
         webhook_url = f"{host_url}{reverse('agents:meeting_webhook', args=[meeting_transcript.id])}"
         
         # Prepare bot configuration based on platform
@@ -58,28 +259,14 @@ class MeetingBaaSService:
             # Google Meet specific configuration
             pass
         
-        try:
-            response = requests.post(
-                f"{self.api_url}/bots",
-                headers=self.headers,
-                json=bot_config
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Update the meeting transcript with the bot ID and webhook ID
-            meeting_transcript.meetingbaas_bot_id = data.get('botId')
-            meeting_transcript.meetingbaas_webhook_id = data.get('webhookId')
-            meeting_transcript.status = 'scheduled'
-            meeting_transcript.save()
-            
-            return data
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error creating Meeting BaaS bot: {str(e)}")
-            meeting_transcript.status = 'failed'
-            meeting_transcript.save()
-            raise
+        return bot_config
+    
+    def _save_bot(self, meeting_transcript, data):
+        """Record a created bot on the meeting"""
+        meeting_transcript.meetingbaas_bot_id = data.get('botId')
+        meeting_transcript.meetingbaas_webhook_id = data.get('webhookId')
+        meeting_transcript.status = 'scheduled'
+        meeting_transcript.save()
     
     def cancel_bot(self, meeting_transcript):
         """
@@ -96,11 +283,7 @@ class MeetingBaaSService:
             return False
         
         try:
-            response = requests.delete(
-                f"{self.api_url}/bots/{meeting_transcript.meetingbaas_bot_id}",
-                headers=self.headers
-            )
-            response.raise_for_status()
+            self._request('DELETE', f"/bots/{meeting_transcript.meetingbaas_bot_id}")
             
             # Update meeting transcript status
             meeting_transcript.status = 'cancelled'
@@ -115,6 +298,15 @@ class MeetingBaaSService:
         """
         Process webhook data from Meeting BaaS
         
+        Transcription events carry only the text that is new, unless they set
+        "full_transcript" to true; the transcript sent with meeting.ended is
+        always the full one. Only a full transcript may correct earlier text.
+        
+        Events for a meeting may be processed concurrently and out of order.
+        Transcript appends and the end of the meeting take the meeting's row
+        lock, so the transcript file and summary are built from every segment
+        received before the end; segments that arrive after it update them.
+        
         Args:
             meeting_transcript: MeetingTranscript object
             webhook_data: Dict containing webhook data
@@ -125,25 +317,29 @@ class MeetingBaaSService:
         event_type = webhook_data.get('event')
         
         if event_type == 'meeting.started':
-            meeting_transcript.status = 'in_progress'
-            meeting_transcript.save()
+            # Don't move a meeting that has already ended (late delivery) back to in progress
+            MeetingTranscript.objects.filter(id=meeting_transcript.id, status='scheduled').update(
+                status='in_progress', updated_at=timezone.now()
+            )
             return True
         
         elif event_type == 'meeting.ended':
-            # Meeting ended, update status
+            # If there's a transcript in the webhook data, store whatever was not
+            # already received through transcription events
+            if 'transcript' in webhook_data:
+                self._ingest_transcript(meeting_transcript, webhook_data.get('transcript') or '', full=True)
+            
+            with transaction.atomic():
+                # Waits for transcript appends still in flight, which hold this lock
+                latest = MeetingTranscript.objects.select_for_update().select_related('data_file').get(
+                    id=meeting_transcript.id
+                )
+                MeetingTranscript.objects.filter(id=meeting_transcript.id).update(status='completed')
             meeting_transcript.status = 'completed'
+            meeting_transcript.transcript_raw = latest.transcript_raw
+            meeting_transcript.data_file = latest.data_file
             
-            # If there's a transcript in the webhook data
-            if 'transcript' in webhook_data:
-                transcript_text = webhook_data.get('transcript', '')
-                meeting_transcript.transcript_raw = transcript_text
-                
-                # Create or update an agent conversation with the transcript
-                self._create_conversation_from_transcript(meeting_transcript, transcript_text)
-                
-                # Generate a summary if configured
-                if hasattr(settings, 'GENERATE_MEETING_SUMMARIES') and settings.GENERATE_MEETING_SUMMARIES:
-                    self._generate_summary(meeting_transcript)
+            self._complete_transcript(meeting_transcript)
             
             # If recording URL is available
             if 'recordingUrl' in webhook_data:
@@ -154,17 +350,20 @@ class MeetingBaaSService:
                 duration_seconds = webhook_data.get('durationSeconds', 0)
                 meeting_transcript.duration_minutes = int(duration_seconds / 60)
             
-            meeting_transcript.save()
+            meeting_transcript.save(update_fields=['status', 'recording_url', 'duration_minutes',
+                                                   'transcript_summary', 'updated_at'])
             return True
             
         elif event_type == 'transcription.created':
-            # New transcription available
-            transcript_text = webhook_data.get('transcript', '')
-            meeting_transcript.transcript_raw = transcript_text
-            meeting_transcript.save()
-            
-            # Create a conversation from the transcript
-            self._create_conversation_from_transcript(meeting_transcript, transcript_text)
+            # New transcription available; only the new part is stored
+            segment = self._ingest_transcript(
+                meeting_transcript,
+                webhook_data.get('transcript') or '',
+                full=bool(webhook_data.get('full_transcript'))
+            )
+            if segment is not None and meeting_transcript.status == 'completed':
+                # Delivered after meeting.ended was processed
+                self._complete_transcript(meeting_transcript)
             return True
             
         elif event_type == 'error':
@@ -173,20 +372,209 @@ class MeetingBaaSService:
             logger.error(f"Meeting BaaS error: {error_message}")
             
             meeting_transcript.status = 'failed'
-            meeting_transcript.save()
+            meeting_transcript.save(update_fields=['status', 'updated_at'])
             return False
             
         # Unknown event type
         logger.warning(f"Unknown webhook event type: {event_type}")
         return False
     
-    def _create_conversation_from_transcript(self, meeting_transcript, transcript_text):
+    def _complete_transcript(self, meeting_transcript):
+        """Write the transcript file and, if configured, the summary of an ended meeting"""
+        if not meeting_transcript.transcript_raw:
+            return
+        
+        self._finalise_transcript_file(meeting_transcript)
+        
+        # Generate a summary if configured
+        if hasattr(settings, 'GENERATE_MEETING_SUMMARIES') and settings.GENERATE_MEETING_SUMMARIES:
+            self._generate_summary(meeting_transcript)
+    
+    def _ingest_transcript(self, meeting_transcript, transcript_text, full=False):
         """
-        Create or update a conversation from the transcript
+        Store the new part of a transcript as a segment and pass it on to the
+        meeting conversation and the data silo
+        
+        What the segment produced is recorded on it. If a correction replaced
+        the segment meanwhile, that output is removed again here.
         
         Args:
             meeting_transcript: MeetingTranscript object
-            transcript_text: String containing the transcript
+            transcript_text: Transcript text from the webhook
+            full: Whether the text is the full transcript so far
+        
+        Returns:
+            MeetingTranscriptSegment: The new segment, or None if nothing was new
+        """
+        segment = self._append_segment(meeting_transcript, str(transcript_text), full=full)
+        if segment is None:
+            return None
+        
+        message = self._create_conversation_from_transcript(meeting_transcript, segment)
+        if not MeetingTranscriptSegment.objects.filter(id=segment.id).update(message=message):
+            message.delete()
+        
+        if meeting_transcript.data_file_id and getattr(settings, 'GENERATE_FILE_EMBEDDINGS', False):
+            from datasilo.services.embedding_service import EmbeddingService
+            result = EmbeddingService().append_text(meeting_transcript.data_file, segment.text)
+            if result.get('success'):
+                segment.first_chunk_index = result['start_index']
+                segment.chunk_count = result['chunk_count']
+                if not MeetingTranscriptSegment.objects.filter(id=segment.id).update(
+                    first_chunk_index=segment.first_chunk_index, chunk_count=segment.chunk_count
+                ):
+                    self._delete_segment_chunks(meeting_transcript.data_file_id, [segment])
+        
+        return segment
+
+    def _append_segment(self, meeting_transcript, transcript_text, full=False):
+        """
+        Work out which part of a transcript is new and append it as a segment
+        
+        A transcript that starts with what we already have only adds its tail,
+        and one we already end with (or a full one we start with) is a
+        replayed event. Otherwise new text is
+        appended, unless it is a full transcript: then the provider corrected
+        earlier text, the stored transcript is replaced by it, and the segments
+        from the first changed character on are replaced by one new segment,
+        together with their conversation messages and embedded chunks. The
+        meeting row is locked so concurrent events are applied in order.
+        
+        Args:
+            meeting_transcript: MeetingTranscript object
+            transcript_text: Transcript text from the webhook
+            full: Whether the text is the full transcript so far
+        
+        Returns:
+            MeetingTranscriptSegment: The new segment, or None if nothing was new
+        """
+        with transaction.atomic():
+            meeting = MeetingTranscript.objects.select_for_update().get(id=meeting_transcript.id)
+            current = meeting.transcript_raw or ''
+            
+            if transcript_text.startswith(current):
+                start, transcript = len(current), transcript_text
+            elif current.endswith(transcript_text) or (full and current.startswith(transcript_text)):
+                # Replayed event, or a full transcript older than what we have
+                start, transcript = len(current), current
+            elif full:
+                # Earlier text was corrected; replace every segment from the first difference on
+                common = len(os.path.commonprefix([current, transcript_text]))
+                superseded = list(meeting.segments.filter(end_offset__gt=common))
+                start = min([common] + [superseded_segment.start_offset for superseded_segment in superseded])
+                transcript = transcript_text
+                self._remove_segments(meeting, superseded)
+            else:
+                start = len(current)
+                transcript = current + (transcript_text if not current else f"\n{transcript_text}")
+            delta = transcript[start:]
+            
+            meeting_transcript.status = meeting.status
+            if not delta.strip() or meeting.segments.filter(start_offset=start).exists():
+                if transcript != current:
+                    # A correction that only removed text
+                    MeetingTranscript.objects.filter(id=meeting.id).update(
+                        transcript_raw=transcript, updated_at=timezone.now()
+                    )
+                    meeting_transcript.transcript_raw = transcript
+                return None
+            
+            segment = MeetingTranscriptSegment.objects.create(
+                meeting=meeting,
+                start_offset=start,
+                end_offset=len(transcript),
+                text=delta
+            )
+            
+            updates = {'transcript_raw': transcript, 'updated_at': timezone.now()}
+            if meeting.data_file_id is None:
+                data_file = self._create_transcript_file(meeting)
+                if data_file:
+                    updates['data_file'] = data_file
+            MeetingTranscript.objects.filter(id=meeting.id).update(**updates)
+        
+        for field, value in updates.items():
+            setattr(meeting_transcript, field, value)
+        return segment
+    
+    def _remove_segments(self, meeting, segments):
+        """Delete superseded segments with their conversation messages and embedded chunks"""
+        if not segments:
+            return
+        Message.objects.filter(id__in=[segment.message_id for segment in segments if segment.message_id]).delete()
+        self._delete_segment_chunks(meeting.data_file_id, segments)
+        MeetingTranscriptSegment.objects.filter(id__in=[segment.id for segment in segments]).delete()
+    
+    @staticmethod
+    def _delete_segment_chunks(data_file_id, segments):
+        """Delete the chunks segments were embedded into"""
+        from django.db.models import Q
+        from datasilo.models import DataFileChunk
+        
+        ranges = Q()
+        for segment in segments:
+            if segment.first_chunk_index is not None and segment.chunk_count:
+                ranges |= Q(chunk_index__gte=segment.first_chunk_index,
+                            chunk_index__lt=segment.first_chunk_index + segment.chunk_count)
+        if data_file_id and ranges:
+            DataFileChunk.objects.filter(ranges, data_file_id=data_file_id).delete()
+    
+    def _create_transcript_file(self, meeting_transcript):
+        """
+        Create the data silo file that transcript segments are embedded into,
+        in the meeting's project silo or else its company silo
+        
+        Returns:
+            DataFile: The new file, or None if the meeting has no silo
+        """
+        from datasilo.models import DataSilo, DataFile
+        
+        silo = None
+        if meeting_transcript.project_id:
+            silo = DataSilo.objects.filter(project_id=meeting_transcript.project_id).first()
+        if silo is None and meeting_transcript.company_id:
+            silo = DataSilo.objects.filter(company_id=meeting_transcript.company_id).first()
+        if silo is None:
+            return None
+        
+        # The full content is written once the meeting ends; chunks arrive before that
+        data_file = DataFile(
+            name=f"Meeting transcript - {meeting_transcript.meeting_title}",
+            description=f"Transcript of {meeting_transcript.get_platform_display()} meeting on "
+                        f"{meeting_transcript.scheduled_time.strftime('%Y-%m-%d %H:%M')}",
+            data_silo=silo,
+            file_type='document',
+            content_type='text/plain',
+            status='processing',
+            vector_store_status='skipped',
+            uploaded_by=meeting_transcript.scheduled_by
+        )
+        data_file.file.save(f"{meeting_transcript.meeting_id}.txt", ContentFile(b''), save=False)
+        data_file.save()
+        return data_file
+    
+    def _finalise_transcript_file(self, meeting_transcript):
+        """Write the complete transcript to the meeting's data silo file"""
+        data_file = meeting_transcript.data_file
+        if not data_file or not meeting_transcript.transcript_raw:
+            return
+        
+        content = meeting_transcript.transcript_raw.encode('utf-8')
+        data_file.file.save(f"{meeting_transcript.meeting_id}.txt", ContentFile(content), save=False)
+        data_file.size = len(content)
+        data_file.status = 'processed'
+        data_file.save()
+    
+    def _create_conversation_from_transcript(self, meeting_transcript, segment):
+        """
+        Create or update a conversation from a new transcript segment
+        
+        Args:
+            meeting_transcript: MeetingTranscript object
+            segment: MeetingTranscriptSegment with the new transcript text
+        
+        Returns:
+            Message: The message holding the segment
         """
         # If conversation already exists, use it, otherwise create one
         conversation = meeting_transcript.conversation
@@ -219,63 +607,79 @@ class MeetingBaaSService:
             
             # Associate the conversation with the meeting transcript
             meeting_transcript.conversation = conversation
-            meeting_transcript.save()
+            meeting_transcript.save(update_fields=['conversation', 'updated_at'])
         
-        # Add the transcript as a system message in the conversation
-        Message.objects.create(
+        # Add the new part of the transcript as a system message in the conversation
+        if segment.start_offset == 0:
+            content = (f"Transcript from meeting \"{meeting_transcript.meeting_title}\" on "
+                       f"{meeting_transcript.scheduled_time.strftime('%Y-%m-%d %H:%M')}:\n\n{segment.text}")
+        else:
+            content = f"Transcript continued:\n\n{segment.text}"
+        return Message.objects.create(
             conversation=conversation,
             role='system',
-            content=f"Transcript from meeting \"{meeting_transcript.meeting_title}\" on "
-                   f"{meeting_transcript.scheduled_time.strftime('%Y-%m-%d %H:%M')}:\n\n{transcript_text}"
+            content=content
         )
     
     def _generate_summary(self, meeting_transcript):
         """
         Generate a summary of the meeting transcript using AI
         
+        Long transcripts are split into chunks that are summarised concurrently
+        (map), and the partial summaries are then combined (reduce), repeating
+        the reduce step until everything fits in one request.
+        
         Args:
             meeting_transcript: MeetingTranscript object
         """
         from .openai_service import OpenAIService
+        from datasilo.services.embedding_service import chunk_text
         
         if not meeting_transcript.transcript_raw:
             logger.warning("Cannot generate summary: No transcript available")
             return
         
         try:
-            openai_service = OpenAIService()
-            
-            # Prepare prompt for summarization
-            prompt = (
-                f"Please summarize the following meeting transcript. Include main topics discussed, "
-                f"key decisions, action items, and any deadlines mentioned:\n\n"
-                f"{meeting_transcript.transcript_raw}"
-            )
-            
-            # Create a temporary conversation for the summary generation
-            conversation = Conversation.objects.create(
-                agent=meeting_transcript.conversation.agent,
-                user=meeting_transcript.scheduled_by,
-                title=f"Summary: {meeting_transcript.meeting_title}"
-            )
+            openai_service = OpenAIService(lane=BATCH, feature='summary', company=meeting_transcript.company_id)
+            chunk_size = getattr(settings, 'MEETING_SUMMARY_CHUNK_SIZE', 12000)
+            chunks = chunk_text(str(meeting_transcript.transcript_raw), chunk_size=chunk_size, overlap=200)
             
-            # Add the prompt as a user message
-            Message.objects.create(
-                conversation=conversation,
-                role='user',
-                content=prompt
-            )
-            
-            # Get a response from OpenAI
-            response = openai_service.chat_completion(conversation)
+            if len(chunks) == 1:
+                summary = self._summarise(openai_service, SUMMARY_PROMPT, chunks[0])
+            else:
+                # Map: summarise each part of the meeting independently
+                notes = self._summarise_all(
+                    openai_service, PARTIAL_SUMMARY_PROMPT,
+                    [f"Part {index} of {len(chunks)}:\n\n{chunk}" for index, chunk in enumerate(chunks, start=1)]
+                )
+                
+                # Reduce: combine the notes, in groups if they are still too long for one request
+                for _ in range(3):
+                    if len('\n\n'.join(notes)) <= chunk_size:
+                        break
+                    groups = chunk_text('\n\n'.join(notes), chunk_size=chunk_size, overlap=0)
+                    notes = self._summarise_all(openai_service, COMBINE_NOTES_PROMPT, groups)
+                
+                summary = self._summarise(openai_service, SUMMARY_PROMPT, '\n\n'.join(notes))
             
             # Save the summary
-            meeting_transcript.transcript_summary = response['response']
-            meeting_transcript.save()
-            
-            # Clean up the temporary conversation
-            conversation.delete()
+            meeting_transcript.transcript_summary = summary
+            meeting_transcript.save(update_fields=['transcript_summary', 'updated_at'])
             
         except Exception as e:
             logger.error(f"Error generating meeting summary: {str(e)}")
-            # Don't fail if summary generation fails 
\ No newline at end of file
+            # Don't fail if summary generation fails
+    
+    def _summarise(self, openai_service, instructions, text):
+        """Run a single summarisation request"""
+        result = openai_service.completion([
+            {"role": "system", "content": "You are a helpful assistant that summarises meeting transcripts accurately."},
+            {"role": "user", "content": f"{instructions}\n\n{text}"}
+        ])
+        return result['response']
+    
+    def _summarise_all(self, openai_service, instructions, texts):
+        """Summarise several texts concurrently, keeping their order"""
+        max_workers = min(getattr(settings, 'MEETING_SUMMARY_CONCURRENCY', 4), len(texts))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda text: self._summarise(openai_service, instructions, text), texts))
@@ -5,8 +5,9 @@ import os
 import logging
 from typing import List, Dict, Any, Optional, Generator
 import time
-from openai import OpenAI
 from django.conf import settings
+from core.llm_usage import track_llm_call
+from core.openai_scheduler import get_openai_client, INTERACTIVE
 from ..models import Agent, Conversation, Message
 
 logger = logging.getLogger(__name__)
@@ -16,8 +17,11 @@ class OpenAIService:
     Service for interacting with the OpenAI API
     """
     
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(self, lane=INTERACTIVE, feature='chat', company=None):
+        self.client = get_openai_client(lane)
+        # Usage attribution for calls made by this service (see core.llm_usage)
+        self.feature = feature
+        self.company = company
         self.default_model = settings.OPENAI_MODEL
         self.default_embeddings_model = settings.OPENAI_EMBEDDINGS_MODEL
     
@@ -26,15 +30,75 @@ class OpenAIService:
         Generate embeddings for the given text
         """
         try:
-            response = self.client.embeddings.create(
-                model=self.default_embeddings_model,
-                input=text
-            )
+            with track_llm_call(self.feature, self.company):
+                response = self.client.embeddings.create(
+                    model=self.default_embeddings_model,
+                    input=text
+                )
             return response.data[0].embedding
         except Exception as e:
             logger.error(f"Error generating embeddings: {str(e)}")
             raise
-    
+
+    def generate_embeddings_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Generate embeddings for many texts, sending them in batches
+
+        Returns one embedding per input text, in the same order
+        """
+        if batch_size is None:
+            batch_size = getattr(settings, 'EMBEDDING_BATCH_SIZE', 256)
+
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            try:
+                with track_llm_call(self.feature, self.company):
+                    response = self.client.embeddings.create(
+                        model=self.default_embeddings_model,
+                        input=batch
+                    )
+            except Exception as e:
+                logger.error(f"Error generating embeddings for batch starting at {start}: {str(e)}")
+                raise
+
+            # The API does not guarantee ordering, so sort by the returned index
+            ordered = sorted(response.data, key=lambda item: item.index)
+            embeddings.extend(item.embedding for item in ordered)
+
+        return embeddings
+
+    def completion(self,
+                   messages: List[Dict[str, str]],
+                   model: Optional[str] = None,
+                   temperature: float = 0.3,
+                   max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Generate a one-off chat completion without storing a conversation
+
+        Returns the same shape as chat_completion
+        """
+        try:
+            with track_llm_call(self.feature, self.company):
+                response = self.client.chat.completions.create(
+                    model=model or self.default_model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+        except Exception as e:
+            logger.error(f"Error in completion: {str(e)}")
+            raise
+
+        return {
+            "response": response.choices[0].message.content,
+            "usage": {
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "total_tokens": response.usage.total_tokens
+            }
+        }
+
     def prepare_messages(self, conversation: Conversation) -> List[Dict[str, str]]:
         """
         Prepare the message format required by OpenAI API from a conversation
@@ -83,12 +147,13 @@ class OpenAIService:
         
         try:
             agent = conversation.agent
-            response = self.client.chat.completions.create(
-                model=agent.model,
-                messages=messages,
-                temperature=agent.temperature,
-                max_tokens=agent.max_tokens
-            )
+            with track_llm_call(self.feature, self.company or agent.company_id):
+                response = self.client.chat.completions.create(
+                    model=agent.model,
+                    messages=messages,
+                    temperature=agent.temperature,
+                    max_tokens=agent.max_tokens
+                )
             
             # Save assistant response to conversation
             assistant_content = response.choices[0].message.content
@@ -141,13 +206,16 @@ class OpenAIService:
         
         try:
             agent = conversation.agent
-            response = self.client.chat.completions.create(
-                model=agent.model,
-                messages=messages,
-                temperature=agent.temperature,
-                max_tokens=agent.max_tokens,
-                stream=True
-            )
+            # The stream is measured until it is fully read, after the block exits
+            with track_llm_call(self.feature, self.company or agent.company_id):
+                response = self.client.chat.completions.create(
+                    model=agent.model,
+                    messages=messages,
+                    temperature=agent.temperature,
+                    max_tokens=agent.max_tokens,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
             
             # Collect the full response while yielding chunks
             full_response = ""
@@ -284,23 +352,41 @@ class OpenAIService:
             logger.error(f"Error adding message to thread: {str(e)}")
             raise
     
-    def run_assistant(self, conversation: Conversation) -> Dict[str, Any]:
+    def run_assistant(self, conversation: Conversation, content: Optional[str] = None) -> Dict[str, Any]:
         """
         Run the assistant on a thread
         
+        A new user message is sent with the run request rather than added to
+        the thread first, and a conversation without a thread gets its thread
+        and run from a single create-and-run call. The message is not saved to
+        our database here; callers save it together with the reply.
+        
         Returns the Run object
         """
-        if not conversation.thread_id:
-            raise ValueError("Conversation has no thread_id")
-            
         if not conversation.agent.assistant_id:
             raise ValueError("Agent has no assistant_id")
+        
+        messages = [{"role": "user", "content": content}] if content else []
             
         try:
+            if not conversation.thread_id:
+                # Create the thread and the run in one call
+                run = self.client.beta.threads.create_and_run(
+                    assistant_id=conversation.agent.assistant_id,
+                    thread={"messages": messages}
+                )
+                conversation.thread_id = run.thread_id
+                conversation.save(update_fields=['thread_id', 'updated_at'])
+                return run
+            
             # Create a run
+            run_args = {}
+            if messages:
+                run_args['additional_messages'] = messages
             run = self.client.beta.threads.runs.create(
                 thread_id=conversation.thread_id,
-                assistant_id=conversation.agent.assistant_id
+                assistant_id=conversation.agent.assistant_id,
+                **run_args
             )
             
             return run
@@ -340,6 +426,16 @@ class OpenAIService:
             # Wait before polling again
             time.sleep(1)
     
+    def _save_turn(self, conversation: Conversation, user_content: Optional[str], role: str, content: str) -> None:
+        """
+        Save a user message and the message that answered it in one insert
+        """
+        messages = []
+        if user_content:
+            messages.append(Message(conversation=conversation, role='user', content=user_content))
+        messages.append(Message(conversation=conversation, role=role, content=content))
+        Message.objects.bulk_create(messages)
+    
     def get_thread_messages(self, thread_id: str) -> List[Dict[str, Any]]:
         """
         Get messages from a thread
@@ -371,20 +467,12 @@ class OpenAIService:
                 agent.assistant_id = self.create_assistant(agent)
                 agent.save()
             
-            # Ensure the conversation has a thread_id
-            if not conversation.thread_id:
-                conversation.thread_id = self.create_thread(conversation)
-                conversation.save()
-            
-            # Add the user message to the thread
-            if new_message_content:
-                self.add_message_to_thread(conversation, new_message_content, 'user')
-            
-            # Run the assistant
-            run = self.run_assistant(conversation)
-            
-            # Wait for the run to complete
-            self.wait_for_run_completion(conversation.thread_id, run.id)
+            # Send the user message with the run (creating the thread if needed)
+            # and wait for it to complete
+            with track_llm_call(self.feature, self.company or agent.company_id) as usage_call:
+                run = self.run_assistant(conversation, new_message_content)
+                run = self.wait_for_run_completion(conversation.thread_id, run.id)
+                usage_call.set_usage(run.usage, run.model)
             
             # Get the latest message from the assistant
             messages = self.get_thread_messages(conversation.thread_id)
@@ -396,19 +484,15 @@ class OpenAIService:
                     if message.content and len(message.content) > 0:
                         assistant_content = message.content[0].text.value
                         
-                        # Save to our database
-                        Message.objects.create(
-                            conversation=conversation,
-                            role='assistant',
-                            content=assistant_content
-                        )
+                        # Save the user message and the reply to our database together
+                        self._save_turn(conversation, new_message_content, 'assistant', assistant_content)
                         
                         return {
                             "response": assistant_content,
                             "usage": {
-                                "prompt_tokens": 0,  # Not available in Assistants API
-                                "completion_tokens": 0,
-                                "total_tokens": 0
+                                "prompt_tokens": run.usage.prompt_tokens if run.usage else 0,
+                                "completion_tokens": run.usage.completion_tokens if run.usage else 0,
+                                "total_tokens": run.usage.total_tokens if run.usage else 0
                             }
                         }
             
@@ -416,12 +500,8 @@ class OpenAIService:
             
         except Exception as e:
             logger.error(f"Error in assistant completion: {str(e)}")
-            # Save error message
-            Message.objects.create(
-                conversation=conversation,
-                role='system',
-                content=f"Error: {str(e)}"
-            )
+            # Save the user message and the error message
+            self._save_turn(conversation, new_message_content, 'system', f"Error: {str(e)}")
             raise
     
     def streaming_assistant_completion(self, 
@@ -440,22 +520,15 @@ class OpenAIService:
                 agent.assistant_id = self.create_assistant(agent)
                 agent.save()
             
-            # Ensure the conversation has a thread_id
-            if not conversation.thread_id:
-                conversation.thread_id = self.create_thread(conversation)
-                conversation.save()
-            
-            # Add the user message to the thread
-            self.add_message_to_thread(conversation, new_message_content, 'user')
-            
             # Let the user know we're processing
             yield "Processing your request... "
             
-            # Run the assistant
-            run = self.run_assistant(conversation)
-            
-            # Wait for the run to complete
-            self.wait_for_run_completion(conversation.thread_id, run.id)
+            # Send the user message with the run (creating the thread if needed)
+            # and wait for it to complete
+            with track_llm_call(self.feature, self.company or agent.company_id) as usage_call:
+                run = self.run_assistant(conversation, new_message_content)
+                run = self.wait_for_run_completion(conversation.thread_id, run.id)
+                usage_call.set_usage(run.usage, run.model)
             
             # Get the latest message from the assistant
             messages = self.get_thread_messages(conversation.thread_id)
@@ -470,33 +543,21 @@ class OpenAIService:
                         break
             
             if assistant_content:
-                # Save to our database
-                Message.objects.create(
-                    conversation=conversation,
-                    role='assistant',
-                    content=assistant_content
-                )
+                # Save the user message and the reply to our database together
+                self._save_turn(conversation, new_message_content, 'assistant', assistant_content)
                 
                 # Yield the content
                 yield assistant_content
             else:
                 error_message = "No assistant message found in thread"
-                Message.objects.create(
-                    conversation=conversation,
-                    role='system',
-                    content=error_message
-                )
+                self._save_turn(conversation, new_message_content, 'system', error_message)
                 yield error_message
                 
         except Exception as e:
             error_message = f"Error: {str(e)}"
             logger.error(f"Error in streaming assistant completion: {error_message}")
             
-            # Save error message
-            Message.objects.create(
-                conversation=conversation,
-                role='system',
-                content=error_message
-            )
+            # Save the user message and the error message
+            self._save_turn(conversation, new_message_content, 'system', error_message)
             
             yield error_message 
\ No newline at end of file
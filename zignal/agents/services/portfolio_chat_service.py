@@ -18,7 +18,7 @@ class PortfolioChatService:
     def __init__(self, user):
         """Initialize with the portfolio manager user"""
         self.user = user
-        self.openai_service = OpenAIService()
+        self.openai_service = OpenAIService(feature='portfolio')
         
     def get_portfolio_system_prompt(self):
         """
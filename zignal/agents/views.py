@@ -12,6 +12,9 @@ from .models import Agent, Conversation, Message, MeetingTranscript
 from .services.openai_service import OpenAIService
 from .services.portfolio_chat_service import PortfolioChatService
 from .services.meetingbaas_service import MeetingBaaSService
+from core.background import run_in_background
+from core.tasks import process_meeting_webhook
+from core.pagination import list_page, message_page, with_last_message
 
 
 def is_portfolio_manager(user):
@@ -104,9 +107,18 @@ def agent_detail(request, agent_id):
 @login_required
 @require_http_methods(["GET", "POST"])
 def conversation_list(request):
-    """List all conversations or create a new one"""
+    """List a page of conversations, most recently active first (see core.pagination), or create a new one"""
     if request.method == "GET":
-        conversations = Conversation.objects.filter(user=request.user)
+        conversations = with_last_message(
+            Conversation.objects.filter(user=request.user).select_related('agent', 'agent__company'),
+            Message,
+            'conversation'
+        )
+        try:
+            page = list_page(conversations, request.GET)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
         data = [{
             'id': conv.id,
             'title': conv.title or f"Conversation {conv.id}",
@@ -114,11 +126,21 @@ def conversation_list(request):
                 'id': conv.agent.id,
                 'name': conv.agent.name,
                 'agent_type': conv.agent.agent_type,
+                'company': {
+                    'id': conv.agent.company.id,
+                    'name': conv.agent.company.name,
+                } if conv.agent.company else None,
             },
             'created_at': conv.created_at,
             'updated_at': conv.updated_at,
-        } for conv in conversations]
-        return JsonResponse({'conversations': data})
+            'message_count': conv.message_count,
+            'last_message': {
+                'role': conv.last_message_role,
+                'preview': conv.last_message_preview,
+                'timestamp': conv.last_message_at,
+            } if conv.message_count else None,
+        } for conv in page['items']]
+        return JsonResponse({'conversations': data, 'has_more': page['has_more'], 'next_offset': page['next_offset']})
     
     elif request.method == "POST":
         try:
@@ -193,18 +215,12 @@ def conversation_detail(request, conversation_id):
 
 @login_required
 def message_list(request, conversation_id):
-    """Get all messages in a conversation"""
+    """Get a page of messages in a conversation (see core.pagination for the query parameters)"""
     conversation = get_object_or_404(Conversation, id=conversation_id, user=request.user)
-    messages = conversation.messages.all()
-    
-    data = [{
-        'id': msg.id,
-        'role': msg.role,
-        'content': msg.content,
-        'timestamp': msg.timestamp,
-    } for msg in messages]
-    
-    return JsonResponse({'messages': data})
+    try:
+        return JsonResponse(message_page(conversation.messages.all(), request.GET))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
 
 @login_required
@@ -286,22 +302,17 @@ def portfolio_conversation(request):
 @user_passes_test(is_portfolio_manager)
 @require_http_methods(["GET"])
 def portfolio_conversation_messages(request, conversation_id):
-    """Get messages for a specific portfolio conversation"""
-    conversation = get_object_or_404(Conversation, id=conversation_id, user=request.user)
+    """Get a page of messages for a specific portfolio conversation (see core.pagination)"""
+    conversation = get_object_or_404(Conversation.objects.select_related('agent'), id=conversation_id, user=request.user)
     
     # Verify this is a portfolio conversation
     if conversation.agent.name != 'Portfolio Global Agent':
         return JsonResponse({'error': 'Not a portfolio conversation'}, status=403)
     
-    messages = conversation.messages.all()
-    data = [{
-        'id': message.id,
-        'role': message.role,
-        'content': message.content,
-        'timestamp': message.timestamp.isoformat()
-    } for message in messages]
-    
-    return JsonResponse({'messages': data})
+    try:
+        return JsonResponse(message_page(conversation.messages.all(), request.GET))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
 
 @login_required
@@ -518,19 +529,21 @@ def meeting_webhook(request, meeting_id):
     This endpoint is exempt from CSRF protection and authentication
     since it's called by the Meeting BaaS service.
     """
+    meeting = get_object_or_404(MeetingTranscript, id=meeting_id)
+    
     try:
-        meeting = get_object_or_404(MeetingTranscript, id=meeting_id)
-        
         # Parse webhook data
         webhook_data = json.loads(request.body)
-        
-        # Process webhook
-        service = MeetingBaaSService()
-        service.process_webhook(meeting, webhook_data)
+    except json.JSONDecodeError:
+        return HttpResponse(status=400)
+    
+    try:
+        # Acknowledge right away; transcripts and summaries are processed in the background
+        run_in_background(process_meeting_webhook, meeting.id, webhook_data)
         
         return HttpResponse(status=200)
     except Exception as e:
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error processing meeting webhook: {str(e)}")
+        logger.error(f"Error queueing meeting webhook: {str(e)}")
         return HttpResponse(status=500)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Thread, Message
+from .models import Thread, Message, PooledThread
 
 @admin.register(Thread)
 class ThreadAdmin(admin.ModelAdmin):
@@ -18,3 +18,9 @@ class MessageAdmin(admin.ModelAdmin):
     def content_preview(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
     content_preview.short_description = 'Content'
+
+@admin.register(PooledThread)
+class PooledThreadAdmin(admin.ModelAdmin):
+    list_display = ('openai_thread_id', 'company', 'created_at')
+    list_filter = ('company',)
+    readonly_fields = ('openai_thread_id', 'created_at')
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-19 09:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+        ('companies', '0003_company_openai_assistant_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PooledThread',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('openai_thread_id', models.CharField(max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pooled_threads', to='companies.company')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
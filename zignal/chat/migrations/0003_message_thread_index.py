@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-19 09:26
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('chat', '0002_pooledthread'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['thread', 'timestamp'], name='chatmessage_thread_ts_idx'),
+        ),
+    ]
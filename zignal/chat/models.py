@@ -20,6 +20,21 @@ class Thread(models.Model):
     class Meta:
         ordering = ['-updated_at']
 
+class PooledThread(models.Model):
+    """
+    An OpenAI thread created ahead of time for a company, handed to a chat
+    thread when its first message is sent
+    """
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='pooled_threads')
+    openai_thread_id = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Pooled thread {self.openai_thread_id} - {self.company.name}"
+    
+    class Meta:
+        ordering = ['created_at']
+
 class Message(models.Model):
     """
     A message in a thread
@@ -42,3 +57,6 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['thread', 'timestamp'], name='chatmessage_thread_ts_idx'),
+        ]
@@ -4,11 +4,16 @@ Service for handling OpenAI Assistant API interactions for chat
 import logging
 import json
 import time
-from typing import Generator, Dict, Any
+from datetime import timedelta
+from typing import Generator, Optional
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
 import openai
-from openai import OpenAI
-from ..models import Thread, Message
+from core.llm_usage import LLMCallRecorder
+from core.openai_scheduler import get_openai_client, INTERACTIVE
+from ..models import Thread, Message, PooledThread
 
 logger = logging.getLogger(__name__)
 
@@ -23,128 +28,128 @@ class ChatOpenAIService:
         
         # Initialize client with or without beta version header based on SDK version
         try:
-            self.client = OpenAI(
-                api_key=settings.OPENAI_API_KEY,
+            self.client = get_openai_client(
+                INTERACTIVE,
                 # Use Assistants API v2 if supported by this SDK version
                 default_headers={"OpenAI-Beta": "assistants=v2"}
             )
             logger.info("Initialized OpenAI client with assistants=v2 header")
         except Exception as e:
             logger.warning(f"Error initializing with v2 header: {str(e)}. Falling back to standard client.")
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+            self.client = get_openai_client(INTERACTIVE)
     
-    def create_thread(self, company) -> Dict[str, Any]:
+    def _claim_pooled_thread(self, company) -> Optional[str]:
         """
-        Create a new thread for a company's assistant
+        Take the oldest usable pre-created thread from a company's pool
+        
+        Threads older than CHAT_THREAD_POOL_MAX_AGE_DAYS are dropped from the
+        pool and deleted from OpenAI in the background.
+        
+        Returns:
+            Optional[str]: The OpenAI thread ID, or None if the pool is empty
+        """
+        cutoff = timezone.now() - timedelta(days=getattr(settings, 'CHAT_THREAD_POOL_MAX_AGE_DAYS', 7))
+        with transaction.atomic():
+            expired = PooledThread.objects.filter(company=company, created_at__lt=cutoff)
+            expired_ids = list(expired.values_list('openai_thread_id', flat=True))
+            if expired_ids:
+                PooledThread.objects.filter(openai_thread_id__in=expired_ids).delete()
+                
+                from core.background import run_in_background
+                from core.tasks import delete_chat_threads
+                transaction.on_commit(lambda: run_in_background(delete_chat_threads, expired_ids))
+            
+            pooled = (
+                PooledThread.objects.select_for_update(skip_locked=True)
+                .filter(company=company)
+                .order_by('created_at')
+                .first()
+            )
+            if pooled is None:
+                return None
+            pooled.delete()
+        return pooled.openai_thread_id
+    
+    def schedule_pool_refill(self, company) -> None:
+        """
+        Top up a company's pool of pre-created threads in the background
+        
+        Args:
+            company: Company model instance
+        """
+        pool_size = getattr(settings, 'CHAT_THREAD_POOL_SIZE', 2)
+        if pool_size <= 0 or not company.openai_assistant_id:
+            return
+        if PooledThread.objects.filter(company=company).count() >= pool_size:
+            return
+        # One refill per company at a time
+        if not cache.add(f"chat_thread_pool_refill:{company.id}", True, 60):
+            return
+        
+        from core.background import run_in_background
+        from core.tasks import refill_chat_thread_pool
+        run_in_background(refill_chat_thread_pool, company.id)
+    
+    def refill_pool(self, company) -> int:
+        """
+        Create OpenAI threads until the company's pool is full
         
         Args:
             company: Company model instance
             
         Returns:
-            dict: Information about the created thread
+            int: Number of threads created
         """
-        try:
-            if not company.openai_assistant_id:
-                logger.error(f"Company {company.name} does not have OpenAI assistant ID configured")
-                return {
-                    "success": False,
-                    "error": "Company does not have an OpenAI assistant configured"
-                }
-            
-            logger.info(f"Attempting to create thread for company {company.name} with assistant ID: {company.openai_assistant_id}")
-            
-            # Create a thread directly without retry logic first
-            try:
-                thread = self.client.beta.threads.create()
-                thread_id = thread.id
-                logger.info(f"Successfully created thread with ID: {thread_id}")
-                
-                # Try retrieving the thread to confirm it exists
-                self.client.beta.threads.retrieve(thread_id=thread_id)
-                logger.info(f"Verified thread exists with ID: {thread_id}")
-                
-                return {
-                    "success": True,
-                    "thread_id": thread_id
-                }
-            except Exception as e:
-                logger.error(f"Failed to create or verify thread: {str(e)}")
-                return {
-                    "success": False,
-                    "error": f"Failed to create OpenAI thread: {str(e)}"
-                }
-                
-        except Exception as e:
-            logger.exception(f"Unexpected error creating thread for company {company.name}: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        missing = getattr(settings, 'CHAT_THREAD_POOL_SIZE', 2) - PooledThread.objects.filter(company=company).count()
+        created = 0
+        for _ in range(max(missing, 0)):
+            thread = self.client.beta.threads.create()
+            PooledThread.objects.create(company=company, openai_thread_id=thread.id)
+            created += 1
+        return created
     
-    def add_message(self, thread: Thread, content: str) -> Dict[str, Any]:
+    def delete_remote_threads(self, thread_ids) -> int:
         """
-        Add a message to a thread
+        Delete OpenAI threads; ones that no longer exist count as deleted
         
         Args:
-            thread: Thread model instance
-            content: Message content
+            thread_ids: OpenAI thread IDs
             
         Returns:
-            dict: Information about the added message
+            int: Number of threads deleted
         """
-        try:
-            if not thread.openai_thread_id:
-                logger.error(f"Thread {thread.id} does not have an OpenAI thread ID")
-                return {
-                    "success": False,
-                    "error": "Thread does not have an OpenAI thread ID"
-                }
-            
-            logger.info(f"Adding message to thread {thread.openai_thread_id}")
-            
-            # Add message to OpenAI thread
-            message = self.client.beta.threads.messages.create(
-                thread_id=thread.openai_thread_id,
-                role="user",
-                content=content
-            )
-            
-            # Get the message ID from the response
-            message_id = getattr(message, 'id', 'unknown')
-            logger.info(f"Added message to thread {thread.id}: {message_id}")
-            
-            # Save message to database
-            db_message = Message.objects.create(
-                thread=thread,
-                role='user',
-                content=content,
-                openai_message_id=message_id
-            )
-            
-            return {
-                "success": True,
-                "message_id": message_id,
-                "db_message_id": db_message.id
-            }
-        except Exception as e:
-            logger.exception(f"Error adding message to thread {thread.id}: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        deleted = 0
+        for thread_id in thread_ids:
+            try:
+                try:
+                    self.client.beta.threads.delete(thread_id)
+                except openai.NotFoundError:
+                    pass
+                deleted += 1
+            except Exception as e:
+                logger.error(f"Error deleting OpenAI thread {thread_id}: {str(e)}")
+        return deleted
     
-    def run_assistant(self, thread: Thread) -> Generator[str, None, None]:
+    def run_assistant(self, thread: Thread, content: Optional[str] = None) -> Generator[str, None, None]:
         """
         Run the assistant on a thread and stream the response
         
+        When content is given it is sent with the run request instead of being
+        added to the thread first. A thread without an OpenAI thread takes one
+        from the company's pool, or gets its thread and run from a single
+        create-and-run call. The user message and the reply are saved to the
+        database together once the run finishes.
+        
         Args:
             thread: Thread model instance
+            content: Optional new user message
             
         Yields:
             str: Response content chunks
         """
+        user_message = Message(thread=thread, role='user', content=content) if content else None
         try:
-            if not thread.openai_thread_id:
+            if not thread.openai_thread_id and not content:
                 logger.error(f"Thread {thread.id} missing OpenAI thread ID")
                 yield json.dumps({
                     "error": "Thread does not have required OpenAI ID"
@@ -160,12 +165,12 @@ class ChatOpenAIService:
             
             logger.info(f"Running assistant {thread.company.openai_assistant_id} on thread {thread.openai_thread_id}")
             
+            # Measured by hand: the polling loop below yields, so it can't sit inside track_llm_call
+            usage_call = LLMCallRecorder('chat', thread.company_id)
+            
             # Create a run
             try:
-                run = self.client.beta.threads.runs.create(
-                    thread_id=thread.openai_thread_id,
-                    assistant_id=thread.company.openai_assistant_id
-                )
+                run = self._start_run(thread, content)
                 logger.info(f"Created run with ID: {run.id}")
             except Exception as e:
                 logger.exception(f"Error creating run: {str(e)}")
@@ -202,6 +207,8 @@ class ChatOpenAIService:
                 
                 if run.status == 'completed':
                     logger.info("Run completed successfully")
+                    usage_call.set_usage(run.usage, run.model)
+                    usage_call.finish()
                     break
                 elif run.status in ['failed', 'cancelled', 'expired']:
                     error_message = getattr(run, 'last_error', {'message': 'Unknown error'})
@@ -289,14 +296,16 @@ class ChatOpenAIService:
                     })
                     return
                 
-                # Save assistant message to database
+                # Save the user message and the assistant message to the database together
                 try:
-                    Message.objects.create(
+                    assistant_message = Message(
                         thread=thread,
                         role='assistant',
                         content=message_content,
                         openai_message_id=getattr(message, 'id', 'unknown')
                     )
+                    Message.objects.bulk_create(([user_message] if user_message else []) + [assistant_message])
+                    user_message = None
                     logger.info("Saved assistant message to database")
                 except Exception as e:
                     logger.exception(f"Error saving message to database: {str(e)}")
@@ -315,4 +324,48 @@ class ChatOpenAIService:
             logger.exception(f"Error running assistant on thread {thread.id}: {str(e)}")
             yield json.dumps({
                 "error": str(e)
-            }) 
\ No newline at end of file
+            })
+        finally:
+            # Keep the user's message even when the run didn't produce a reply
+            if user_message is not None and user_message.pk is None:
+                user_message.save()
+    
+    def _start_run(self, thread: Thread, content: Optional[str] = None):
+        """
+        Start a run, sending the new user message with it
+        
+        Args:
+            thread: Thread model instance
+            content: Optional new user message
+            
+        Returns:
+            Run: The created run
+        """
+        assistant_id = thread.company.openai_assistant_id
+        messages = [{"role": "user", "content": content}] if content else []
+        
+        if not thread.openai_thread_id:
+            pooled_thread_id = self._claim_pooled_thread(thread.company)
+            if pooled_thread_id:
+                thread.openai_thread_id = pooled_thread_id
+                thread.save(update_fields=['openai_thread_id', 'updated_at'])
+            self.schedule_pool_refill(thread.company)
+        
+        if not thread.openai_thread_id:
+            # Create the thread and the run in one call
+            run = self.client.beta.threads.create_and_run(
+                assistant_id=assistant_id,
+                thread={"messages": messages}
+            )
+            thread.openai_thread_id = run.thread_id
+            thread.save(update_fields=['openai_thread_id', 'updated_at'])
+            return run
+        
+        run_args = {}
+        if messages:
+            run_args['additional_messages'] = messages
+        return self.client.beta.threads.runs.create(
+            thread_id=thread.openai_thread_id,
+            assistant_id=assistant_id,
+            **run_args
+        ) 
\ No newline at end of file
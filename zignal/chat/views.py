@@ -7,10 +7,10 @@ from django.contrib import messages
 from companies.models import Company
 from .models import Thread, Message
 from .services.openai_service import ChatOpenAIService
+from core.pagination import list_page, message_page, with_last_message
 import json
 import logging
 import time
-from openai import OpenAI
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
@@ -32,47 +32,24 @@ def force_new_thread(request):
     debug_info.append(f"Company: {company.name}")
     debug_info.append(f"Assistant ID: {company.openai_assistant_id}")
     
-    # Create OpenAI client
-    client = OpenAI(
-        api_key=settings.OPENAI_API_KEY,
-        default_headers={"OpenAI-Beta": "assistants=v2"}
-    )
-    debug_info.append(f"Created OpenAI client with API key ending in: {settings.OPENAI_API_KEY[-4:]}")
-    
-    # Try to create a thread directly
-    thread_id = None
-    error = None
+    # The OpenAI thread is attached when the first message is sent
     try:
-        start_time = time.time()
-        thread_result = client.beta.threads.create()
-        duration = time.time() - start_time
-        thread_id = thread_result.id
-        debug_info.append(f"Created thread in {duration:.2f}s with ID: {thread_id}")
+        thread = Thread.objects.create(
+            user=request.user,
+            company=company,
+            title=f'Chat with {company.name}'
+        )
+        debug_info.append(f"Created thread in database with ID: {thread.id}")
+        debug_info.append("OPENAI ID: assigned on first message")
+        
+        # Warm the company's pool so the first message doesn't wait on thread creation
+        ChatOpenAIService().schedule_pool_refill(company)
+        
+        # Add a link to the chat view
+        debug_info.append(f"<a href='/chat/' class='btn btn-primary mt-4'>Go to chat</a>")
         
-        # Verify thread exists
-        retrieved = client.beta.threads.retrieve(thread_id=thread_id)
-        debug_info.append(f"Retrieved thread: {retrieved.id}")
     except Exception as e:
-        error = str(e)
-        debug_info.append(f"ERROR: {error}")
-    
-    # If we have a thread ID, save to database
-    if thread_id:
-        try:
-            thread = Thread.objects.create(
-                user=request.user,
-                company=company,
-                title=f'Chat with {company.name}',
-                openai_thread_id=thread_id
-            )
-            debug_info.append(f"Created thread in database with ID: {thread.id}")
-            debug_info.append(f"OPENAI ID: {thread.openai_thread_id}")
-            
-            # Add a link to the chat view
-            debug_info.append(f"<a href='/chat/' class='btn btn-primary mt-4'>Go to chat</a>")
-            
-        except Exception as e:
-            debug_info.append(f"ERROR saving to database: {str(e)}")
+        debug_info.append(f"ERROR saving to database: {str(e)}")
     
     # Return debug info as plain text
     return HttpResponse("<br>".join(debug_info), content_type="text/html")
@@ -113,8 +90,9 @@ def chat_view(request):
                 thread = existing_threads.first()
                 logger.info(f"Found existing thread {thread.id} with OpenAI ID: {thread.openai_thread_id or 'None'}")
         
-        # Create a new thread if needed
-        if thread is None or not thread.openai_thread_id or create_new:
+        # Create a new thread if needed. Its OpenAI thread is attached when the
+        # first message is sent, so opening the page makes no OpenAI calls.
+        if thread is None or create_new:
             # If we're creating a new one but had an old one, mark that we're replacing it
             if thread and create_new:
                 logger.info(f"Creating new thread to replace existing thread {thread.id}")
@@ -126,26 +104,10 @@ def chat_view(request):
                 title=f'Chat with {company.name}'
             )
             logger.info(f"Created new thread {thread.id} in database")
-            
-            # Create the thread in OpenAI
-            openai_service = ChatOpenAIService()
-            result = openai_service.create_thread(company)
-            
-            if result['success']:
-                thread.openai_thread_id = result['thread_id']
-                thread.save()
-                logger.info(f"Successfully created OpenAI thread: {thread.openai_thread_id}")
-            else:
-                error = result.get('error', 'Failed to create OpenAI thread')
-                logger.error(f"Failed to create OpenAI thread: {error}")
-                # Delete the thread if we can't create it in OpenAI
-                thread.delete()
-                thread = None
-                
-        # Final check to ensure thread has an OpenAI thread ID
-        if thread and not thread.openai_thread_id:
-            error = "Thread exists but has no OpenAI thread ID"
-            logger.error(error)
+        
+        # Make sure a pre-created OpenAI thread is waiting for the first message
+        if not thread.openai_thread_id:
+            ChatOpenAIService().schedule_pool_refill(company)
     
     except Exception as e:
         logger.exception(f"Error in chat_view: {str(e)}")
@@ -170,8 +132,17 @@ def new_chat(request):
 @login_required
 @require_http_methods(["GET"])
 def thread_list(request):
-    """Get all threads for the current user"""
-    threads = Thread.objects.filter(user=request.user)
+    """Get a page of the current user's threads, most recently active first (see core.pagination)"""
+    threads = with_last_message(
+        Thread.objects.filter(user=request.user).select_related('company'),
+        Message,
+        'thread'
+    )
+    try:
+        page = list_page(threads, request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
     data = [{
         'id': thread.id,
         'company': {
@@ -181,8 +152,14 @@ def thread_list(request):
         'title': thread.title or f"Chat with {thread.company.name}",
         'created_at': thread.created_at,
         'updated_at': thread.updated_at,
-    } for thread in threads]
-    return JsonResponse({'threads': data})
+        'message_count': thread.message_count,
+        'last_message': {
+            'role': thread.last_message_role,
+            'preview': thread.last_message_preview,
+            'timestamp': thread.last_message_at,
+        } if thread.message_count else None,
+    } for thread in page['items']]
+    return JsonResponse({'threads': data, 'has_more': page['has_more'], 'next_offset': page['next_offset']})
 
 @login_required
 @require_http_methods(["POST"])
@@ -197,34 +174,24 @@ def create_thread(request):
         
         company = get_object_or_404(Company, id=company_id)
         
-        # Create thread in database
+        # Create thread in database; the OpenAI thread is attached on the first message
         thread = Thread.objects.create(
             company=company,
             user=request.user,
             title=data.get('title', '')
         )
+        ChatOpenAIService().schedule_pool_refill(company)
         
-        # Create thread in OpenAI
-        openai_service = ChatOpenAIService()
-        result = openai_service.create_thread(company)
-        
-        if result['success']:
-            thread.openai_thread_id = result['thread_id']
-            thread.save()
-            
-            return JsonResponse({
-                'id': thread.id,
-                'company': {
-                    'id': thread.company.id,
-                    'name': thread.company.name
-                },
-                'title': thread.title or f"Chat with {thread.company.name}",
-                'created_at': thread.created_at,
-                'updated_at': thread.updated_at,
-            }, status=201)
-        else:
-            thread.delete()
-            return JsonResponse({'error': result['error']}, status=500)
+        return JsonResponse({
+            'id': thread.id,
+            'company': {
+                'id': thread.company.id,
+                'name': thread.company.name
+            },
+            'title': thread.title or f"Chat with {thread.company.name}",
+            'created_at': thread.created_at,
+            'updated_at': thread.updated_at,
+        }, status=201)
             
     except Exception as e:
         logger.error(f"Error creating thread: {str(e)}")
@@ -233,18 +200,12 @@ def create_thread(request):
 @login_required
 @require_http_methods(["GET"])
 def message_list(request, thread_id):
-    """Get all messages in a thread"""
+    """Get a page of messages in a thread (see core.pagination for the query parameters)"""
     thread = get_object_or_404(Thread, id=thread_id, user=request.user)
-    messages = thread.messages.all()
-    
-    data = [{
-        'id': msg.id,
-        'role': msg.role,
-        'content': msg.content,
-        'timestamp': msg.timestamp,
-    } for msg in messages]
-    
-    return JsonResponse({'messages': data})
+    try:
+        return JsonResponse(message_page(thread.messages.all(), request.GET))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
 @login_required
 @csrf_exempt
@@ -253,25 +214,17 @@ def send_message(request, thread_id):
     """Send a message to the AI and get a response"""
     thread = get_object_or_404(Thread, id=thread_id, user=request.user)
     try:
-        # Verify thread has an OpenAI thread ID
-        if not thread.openai_thread_id:
-            logger.error(f"Thread {thread.id} missing OpenAI thread ID")
-            return JsonResponse({'error': 'This chat thread is not properly connected to OpenAI. Please create a new thread.'}, status=400)
-        
         data = json.loads(request.body)
         message_content = data.get('message', '')
         if not message_content:
             return JsonResponse({'error': 'Message content is required'}, status=400)
             
         openai_service = ChatOpenAIService()
-        # Add message to thread
-        result = openai_service.add_message(thread, message_content)
-        if not result['success']:
-            return JsonResponse({'error': result['error']}, status=500)
-            
-        # Get assistant reply (not streaming)
+        
+        # Send the message with the run and get the assistant reply (not streaming).
+        # The OpenAI thread is attached here on the first message.
         reply = None
-        for content in openai_service.run_assistant(thread):
+        for content in openai_service.run_assistant(thread, message_content):
             content_data = json.loads(content)
             if 'content' in content_data:
                 reply = content_data['content']
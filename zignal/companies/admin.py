@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Company, UserCompanyRelation
+from .models import Company, PooledAIResource, UserCompanyRelation
 
 class UserCompanyRelationInline(admin.TabularInline):
     model = UserCompanyRelation
@@ -9,10 +9,11 @@ class UserCompanyRelationInline(admin.TabularInline):
 
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
-    list_display = ('name', 'website', 'created_at', 'created_by')
+    list_display = ('name', 'website', 'ai_status', 'created_at', 'created_by')
+    list_filter = ('ai_status',)
     search_fields = ('name', 'description')
     prepopulated_fields = {'slug': ('name',)}
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'ai_status_updated_at')
     inlines = [UserCompanyRelationInline]
     fieldsets = (
         (None, {
@@ -22,7 +23,7 @@ class CompanyAdmin(admin.ModelAdmin):
             'fields': ('company_email',)
         }),
         ('OpenAI Integration', {
-            'fields': ('openai_assistant_id', 'openai_vector_store_id')
+            'fields': ('openai_assistant_id', 'openai_vector_store_id', 'ai_status', 'ai_status_updated_at', 'ai_error')
         }),
         ('Metadata', {
             'fields': ('created_by', 'created_at', 'updated_at')
@@ -35,3 +36,8 @@ class UserCompanyRelationAdmin(admin.ModelAdmin):
     list_filter = ('role', 'company')
     search_fields = ('user__email', 'user__username', 'company__name')
     autocomplete_fields = ['user', 'company']
+
+@admin.register(PooledAIResource)
+class PooledAIResourceAdmin(admin.ModelAdmin):
+    list_display = ('openai_assistant_id', 'openai_vector_store_id', 'created_at')
+    readonly_fields = ('created_at',)
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-19 09:17
+
+from django.db import migrations, models
+
+
+def mark_provisioned_companies_ready(apps, schema_editor):
+    Company = apps.get_model('companies', 'Company')
+    Company.objects.exclude(openai_assistant_id__isnull=True).exclude(openai_assistant_id='').update(ai_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_company_openai_assistant_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PooledAIResource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('openai_assistant_id', models.CharField(max_length=255, unique=True)),
+                ('openai_vector_store_id', models.CharField(max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='ai_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='ai_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('provisioning', 'Provisioning'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', help_text="State of the company's OpenAI resources, set up in the background", max_length=20),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='ai_status_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_provisioned_companies_ready, migrations.RunPython.noop),
+    ]
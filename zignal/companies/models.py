@@ -6,6 +6,13 @@ class Company(models.Model):
     """
     Model representing a company in the system
     """
+    AI_STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('provisioning', 'Provisioning'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    )
+    
     name = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True, blank=True)
     description = models.TextField(blank=True, null=True)
@@ -20,6 +27,10 @@ class Company(models.Model):
                                          help_text="OpenAI Assistant ID for this company")
     openai_vector_store_id = models.CharField(max_length=255, blank=True, null=True,
                                             help_text="OpenAI Vector Store ID for this company")
+    ai_status = models.CharField(max_length=20, choices=AI_STATUS_CHOICES, default='pending',
+                                 help_text="State of the company's OpenAI resources, set up in the background")
+    ai_status_updated_at = models.DateTimeField(blank=True, null=True)
+    ai_error = models.TextField(blank=True, default='')
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -57,6 +68,22 @@ class Company(models.Model):
         return None
 
 
+class PooledAIResource(models.Model):
+    """
+    An OpenAI assistant and vector store created ahead of time, handed to a
+    new company so it has working AI resources as soon as it is created
+    """
+    openai_assistant_id = models.CharField(max_length=255, unique=True)
+    openai_vector_store_id = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return f"Pooled assistant {self.openai_assistant_id}"
+
+
 class UserCompanyRelation(models.Model):
     """
     Model representing the relationship between users and companies
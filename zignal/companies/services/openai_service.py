@@ -5,8 +5,11 @@ import logging
 import os
 import json
 from django.conf import settings
-from openai import OpenAI
+from django.core.cache import cache
+from django.db import transaction
 from agents.services.openai_service import OpenAIService
+from companies.models import Company, PooledAIResource
+from core.openai_scheduler import get_openai_client, BATCH
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +19,8 @@ class CompanyOpenAIService:
     """
     
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.openai_service = OpenAIService()
+        self.client = get_openai_client(BATCH)
+        self.openai_service = OpenAIService(lane=BATCH)
     
     def setup_company_ai(self, company):
         """
@@ -26,67 +29,59 @@ class CompanyOpenAIService:
         - Creates an assistant with file search capabilities
         - Uses OpenAI's native file handling system
         
+        A vector store already on the company (left by an earlier attempt that
+        failed at the assistant step) is reused rather than created again.
+        
         Args:
             company: Company model instance
             
         Returns:
-            dict: Information about created resources
+            dict: Information about created resources; on failure "retryable"
+                tells whether trying again later may succeed
         """
         try:
             logger.info(f"Setting up OpenAI resources for company: {company.name} (ID: {company.id})")
             
             # Check if API key is valid and not a placeholder
-            if not settings.OPENAI_API_KEY or settings.OPENAI_API_KEY.startswith("your_") or len(settings.OPENAI_API_KEY) < 20:
+            if not self._has_valid_api_key():
                 logger.error(f"Invalid OpenAI API key format: {settings.OPENAI_API_KEY[:10]}...")
                 return {
                     "success": False,
-                    "error": "Invalid API key format. Please configure a valid OpenAI API key."
+                    "error": "Invalid API key format. Please configure a valid OpenAI API key.",
+                    "retryable": False
                 }
             
             # Create a vector store for the company if supported
             vector_store_id = None
-            try:
-                # Check if vector_stores is available directly on the client
-                has_vector_stores = hasattr(self.client, 'vector_stores')
-                if has_vector_stores:
-                    # Create a vector store
-                    vector_store = self.client.vector_stores.create(
-                        name=f"{company.name} Vector Store"
-                    )
-                    vector_store_id = vector_store.id
-                    logger.info(f"Created vector store for company {company.name}: {vector_store_id}")
-                else:
-                    logger.warning("Vector stores not supported in this OpenAI API version. Falling back to basic assistant.")
-                    vector_store_id = f"assistant_files_{company.id}"
-            except Exception as e:
-                logger.error(f"Error creating vector store: {str(e)}")
-                vector_store_id = f"assistant_files_{company.id}"
+            if company.openai_vector_store_id and not company.openai_vector_store_id.startswith("assistant_files_"):
+                vector_store_id = company.openai_vector_store_id
+                logger.info(f"Reusing vector store for company {company.name}: {vector_store_id}")
+            else:
+                try:
+                    # Check if vector_stores is available directly on the client
+                    has_vector_stores = hasattr(self.client, 'vector_stores')
+                    if has_vector_stores:
+                        # Create a vector store
+                        vector_store = self.client.vector_stores.create(
+                            name=f"{company.name} Vector Store"
+                        )
+                        vector_store_id = vector_store.id
+                        logger.info(f"Created vector store for company {company.name}: {vector_store_id}")
+                    else:
+                        logger.warning("Vector stores not supported in this OpenAI API version. Falling back to basic assistant.")
+                        vector_store_id = f"assistant_files_{company.id}"
+                except Exception as e:
+                    # Not worth an assistant without file search; let the caller try again
+                    logger.error(f"Error creating vector store: {str(e)}")
+                    return {
+                        "success": False,
+                        "error": f"Error code: {getattr(e, 'status_code', 'unknown')} - {str(e)}",
+                        "retryable": self._is_retryable(e)
+                    }
             
             # Create an assistant with file search capabilities if vector store was created
             try:
-                assistant_args = {
-                    "name": f"{company.name} Assistant",
-                    "description": f"AI assistant for {company.name}",
-                    "instructions": f"You are an AI assistant for {company.name}. Your role is to help with company-related tasks and queries.",
-                    "model": settings.OPENAI_MODEL,
-                    "metadata": {
-                        "company_id": str(company.id),
-                        "company_name": company.name
-                    }
-                }
-                
-                # Add file search capability if we have a valid vector store ID
-                if vector_store_id and not vector_store_id.startswith("assistant_files_"):
-                    assistant_args["tools"] = [{"type": "file_search"}]
-                    assistant_args["tool_resources"] = {
-                        "file_search": {
-                            "vector_store_ids": [vector_store_id]
-                        }
-                    }
-                    assistant_args["instructions"] += " You can search through documents that have been uploaded."
-                
-                # Create the assistant
-                assistant = self.client.beta.assistants.create(**assistant_args)
+                assistant = self.client.beta.assistants.create(**self._assistant_args(company, vector_store_id))
                 logger.info(f"Created assistant for company {company.name}: {assistant.id}")
                 
                 logger.info(f"Successfully created OpenAI resources for company: {company.name}")
@@ -100,16 +95,180 @@ class CompanyOpenAIService:
                 logger.error(f"Error creating assistant: {str(e)}")
                 return {
                     "success": False,
-                    "error": f"Error code: {getattr(e, 'status_code', 'unknown')} - {str(e)}"
+                    "error": f"Error code: {getattr(e, 'status_code', 'unknown')} - {str(e)}",
+                    "vector_store_id": vector_store_id,
+                    "retryable": self._is_retryable(e)
                 }
             
         except Exception as e:
             logger.error(f"Error setting up OpenAI resources for company {company.name}: {str(e)}")
             return {
                 "success": False,
-                "error": f"Error code: {getattr(e, 'status_code', 'unknown')} - {str(e)}"
+                "error": f"Error code: {getattr(e, 'status_code', 'unknown')} - {str(e)}",
+                "retryable": self._is_retryable(e)
             }
     
+    def provision(self, company):
+        """
+        Make sure the company has an assistant and vector store
+        
+        Safe to call repeatedly: a company that already has an assistant (e.g.
+        one claimed from the pool at signup) only gets it renamed and
+        configured for the company, and a vector store left by an earlier
+        failed attempt is reused. The IDs are set on the company instance but
+        not saved.
+        
+        Args:
+            company: Company model instance
+            
+        Returns:
+            dict: Result as returned by setup_company_ai
+        """
+        if company.openai_assistant_id:
+            self.personalise(company)
+            return {
+                "success": True,
+                "assistant_id": company.openai_assistant_id,
+                "vector_store_id": company.openai_vector_store_id
+            }
+        
+        result = self.setup_company_ai(company)
+        if result.get('vector_store_id'):
+            company.openai_vector_store_id = result['vector_store_id']
+        if result['success']:
+            company.openai_assistant_id = result['assistant_id']
+        return result
+    
+    def personalise(self, company):
+        """
+        Rename and configure a pre-created assistant and vector store for the
+        company they were handed to. Failures are logged only, since the
+        resources work either way.
+        
+        Args:
+            company: Company model instance
+        """
+        try:
+            self.client.beta.assistants.update(
+                company.openai_assistant_id,
+                **self._assistant_args(company, company.openai_vector_store_id)
+            )
+            if company.openai_vector_store_id and not company.openai_vector_store_id.startswith("assistant_files_"):
+                self.client.vector_stores.update(
+                    company.openai_vector_store_id,
+                    name=f"{company.name} Vector Store"
+                )
+        except Exception as e:
+            logger.warning(f"Could not personalise pooled OpenAI resources for company {company.name}: {str(e)}")
+    
+    def claim_pooled_resources(self, company):
+        """
+        Hand the company a pre-created assistant and vector store, if the pool has one
+        
+        Only touches the database, so it is cheap enough to call during signup.
+        Either way a refill is scheduled if the pool is short, so an empty pool
+        gets its first entries from the first signup that finds it empty.
+        
+        Args:
+            company: Company model instance
+            
+        Returns:
+            bool: Whether resources were claimed
+        """
+        with transaction.atomic():
+            pooled = (
+                PooledAIResource.objects.select_for_update(skip_locked=True)
+                .order_by('created_at')
+                .first()
+            )
+            if pooled is None:
+                transaction.on_commit(self.schedule_pool_refill)
+                return False
+            pooled.delete()
+            company.openai_assistant_id = pooled.openai_assistant_id
+            company.openai_vector_store_id = pooled.openai_vector_store_id
+            Company.objects.filter(id=company.id).update(
+                openai_assistant_id=pooled.openai_assistant_id,
+                openai_vector_store_id=pooled.openai_vector_store_id
+            )
+        
+        logger.info(f"Claimed pooled OpenAI resources for company {company.name}: {pooled.openai_assistant_id}")
+        self.schedule_pool_refill()
+        return True
+    
+    def schedule_pool_refill(self):
+        """Top up the pool of pre-created assistants and vector stores in the background"""
+        pool_size = getattr(settings, 'COMPANY_AI_POOL_SIZE', 0)
+        if pool_size <= 0 or PooledAIResource.objects.count() >= pool_size:
+            return
+        # One refill at a time
+        if not cache.add("company_ai_pool_refill", True, 300):
+            return
+        
+        from core.background import run_in_background
+        from core.tasks import refill_company_ai_pool
+        run_in_background(refill_company_ai_pool)
+    
+    def refill_pool(self):
+        """
+        Create assistants and vector stores until the pool is full
+        
+        Returns:
+            int: Number of pairs created
+        """
+        if not self._has_valid_api_key():
+            return 0
+        
+        missing = getattr(settings, 'COMPANY_AI_POOL_SIZE', 0) - PooledAIResource.objects.count()
+        created = 0
+        for _ in range(max(missing, 0)):
+            vector_store = self.client.vector_stores.create(name="Unassigned Vector Store")
+            assistant = self.client.beta.assistants.create(
+                name="Unassigned Assistant",
+                model=settings.OPENAI_MODEL,
+                tools=[{"type": "file_search"}],
+                tool_resources={"file_search": {"vector_store_ids": [vector_store.id]}}
+            )
+            PooledAIResource.objects.create(
+                openai_assistant_id=assistant.id,
+                openai_vector_store_id=vector_store.id
+            )
+            created += 1
+        return created
+    
+    def _assistant_args(self, company, vector_store_id):
+        assistant_args = {
+            "name": f"{company.name} Assistant",
+            "description": f"AI assistant for {company.name}",
+            "instructions": f"You are an AI assistant for {company.name}. Your role is to help with company-related tasks and queries.",
+            "model": settings.OPENAI_MODEL,
+            "metadata": {
+                "company_id": str(company.id),
+                "company_name": company.name
+            }
+        }
+        
+        # Add file search capability if we have a valid vector store ID
+        if vector_store_id and not vector_store_id.startswith("assistant_files_"):
+            assistant_args["tools"] = [{"type": "file_search"}]
+            assistant_args["tool_resources"] = {
+                "file_search": {
+                    "vector_store_ids": [vector_store_id]
+                }
+            }
+            assistant_args["instructions"] += " You can search through documents that have been uploaded."
+        return assistant_args
+    
+    @staticmethod
+    def _has_valid_api_key():
+        return bool(settings.OPENAI_API_KEY) and not settings.OPENAI_API_KEY.startswith("your_") and len(settings.OPENAI_API_KEY) >= 20
+    
+    @staticmethod
+    def _is_retryable(error):
+        """Connection problems, timeouts, rate limits and server errors may pass on a later attempt"""
+        status_code = getattr(error, 'status_code', None)
+        return status_code is None or status_code in (408, 409, 429) or status_code >= 500
+    
     def add_file_to_vector_store(self, company, file_path, file_name=None):
         """
         Add a file to the company's vector store for retrieval
@@ -5,7 +5,9 @@ from django.http import JsonResponse
 from django.conf import settings
 from .models import Company, UserCompanyRelation
 from .forms import CompanyForm, CompanyEmailForm
-from core.tasks import create_default_project_and_silo
+from django.db import transaction
+from core.background import run_in_background
+from core.tasks import create_default_project_and_silo, provision_company_ai
 from .services.openai_service import CompanyOpenAIService
 import logging
 from invitations.models import Invitation
@@ -14,6 +16,20 @@ import datetime
 # Get logger
 logger = logging.getLogger(__name__)
 
+def _start_company_setup(request, company):
+    """
+    Queue the slow parts of creating a company: its OpenAI assistant and vector
+    store, and the default project and data silos. A pre-created assistant is
+    claimed from the pool first when one is available.
+    """
+    claimed = CompanyOpenAIService().claim_pooled_resources(company)
+    user_id = request.user.id
+    transaction.on_commit(lambda: run_in_background(provision_company_ai, company.id))
+    transaction.on_commit(lambda: run_in_background(create_default_project_and_silo, company.id, user_id))
+    
+    if not claimed:
+        messages.info(request, "Your AI assistant is being set up and will be ready in a moment.")
+
 @login_required
 def setup_company(request):
     """
@@ -51,36 +67,8 @@ def setup_company(request):
             )
             logger.info(f"Created user-company relation for user {request.user.email} and company {company.name}")
             
-            # Set up OpenAI resources for the company
-            logger.info(f"Setting up OpenAI resources for company {company.name}")
-            openai_service = CompanyOpenAIService()
-            result = openai_service.setup_company_ai(company)
-            
-            if result['success']:
-                company.openai_assistant_id = result['assistant_id']
-                company.openai_vector_store_id = result['vector_store_id']
-                company.save()
-                logger.info(f"Created and saved OpenAI resources for company: {company.name} - Assistant ID: {company.openai_assistant_id}, Vector Store ID: {company.openai_vector_store_id}")
-            else:
-                error_msg = result.get('error', 'Unknown error')
-                logger.error(f"Failed to create OpenAI resources for company: {company.name} (ID: {company.id}) - Error: {error_msg}")
-                
-                # Still proceed with company creation, but show error message
-                if 'invalid_api_key' in error_msg or 'API key' in error_msg:
-                    messages.error(request, "Company created, but AI assistant setup failed due to API key issues. Please contact support.")
-                else:
-                    messages.warning(request, "Company created, but AI assistant setup encountered an issue. Some AI features may not be available.")
-            
-            # Create default project and data silo in the background using Celery
-            try:
-                # Try to use Celery for async task
-                create_default_project_and_silo.delay(company.id, request.user.id)
-                logger.info(f"Triggered default project and silo creation for company: {company.name} (ID: {company.id})")
-            except Exception as e:
-                # Fall back to synchronous execution if Celery fails
-                logger.warning(f"Celery task failed, running synchronously: {str(e)}")
-                create_default_project_and_silo(company.id, request.user.id)
-                logger.info(f"Completed synchronous project and silo creation for company: {company.name} (ID: {company.id})")
+            # Set up OpenAI resources and default project/silos without holding up the request
+            _start_company_setup(request, company)
             
             # Show success message
             messages.success(request, f'Company "{company.name}" has been set up successfully!')
@@ -115,36 +103,8 @@ def create_company(request):
             )
             logger.info(f"Created user-company relation for user {request.user.email} and company {company.name}")
             
-            # Set up OpenAI resources for the company
-            logger.info(f"Setting up OpenAI resources for company {company.name}")
-            openai_service = CompanyOpenAIService()
-            result = openai_service.setup_company_ai(company)
-            
-            if result['success']:
-                company.openai_assistant_id = result['assistant_id']
-                company.openai_vector_store_id = result['vector_store_id']
-                company.save()
-                logger.info(f"Created and saved OpenAI resources for company: {company.name} - Assistant ID: {company.openai_assistant_id}, Vector Store ID: {company.openai_vector_store_id}")
-            else:
-                error_msg = result.get('error', 'Unknown error')
-                logger.error(f"Failed to create OpenAI resources for company: {company.name} (ID: {company.id}) - Error: {error_msg}")
-                
-                # Still proceed with company creation, but show error message
-                if 'invalid_api_key' in error_msg or 'API key' in error_msg:
-                    messages.error(request, "Company created, but AI assistant setup failed due to API key issues. Please contact support.")
-                else:
-                    messages.warning(request, "Company created, but AI assistant setup encountered an issue. Some AI features may not be available.")
-            
-            # Create default project and data silo in the background using Celery
-            try:
-                # Try to use Celery for async task
-                create_default_project_and_silo.delay(company.id, request.user.id)
-                logger.info(f"Triggered default project and silo creation for company: {company.name} (ID: {company.id})")
-            except Exception as e:
-                # Fall back to synchronous execution if Celery fails
-                logger.warning(f"Celery task failed, running synchronously: {str(e)}")
-                create_default_project_and_silo(company.id, request.user.id)
-                logger.info(f"Completed synchronous project and silo creation for company: {company.name} (ID: {company.id})")
+            # Set up OpenAI resources and default project/silos without holding up the request
+            _start_company_setup(request, company)
             
             # Show success message
             messages.success(request, f'Company "{company.name}" created successfully!')
@@ -96,6 +96,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Request profiling, only active when PROFILING_ENABLED is set
+    'core.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For serving static files in production
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -150,13 +152,27 @@ import dj_database_url
 db_from_env = dj_database_url.config(conn_max_age=600)
 DATABASES['default'].update(db_from_env)
 
-# Cache configuration (using local memory cache instead of Redis)
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+# Cache configuration
+# The web workers and the scheduler each run in their own process, so cache
+# invalidation (dashboard snapshots) and locks only reach all of them through a
+# shared Redis cache. Without REDIS_URL each process gets its own local memory cache.
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.profiling.ProfiledRedisCache',
+            'LOCATION': REDIS_URL,
+            # Heroku Redis serves TLS with a self-signed certificate
+            'OPTIONS': {'ssl_cert_reqs': None} if REDIS_URL.startswith('rediss://') else {},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.profiling.ProfiledLocMemCache',
+            'LOCATION': 'unique-snowflake',
+        }
     }
-}
 
 # Email domain for mail receiver
 EMAIL_DOMAIN = os.getenv('EMAIL_DOMAIN', 'zignal.se')
@@ -166,10 +182,65 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
 OPENAI_EMBEDDINGS_MODEL = os.getenv('OPENAI_EMBEDDINGS_MODEL', 'text-embedding-ada-002')
 
+# OpenAI request scheduling (see core/openai_scheduler.py)
+OPENAI_MAX_CONCURRENT_REQUESTS = int(os.getenv('OPENAI_MAX_CONCURRENT_REQUESTS', '8'))
+OPENAI_INTERACTIVE_RESERVED_SLOTS = int(os.getenv('OPENAI_INTERACTIVE_RESERVED_SLOTS', '2'))
+OPENAI_BATCH_QUOTA_RESERVE = float(os.getenv('OPENAI_BATCH_QUOTA_RESERVE', '0.2'))
+
+# LLM usage rows are buffered and written in batches (see core/llm_usage.py)
+LLM_USAGE_FLUSH_SIZE = int(os.getenv('LLM_USAGE_FLUSH_SIZE', '50'))
+LLM_USAGE_FLUSH_INTERVAL = int(os.getenv('LLM_USAGE_FLUSH_INTERVAL', '30'))  # Seconds
+
+# Pre-created OpenAI threads kept per company so a chat's first message doesn't wait on thread creation
+CHAT_THREAD_POOL_SIZE = int(os.getenv('CHAT_THREAD_POOL_SIZE', '2'))
+CHAT_THREAD_POOL_MAX_AGE_DAYS = int(os.getenv('CHAT_THREAD_POOL_MAX_AGE_DAYS', '7'))
+
+# Company assistants and vector stores are created in the background after signup
+COMPANY_AI_PROVISION_MAX_RETRIES = int(os.getenv('COMPANY_AI_PROVISION_MAX_RETRIES', '3'))
+COMPANY_AI_PROVISION_BACKOFF = int(os.getenv('COMPANY_AI_PROVISION_BACKOFF', '5'))  # Seconds, doubled per retry
+# Pre-created assistant/vector store pairs handed to new companies at signup (0 disables the pool)
+COMPANY_AI_POOL_SIZE = int(os.getenv('COMPANY_AI_POOL_SIZE', '0'))
+
+# Vector store reconciliation (manage.py reconcile_vector_stores)
+VECTOR_STORE_STUCK_AFTER_MINUTES = int(os.getenv('VECTOR_STORE_STUCK_AFTER_MINUTES', '60'))  # Pending/processing longer than this is requeued
+VECTOR_STORE_ORPHAN_GRACE_MINUTES = int(os.getenv('VECTOR_STORE_ORPHAN_GRACE_MINUTES', '60'))  # Unreferenced remote files younger than this are kept
+VECTOR_STORE_MAX_ATTEMPTS = int(os.getenv('VECTOR_STORE_MAX_ATTEMPTS', '3'))  # Requeues per file before it is left failed
+VECTOR_STORE_SYNC_CONCURRENCY = int(os.getenv('VECTOR_STORE_SYNC_CONCURRENCY', '4'))
+
+# Dashboard snapshots are invalidated by signals; with a shared cache the timeout only catches
+# changes that bypass them, with per-process caches it bounds how stale other processes can be
+DASHBOARD_SNAPSHOT_TIMEOUT = int(os.getenv('DASHBOARD_SNAPSHOT_TIMEOUT', '900' if REDIS_URL else '60'))  # Seconds
+PORTFOLIO_STATS_TIMEOUT = int(os.getenv('PORTFOLIO_STATS_TIMEOUT', '300'))  # Seconds
+
+# Data file chunking and embedding
+GENERATE_FILE_EMBEDDINGS = os.getenv('GENERATE_FILE_EMBEDDINGS', 'True') == 'True'
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '256'))  # Chunks per embeddings API call
+EMBEDDING_CHUNK_SIZE = int(os.getenv('EMBEDDING_CHUNK_SIZE', '2000'))  # Characters per chunk
+EMBEDDING_CHUNK_OVERLAP = int(os.getenv('EMBEDDING_CHUNK_OVERLAP', '200'))
+
+# Document excerpts included in report prompts
+REPORT_CONTEXT_TOKEN_BUDGET = int(os.getenv('REPORT_CONTEXT_TOKEN_BUDGET', '6000'))
+REPORT_CONTEXT_CHUNKS_PER_SECTION = int(os.getenv('REPORT_CONTEXT_CHUNKS_PER_SECTION', '8'))
+
+# Multi-section templates are generated one section per completion
+REPORT_SECTION_CONCURRENCY = int(os.getenv('REPORT_SECTION_CONCURRENCY', '4'))
+REPORT_SECTION_MAX_TOKENS = int(os.getenv('REPORT_SECTION_MAX_TOKENS', '1500'))
+
+# Document validation against template REQUIRE blocks
+DOCUMENT_VALIDATION_CONCURRENCY = int(os.getenv('DOCUMENT_VALIDATION_CONCURRENCY', '8'))
+DOCUMENT_VALIDATION_MAX_IN_FLIGHT = int(os.getenv('DOCUMENT_VALIDATION_MAX_IN_FLIGHT', '4'))
+
 # Meeting BaaS API Configuration
 MEETINGBAAS_API_KEY = os.getenv('MEETINGBAAS_API_KEY', '')
 MEETINGBAAS_API_URL = os.getenv('MEETINGBAAS_API_URL', 'https://api.meetingbaas.com/v1')
+MEETINGBAAS_CONNECT_TIMEOUT = float(os.getenv('MEETINGBAAS_CONNECT_TIMEOUT', '3.05'))
+MEETINGBAAS_READ_TIMEOUT = float(os.getenv('MEETINGBAAS_READ_TIMEOUT', '15'))
+MEETINGBAAS_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('MEETINGBAAS_CIRCUIT_FAILURE_THRESHOLD', '5'))
+MEETINGBAAS_CIRCUIT_RESET_TIMEOUT = int(os.getenv('MEETINGBAAS_CIRCUIT_RESET_TIMEOUT', '30'))
+MEETINGBAAS_BULK_CONCURRENCY = int(os.getenv('MEETINGBAAS_BULK_CONCURRENCY', '4'))
 GENERATE_MEETING_SUMMARIES = os.getenv('GENERATE_MEETING_SUMMARIES', 'True') == 'True'
+MEETING_SUMMARY_CHUNK_SIZE = int(os.getenv('MEETING_SUMMARY_CHUNK_SIZE', '12000'))  # Characters per summarised chunk
+MEETING_SUMMARY_CONCURRENCY = int(os.getenv('MEETING_SUMMARY_CONCURRENCY', '4'))
 
 # Host URL for webhooks in production
 HOST_URL = os.getenv('HOST_URL', 'http://localhost:8000')
@@ -222,8 +293,9 @@ MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/{AWS_LOCATION}/" if AWS_S3_CUSTOM_D
 
 # Create customized S3 storage with our configured settings
 from storages.backends.s3boto3 import S3Boto3Storage
+from core.profiling import ProfiledStorageMixin
 
-class MediaStorage(S3Boto3Storage):
+class MediaStorage(ProfiledStorageMixin, S3Boto3Storage):
     location = AWS_LOCATION
     file_overwrite = AWS_S3_FILE_OVERWRITE
     default_acl = AWS_DEFAULT_ACL
@@ -306,6 +378,33 @@ PROCESS_EMAILS_SYNC = True
 # Replace task queue with synchronous processing
 USE_SYNCHRONOUS_TASKS = True
 
+# Request profiling (core.middleware.ProfilingMiddleware): Server-Timing headers and a
+# JSON log line per request with SQL, cache and external call (OpenAI, S3, Mailgun, Meeting BaaS) timings
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+# Maximum queries per view, by URL name; going over is logged, and raises when PROFILING_STRICT is set (CI)
+PROFILING_QUERY_BUDGETS = {
+    'dashboard': 25,
+    'portfolio_stats': 10,
+    'datasilo:silo_detail': 25,
+    'chat:thread_list': 5,
+    'chat:message_list': 5,
+    'agents:conversation_list': 5,
+    'agents:message_list': 5,
+}
+PROFILING_STRICT = os.getenv('PROFILING_STRICT', 'False') == 'True'
+
+# Long-running jobs (report generation etc.) run on an in-process thread pool
+BACKGROUND_TASK_WORKERS = int(os.getenv('BACKGROUND_TASK_WORKERS', '4'))
+RUN_BACKGROUND_TASKS_INLINE = os.getenv('RUN_BACKGROUND_TASKS_INLINE', 'False') == 'True'
+# Reports stuck in 'generating' longer than this (seconds) may be restarted
+REPORT_GENERATION_TIMEOUT = int(os.getenv('REPORT_GENERATION_TIMEOUT', '900'))
+
+# Report schedules (run with `manage.py run_report_schedules`)
+REPORT_SCHEDULE_HOUR = int(os.getenv('REPORT_SCHEDULE_HOUR', '6'))  # UTC hour scheduled reports run at
+REPORT_SCHEDULE_BATCH_SIZE = int(os.getenv('REPORT_SCHEDULE_BATCH_SIZE', '100'))
+REPORT_SCHEDULE_COMPANY_CONCURRENCY = int(os.getenv('REPORT_SCHEDULE_COMPANY_CONCURRENCY', '2'))
+REPORT_SCHEDULE_STALE_MINUTES = int(os.getenv('REPORT_SCHEDULE_STALE_MINUTES', '30'))  # Generating without progress this long is requeued
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -417,7 +516,7 @@ if DEBUG:
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # Email settings - Production with Mailgun
 else:
-    EMAIL_BACKEND = 'anymail.backends.mailgun.EmailBackend'
+    EMAIL_BACKEND = 'core.email_backends.MailgunEmailBackend'
     ANYMAIL = {
         "MAILGUN_API_KEY": os.getenv('MAILGUN_API_KEY', ''),
         "MAILGUN_SENDER_DOMAIN": os.getenv('MAILGUN_DOMAIN', ''),
@@ -38,6 +38,7 @@ urlpatterns = [
     path('dashboard/files/', views.file_management, name='file_management'),
     path('dashboard/reports/', views.report_management, name='report_management'),
     path('dashboard/company-silo/', views.redirect_to_company_silo, name='company_silo'),
+    path('dashboard/api/portfolio-stats/', views.portfolio_stats, name='portfolio_stats'),
     
     # Test view
     path('test/', views.test_view, name='test_view'),
@@ -2,7 +2,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from allauth.account.forms import SignupForm
 from django.contrib.auth import get_user_model
 from django.conf import settings
@@ -11,13 +11,12 @@ import uuid
 from django.core.cache import cache
 
 # Import necessary models
-from companies.models import Company
 from projects.models import Project
 from reports.models import Report
 from datasilo.models import DataFile, DataSilo
-from agents.models import MeetingTranscript
 from profiles.models import Profile
 from django.db.models import Count
+from core.dashboard import get_company_snapshot, get_portfolio_snapshot, get_portfolio_stats
 
 User = get_user_model()
 
@@ -53,13 +52,8 @@ def dashboard(request):
     if user.user_type == 'portfolio_manager':
         print("Rendering PORTFOLIO MANAGER dashboard")
         # Portfolio managers only see companies
-        companies = Company.objects.filter(user_relations__user=user)
-        company_count = companies.count()
-        
-        # Don't fetch projects for portfolio managers
-        project_count = 0
-        report_count = 0
-        recent_reports = []
+        snapshot = get_portfolio_snapshot(user)
+        stats = get_portfolio_stats(user)
         
         # Recent activities would be determined by a separate model
         # For now, we'll pass empty data
@@ -68,11 +62,12 @@ def dashboard(request):
         return render(request, 'dashboard/portfolio_dashboard.html', {
             'user': user,
             'profile': profile,
-            'companies': companies,
-            'company_count': company_count,
-            'project_count': project_count,
-            'report_count': report_count,
-            'recent_reports': recent_reports,
+            'companies': snapshot['companies'],
+            'company_count': snapshot['company_count'],
+            'project_count': snapshot['project_count'],
+            'report_count': snapshot['report_count'],
+            'recent_reports': snapshot['recent_reports'],
+            'stats': stats['totals'],
             'recent_activities': recent_activities,
         })
     else:
@@ -84,35 +79,22 @@ def dashboard(request):
         
         # If no company is found through profile, try to get it through UserCompanyRelation
         if not company:
-            company_relation = user.company_relations.first()
+            company_relation = user.company_relations.select_related('company').first()
             if company_relation:
                 company = company_relation.company
         
-        if company:
-            projects = Project.objects.filter(company=company)
-            reports = Report.objects.filter(project__in=projects)
-            recent_reports = reports.order_by('-created_at')[:5]
-            
-            # Get data silos for the company
-            data_silos = DataSilo.objects.filter(company=company)
-            
-            # Get meeting transcripts for the company
-            meeting_transcripts = MeetingTranscript.objects.filter(company=company).order_by('-created_at')[:5]
-        else:
-            projects = Project.objects.none()
-            reports = Report.objects.none()
-            recent_reports = []
-            data_silos = DataSilo.objects.none()
-            meeting_transcripts = MeetingTranscript.objects.none()
+        # Everything below the company itself comes from the cached snapshot
+        snapshot = get_company_snapshot(company.id) if company else None
         
         return render(request, 'dashboard/company_dashboard.html', {
             'user': user,
             'profile': profile,
             'company': company,
-            'projects': projects,
-            'reports': recent_reports,
-            'data_silos': data_silos,
-            'meeting_transcripts': meeting_transcripts,
+            'counts': snapshot['counts'] if snapshot else {},
+            'projects': snapshot['projects'] if snapshot else [],
+            'reports': snapshot['recent_reports'] if snapshot else [],
+            'data_silos': snapshot['silos'] if snapshot else [],
+            'meeting_transcripts': snapshot['recent_meetings'] if snapshot else [],
         })
 
 def test_template(request):
@@ -180,6 +162,22 @@ def portfolio_manager_chat(request):
         # Redirect non-portfolio managers
         return redirect('dashboard')
 
+@login_required
+@require_GET
+def portfolio_stats(request):
+    """
+    Aggregate statistics across the portfolio manager's companies: files and
+    their processing status, reports by status, and meetings and emails
+    received over the last 7, 30 and 90 days
+    
+    Returns:
+        JsonResponse: Per-company statistics and portfolio totals
+    """
+    if not is_portfolio_manager(request.user):
+        return JsonResponse({'error': 'Only portfolio managers can view portfolio statistics'}, status=403)
+    
+    return JsonResponse(get_portfolio_stats(request.user))
+
 @login_required
 def file_management(request):
     """View for file management dashboard"""
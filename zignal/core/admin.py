@@ -1,3 +1,48 @@
 from django.contrib import admin
+from django.db.models import Avg, Count, Sum
 
-# Register your models here.
+from .llm_usage import flush_llm_usage
+from .models import LLMCall
+
+
+@admin.register(LLMCall)
+class LLMCallAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'feature', 'company', 'model', 'prompt_tokens', 'completion_tokens',
+                    'ttft_ms', 'latency_ms', 'retries', 'status_code')
+    list_filter = ('feature', 'model', 'status_code', 'company')
+    date_hierarchy = 'created_at'
+    list_select_related = ('company',)
+    change_list_template = 'admin/core/llmcall/change_list.html'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def changelist_view(self, request, extra_context=None):
+        # Include this process's buffered calls
+        flush_llm_usage()
+        
+        response = super().changelist_view(request, extra_context=extra_context)
+        try:
+            queryset = response.context_data['cl'].queryset
+        except (AttributeError, KeyError):
+            return response
+        
+        aggregates = dict(
+            calls=Count('id'),
+            prompt_tokens=Sum('prompt_tokens'),
+            completion_tokens=Sum('completion_tokens'),
+            avg_ttft_ms=Avg('ttft_ms'),
+            avg_latency_ms=Avg('latency_ms'),
+            retries=Sum('retries'),
+        )
+        response.context_data['usage_totals'] = queryset.aggregate(**aggregates)
+        response.context_data['usage_by_feature'] = (
+            queryset.order_by().values('feature', 'model').annotate(**aggregates).order_by('-prompt_tokens')
+        )
+        response.context_data['usage_by_company'] = (
+            queryset.order_by().values('company__name').annotate(**aggregates).order_by('-prompt_tokens')[:20]
+        )
+        return response
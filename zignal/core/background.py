@@ -0,0 +1,67 @@
+"""
+In-process background job runner.
+
+The app runs without a Celery worker (see USE_SYNCHRONOUS_TASKS), so long-running
+task functions from core/tasks.py are handed to a small thread pool instead of
+running inside the request. Jobs must be idempotent and take ids rather than model
+instances, since they run on their own database connection.
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 4),
+                thread_name_prefix='zignal-bg'
+            )
+        return _executor
+
+
+def _run_job(func, args, kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    except Exception as e:
+        logger.exception(f"Background job {func.__name__} failed: {str(e)}")
+        raise
+    finally:
+        # Worker threads keep their own connection; don't leave it open between jobs
+        connection.close()
+
+
+def run_in_background(func, *args, **kwargs) -> Future:
+    """
+    Run a task function outside the request/response cycle
+
+    Args:
+        func: Task function to call
+        *args, **kwargs: Arguments for the task function
+
+    Returns:
+        Future: Future for the job's result
+    """
+    if getattr(settings, 'RUN_BACKGROUND_TASKS_INLINE', False):
+        # Used by management commands and local debugging
+        future = Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            logger.exception(f"Inline job {func.__name__} failed: {str(e)}")
+            future.set_exception(e)
+        return future
+
+    logger.info(f"Queueing background job {func.__name__}")
+    return _get_executor().submit(_run_job, func, args, kwargs)
@@ -0,0 +1,74 @@
+"""
+Offline benchmark suite (see the benchmark management command)
+
+The scenarios in core.benchmarks.scenarios run against a throwaway database,
+a local fake OpenAI server (core.benchmarks.fake_openai), an in-memory stand-in
+for S3 (core.benchmarks.object_storage) and generated Mailgun webhooks
+(core.benchmarks.mailgun), so results depend only on the code and the machine.
+Results are summarised as latency percentiles and written as JSON that can be
+compared against a run from another commit.
+"""
+import math
+from typing import Any, Dict, List
+
+
+def percentile(sorted_samples: List[float], percent: float) -> float:
+    """Nearest-rank percentile of samples sorted in ascending order"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """
+    Latency statistics for a metric
+
+    Args:
+        samples: Durations in seconds
+
+    Returns:
+        dict: count, and mean, min, max, p50, p95 and p99 in milliseconds
+    """
+    ordered = sorted(samples)
+    to_ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        'count': len(ordered),
+        'mean_ms': to_ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+        'min_ms': to_ms(ordered[0]) if ordered else 0.0,
+        'max_ms': to_ms(ordered[-1]) if ordered else 0.0,
+        'p50_ms': to_ms(percentile(ordered, 50)),
+        'p95_ms': to_ms(percentile(ordered, 95)),
+        'p99_ms': to_ms(percentile(ordered, 99)),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[Dict[str, Any]]:
+    """
+    Compare the metrics of two benchmark results
+
+    Args:
+        current: Result of this run
+        baseline: Result to compare against
+        max_regression: Allowed slowdown of p50 and p95, as a fraction (0.1 = 10%)
+
+    Returns:
+        list: Per metric present in both, the p50/p95 change as a fraction and
+            whether it regressed beyond max_regression
+    """
+    comparisons = []
+    for name, stats in current.get('metrics', {}).items():
+        before = baseline.get('metrics', {}).get(name)
+        if not before:
+            continue
+        changes = {
+            key: (stats[key] - before[key]) / before[key] if before[key] else 0.0
+            for key in ('p50_ms', 'p95_ms')
+        }
+        comparisons.append({
+            'metric': name,
+            'p50_change': changes['p50_ms'],
+            'p95_change': changes['p95_ms'],
+            'regressed': any(change > max_regression for change in changes.values()),
+        })
+    return comparisons
@@ -0,0 +1,268 @@
+"""
+Local stand-in for the OpenAI API
+
+A small HTTP server that answers the endpoints the app uses with canned,
+deterministic responses after a fixed delay, so benchmarks measure our code
+rather than the network. Point the SDK at it with OPENAI_BASE_URL.
+
+- chat completions: ttft before the first token, then token_interval per
+  token; streamed as server-sent events when the request asks for a stream
+- embeddings: vectors derived from a hash of the input text
+- files, vector stores, assistants, threads: objects with sequential IDs
+  after latency, lists come back empty
+"""
+import hashlib
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# Object type and ID prefix by the last static segment of the request path
+OBJECT_TYPES = {
+    'files': ('file', 'file'),
+    'vector_stores': ('vector_store', 'vs'),
+    'file_batches': ('vector_store.file_batch', 'vsfb'),
+    'assistants': ('assistant', 'asst'),
+    'threads': ('thread', 'thread'),
+    'messages': ('thread.message', 'msg'),
+    'runs': ('thread.run', 'run'),
+}
+
+WORDS = ('revenue', 'growth', 'quarter', 'margin', 'pipeline', 'customers', 'forecast', 'risk',
+         'team', 'product', 'market', 'cash', 'burn', 'hiring', 'board', 'update')
+
+
+class FakeOpenAIServer:
+    """
+    Fake OpenAI API on a local port, served from a background thread
+
+    Args:
+        latency: Seconds before answering any non-completion request
+        ttft: Seconds before the first completion token
+        token_interval: Seconds between completion tokens
+        completion_tokens: Tokens in each completion
+        embedding_dimensions: Length of the embedding vectors
+    """
+
+    def __init__(self,
+                 latency: float = 0.05,
+                 ttft: float = 0.3,
+                 token_interval: float = 0.01,
+                 completion_tokens: int = 100,
+                 embedding_dimensions: int = 1536):
+        self.latency = latency
+        self.ttft = ttft
+        self.token_interval = token_interval
+        self.completion_tokens = completion_tokens
+        self.embedding_dimensions = embedding_dimensions
+        self.requests = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'FakeOpenAIServer':
+        server = self
+
+        class Handler(_Handler):
+            fake = server
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-openai', daemon=True)
+        self._thread.start()
+        logger.info(f"Fake OpenAI API listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def next_id(self, prefix: str) -> str:
+        with self._lock:
+            self.requests += 1
+            return f"{prefix}_bench{next(self._ids)}"
+
+    def completion_text(self) -> str:
+        return ' '.join(WORDS[i % len(WORDS)] for i in range(self.completion_tokens))
+
+    def embedding(self, text: str):
+        seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+        generator = random.Random(seed)
+        return [round(generator.uniform(-1, 1), 6) for _ in range(self.embedding_dimensions)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    fake: FakeOpenAIServer = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._read_body()
+        time.sleep(self.fake.latency)
+        if self._is_collection():
+            self._send_json({'object': 'list', 'data': [], 'first_id': None, 'last_id': None, 'has_more': False})
+        else:
+            self._send_json(self._object())
+
+    def do_DELETE(self):
+        self._read_body()
+        time.sleep(self.fake.latency)
+        object_type, _ = self._object_type()
+        self._send_json({'id': self.path.rstrip('/').rsplit('/', 1)[-1], 'object': f'{object_type}.deleted', 'deleted': True})
+
+    def do_POST(self):
+        body = self._read_body()
+        path = self.path.split('?')[0]
+        if path.endswith('/chat/completions'):
+            payload = json.loads(body or b'{}')
+            if payload.get('stream'):
+                self._stream_completion(payload)
+            else:
+                self._completion(payload)
+        elif path.endswith('/embeddings'):
+            self._embeddings(json.loads(body or b'{}'))
+        else:
+            time.sleep(self.fake.latency)
+            self._send_json(self._object(size=len(body)))
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _segments(self):
+        return [segment for segment in self.path.split('?')[0].split('/') if segment and segment != 'v1']
+
+    def _is_collection(self) -> bool:
+        segments = self._segments()
+        return bool(segments) and segments[-1] in OBJECT_TYPES
+
+    def _object_type(self):
+        for segment in reversed(self._segments()):
+            if segment in OBJECT_TYPES:
+                return OBJECT_TYPES[segment]
+        return ('object', 'obj')
+
+    def _object(self, size: int = 0) -> Dict[str, Any]:
+        object_type, prefix = self._object_type()
+        segments = self._segments()
+        # GET /vector_stores/vs_1 returns the object asked for; anything else is a new object
+        object_id = segments[-1] if self.command == 'GET' and re.match(r'^[a-z]+_', segments[-1]) else self.fake.next_id(prefix)
+        return {
+            'id': object_id,
+            'object': object_type,
+            'created_at': int(time.time()),
+            'status': 'completed',
+            'bytes': size,
+            'filename': 'upload',
+            'purpose': 'assistants',
+            'file_counts': {'in_progress': 0, 'completed': 1, 'failed': 0, 'cancelled': 0, 'total': 1},
+            'usage_bytes': size,
+            'metadata': {},
+        }
+
+    def _usage(self, payload) -> Dict[str, int]:
+        prompt_tokens = len(json.dumps(payload.get('messages', ''))) // 4
+        return {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': self.fake.completion_tokens,
+            'total_tokens': prompt_tokens + self.fake.completion_tokens,
+        }
+
+    def _completion(self, payload):
+        time.sleep(self.fake.ttft + self.fake.token_interval * self.fake.completion_tokens)
+        self._send_json({
+            'id': self.fake.next_id('chatcmpl'),
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'gpt-4o-mini'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': self.fake.completion_text()},
+                'finish_reason': 'stop',
+            }],
+            'usage': self._usage(payload),
+        })
+
+    def _stream_completion(self, payload):
+        completion_id = self.fake.next_id('chatcmpl')
+        model = payload.get('model', 'gpt-4o-mini')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+
+        def send(chunk):
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        time.sleep(self.fake.ttft)
+        for index, word in enumerate(self.fake.completion_text().split(' ')):
+            if index:
+                time.sleep(self.fake.token_interval)
+            send({
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{'index': 0, 'delta': {'content': word + ' '}, 'finish_reason': None}],
+            })
+        if (payload.get('stream_options') or {}).get('include_usage'):
+            send({
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [],
+                'usage': self._usage(payload),
+            })
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _embeddings(self, payload):
+        time.sleep(self.fake.latency)
+        inputs = payload.get('input', '')
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        tokens = sum(len(str(text)) // 4 for text in inputs)
+        self._send_json({
+            'object': 'list',
+            'model': payload.get('model', 'text-embedding-ada-002'),
+            'data': [
+                {'object': 'embedding', 'index': index, 'embedding': self.fake.embedding(str(text))}
+                for index, text in enumerate(inputs)
+            ],
+            'usage': {'prompt_tokens': tokens, 'total_tokens': tokens},
+        })
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,54 @@
+"""
+Generator for Mailgun inbound webhook payloads
+"""
+import hashlib
+import hmac
+import random
+import time
+from typing import Dict, Iterator
+
+from core.benchmarks.fake_openai import WORDS
+
+
+def mailgun_payloads(count: int,
+                     recipient: str,
+                     api_key: str = '',
+                     body_words: int = 400,
+                     seed: int = 0) -> Iterator[Dict[str, str]]:
+    """
+    Deterministic inbound email payloads as Mailgun posts them to the webhook
+
+    Args:
+        count: Number of payloads
+        recipient: The address the emails are sent to
+        api_key: Mailgun API key to sign the payloads with (MAILGUN_API_KEY)
+        body_words: Words in each email body
+        seed: Seed for the generated text
+
+    Yields:
+        dict: Form fields of one webhook request
+    """
+    generator = random.Random(seed)
+    for index in range(count):
+        body = ' '.join(generator.choice(WORDS) for _ in range(body_words))
+        token = f"{seed:04d}{index:08d}" + hashlib.sha256(f"{seed}-{index}".encode('utf-8')).hexdigest()[:38]
+        timestamp = str(int(time.time()))
+        signature = hmac.new(
+            key=api_key.encode('utf-8'),
+            msg=f"{timestamp}{token}".encode('utf-8'),
+            digestmod=hashlib.sha256
+        ).hexdigest()
+        yield {
+            'sender': f"founder{index % 50}@example.com",
+            'recipient': recipient,
+            'subject': f"Monthly update {index}",
+            'body-plain': body,
+            'body-html': f"<p>{body}</p>",
+            'stripped-text': body,
+            'stripped-html': f"<p>{body}</p>",
+            'Message-Id': f"<bench-{seed}-{index}@example.com>",
+            'timestamp': timestamp,
+            'token': token,
+            'signature': signature,
+            'attachment-count': '0',
+        }
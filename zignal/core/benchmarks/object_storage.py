@@ -0,0 +1,39 @@
+"""
+In-process stand-in for the S3 media storage
+"""
+import time
+
+from django.core.files.storage import InMemoryStorage
+
+from core.profiling import ProfiledStorageMixin
+
+
+class InMemoryObjectStorage(ProfiledStorageMixin, InMemoryStorage):
+    """
+    Keeps files in memory and adds a fixed delay to each remote operation, in
+    place of MediaStorage
+
+    The class name deliberately avoids "S3": process_file_for_vector_store
+    picks its download path by the storage class name, and the in-memory
+    files are read through the storage like local ones.
+    """
+
+    def __init__(self, latency: float = 0.02, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+
+    def _save(self, name, content):
+        time.sleep(self.latency)
+        return super()._save(name, content)
+
+    def _open(self, name, mode='rb'):
+        time.sleep(self.latency)
+        return super()._open(name, mode)
+
+    def delete(self, name):
+        time.sleep(self.latency)
+        return super().delete(name)
+
+    def exists(self, name):
+        time.sleep(self.latency)
+        return super().exists(name)
@@ -0,0 +1,225 @@
+"""
+Benchmark scenarios
+
+Each scenario runs a hot path end to end through the app's own code (views
+through the test client, task functions directly) against the fake OpenAI
+server and the in-memory object storage. It returns its samples (seconds) per
+metric, the number of errors, and optionally the number of operations (when
+it is not one per iteration) and bytes processed.
+"""
+import itertools
+import time
+from typing import Any, Callable, Dict, List
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import Client, override_settings
+
+from core.benchmarks.fake_openai import WORDS
+from core.benchmarks.mailgun import mailgun_payloads
+
+
+class BenchmarkData:
+    """
+    The rows the scenarios work on, created in the benchmark database
+
+    A company user with one company, and a portfolio manager who is a member of
+    that company and `companies - 1` others, each with projects, files and reports.
+    """
+
+    def __init__(self, companies: int = 10, file_size: int = 64 * 1024, seed: int = 0):
+        from agents.models import Agent
+        from companies.models import Company, UserCompanyRelation
+        from datasilo.models import DataFile, DataSilo
+        from projects.models import Project
+        from reports.models import Report, ReportTemplate
+        from users.models import User
+
+        self.file_size = file_size
+        self.seed = seed
+        self._sequence = itertools.count(1)
+        self.user = User.objects.create_user(
+            username='bench-user', email='bench-user@example.com', password='bench', user_type='company_user'
+        )
+        self.manager = User.objects.create_user(
+            username='bench-manager', email='bench-manager@example.com', password='bench', user_type='portfolio_manager'
+        )
+
+        self.companies = []
+        for index in range(companies):
+            company = Company.objects.create(
+                name=f"Benchmark Company {index}",
+                company_email=f"bench{index}",
+                openai_assistant_id=f"asst_bench{index}",
+                openai_vector_store_id=f"vs_bench{index}",
+                ai_status='ready',
+            )
+            UserCompanyRelation.objects.create(user=self.manager, company=company, role='member')
+            project = Project.objects.create(name=f"Benchmark Project {index}", company=company)
+            silo = DataSilo.objects.create(name=f"Benchmark Silo {index}", company=company)
+            DataFile.objects.bulk_create([
+                DataFile(
+                    name=f"existing-{index}-{number}.txt",
+                    file=f"benchmark/existing-{index}-{number}.txt",
+                    data_silo=silo,
+                    project=project,
+                    company=company,
+                    size=file_size,
+                    vector_store_status='processed',
+                )
+                for number in range(20)
+            ])
+            Report.objects.bulk_create([
+                Report(
+                    title=f"Existing report {index}-{number}",
+                    slug=f"existing-report-{index}-{number}",
+                    project=project,
+                    company=company,
+                    status='generated',
+                    created_by=self.manager,
+                )
+                for number in range(10)
+            ])
+            self.companies.append(company)
+
+        self.company = self.companies[0]
+        UserCompanyRelation.objects.create(user=self.user, company=self.company, role='owner')
+        self.silo = DataSilo.objects.filter(company=self.company).first()
+        self.agent = Agent.objects.create(name='Benchmark Agent', company=self.company)
+        self.template = ReportTemplate.objects.create(
+            name='Benchmark Template',
+            template_content='\n\n'.join(
+                f"## {heading}\nSummarise the company's {heading.lower()} for the period."
+                for heading in ('Highlights', 'Financials', 'Risks', 'Outlook')
+            ),
+            company=self.company,
+        )
+
+    def next_index(self) -> int:
+        """A number unique across scenario runs, for names and slugs"""
+        return next(self._sequence)
+
+    def file_content(self, index: int) -> bytes:
+        words = ' '.join(WORDS[(index + offset) % len(WORDS)] for offset in range(self.file_size // 6))
+        return words.encode('utf-8')[:self.file_size]
+
+
+def _time(func: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def upload_and_ingest(data: BenchmarkData, iterations: int) -> Dict[str, Any]:
+    """Save an uploaded file to storage and add it to the company's vector store"""
+    from core.tasks import process_file_for_vector_store
+    from datasilo.models import DataFile
+
+    samples, errors, total_bytes = [], 0, 0
+    for _ in range(iterations):
+        index = data.next_index()
+        content = data.file_content(index)
+        started = time.perf_counter()
+        data_file = DataFile.objects.create(
+            name=f"upload-{index}.txt",
+            file=ContentFile(content, name=f"upload-{index}.txt"),
+            data_silo=data.silo,
+            size=len(content),
+        )
+        result = process_file_for_vector_store(data_file.id, max_retries=0)
+        samples.append(time.perf_counter() - started)
+        total_bytes += len(content)
+        if not result.get('success'):
+            errors += 1
+    return {'metrics': {'ingest': samples}, 'errors': errors, 'bytes': total_bytes}
+
+
+def chat_streaming(data: BenchmarkData, iterations: int) -> Dict[str, Any]:
+    """Stream a chat completion through the agents stream endpoint: time to first token and to the end"""
+    from agents.models import Conversation
+
+    client = Client()
+    client.force_login(data.user)
+    first_token, complete, errors = [], [], 0
+    for index in range(iterations):
+        conversation = Conversation.objects.create(agent=data.agent, user=data.user, title=f"Benchmark {index}")
+        started = time.perf_counter()
+        response = client.get(f"/api/conversations/{conversation.id}/stream/", {'message': 'How did the quarter go?'})
+        chunks = iter(response.streaming_content)
+        first = next(chunks, b'')
+        first_token.append(time.perf_counter() - started)
+        for _ in chunks:
+            pass
+        complete.append(time.perf_counter() - started)
+        if response.status_code != 200 or b'Error:' in first:
+            errors += 1
+    return {'metrics': {'chat_ttft': first_token, 'chat_total': complete}, 'errors': errors}
+
+
+def report_generation(data: BenchmarkData, iterations: int) -> Dict[str, Any]:
+    """Generate a four-section report from its template"""
+    from core.tasks import generate_report
+    from reports.models import Report
+
+    samples, errors = [], 0
+    for _ in range(iterations):
+        index = data.next_index()
+        report = Report.objects.create(
+            title=f"Benchmark report {index}",
+            template=data.template,
+            company=data.company,
+            created_by=data.user,
+        )
+        samples.append(_time(lambda: generate_report(report.id)))
+        if not Report.objects.filter(id=report.id, status='generated').exists():
+            errors += 1
+    return {'metrics': {'report_generation': samples}, 'errors': errors}
+
+
+def inbound_email(data: BenchmarkData, iterations: int) -> Dict[str, Any]:
+    """Post Mailgun webhooks for a company's address, processed synchronously"""
+    from django.conf import settings
+
+    client = Client()
+    samples, errors = [], 0
+    recipient = f"{data.company.company_email}@{getattr(settings, 'EMAIL_DOMAIN', 'zignal.se')}"
+    payloads = mailgun_payloads(
+        iterations, recipient, getattr(settings, 'MAILGUN_API_KEY', '') or '', seed=data.seed + data.next_index()
+    )
+    with override_settings(DEBUG=True, PROCESS_EMAILS_SYNC=True):
+        for payload in payloads:
+            started = time.perf_counter()
+            response = client.post('/mail/webhook/', payload)
+            samples.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+    return {'metrics': {'inbound_email': samples}, 'errors': errors}
+
+
+def dashboard(data: BenchmarkData, iterations: int) -> Dict[str, Any]:
+    """Render the company and portfolio dashboards, with cold and warm snapshot caches"""
+    metrics: Dict[str, List[float]] = {}
+    errors = 0
+    for name, user in (('dashboard', data.user), ('portfolio_dashboard', data.manager)):
+        client = Client()
+        client.force_login(user)
+        for state in ('cold', 'warm'):
+            samples = metrics.setdefault(f"{name}_{state}", [])
+            for _ in range(iterations):
+                if state == 'cold':
+                    cache.clear()
+                started = time.perf_counter()
+                response = client.get('/dashboard/')
+                samples.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+    return {'metrics': metrics, 'errors': errors, 'operations': sum(len(samples) for samples in metrics.values())}
+
+
+SCENARIOS = {
+    'ingest': upload_and_ingest,
+    'chat': chat_streaming,
+    'report': report_generation,
+    'email': inbound_email,
+    'dashboard': dashboard,
+}
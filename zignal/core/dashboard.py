@@ -0,0 +1,376 @@
+"""
+Materialised dashboard snapshots.
+
+The dashboards render from plain-dict snapshots kept in the cache instead of
+querying on every load. Company snapshots are built for any number of
+companies at once with grouped queries, and are dropped by the signal handlers
+in core/signals.py whenever a model they summarise changes, so only the
+affected company is rebuilt on the next load. A portfolio snapshot holds just
+the manager's company list; its numbers come from the company snapshots.
+
+Code that changes these models with QuerySet.update() or bulk_create() must call
+invalidate_company_snapshots() itself, since no signals are sent.
+
+Invalidation deletes the keys from the configured cache, so it only reaches the
+other web workers and the scheduler when that cache is shared (REDIS_URL).
+With per-process local memory caches DASHBOARD_SNAPSHOT_TIMEOUT defaults to a
+minute, which is then how long another process can serve a stale snapshot.
+
+Portfolio statistics (file processing, reports by status, meetings and emails
+over time windows) move with the clock and with processing status updates, so
+they are cached for a short time instead of being invalidated.
+"""
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+COMPANY_SNAPSHOT_KEY = 'dashboard:company:{}'
+PORTFOLIO_SNAPSHOT_KEY = 'dashboard:portfolio:{}'
+PORTFOLIO_STATS_KEY = 'dashboard:portfolio_stats:{}'
+
+# Number of recent reports and meetings kept per company
+RECENT_LIMIT = 5
+
+# Time windows, in days, for meeting and email counts
+STATS_WINDOWS = (7, 30, 90)
+
+
+def _timeout():
+    # Backstop for changes that bypass signals
+    return getattr(settings, 'DASHBOARD_SNAPSHOT_TIMEOUT', 60 * 15)
+
+
+def get_company_snapshot(company_id: int) -> Dict[str, Any]:
+    """Snapshot for one company, from the cache or freshly built"""
+    return get_company_snapshots([company_id])[company_id]
+
+
+def get_company_snapshots(company_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Snapshots for many companies, building all missing ones in one pass
+
+    Args:
+        company_ids: Company IDs
+
+    Returns:
+        Dict[int, Dict[str, Any]]: Snapshot per company ID
+    """
+    company_ids = list(company_ids)
+    keys = {COMPANY_SNAPSHOT_KEY.format(company_id): company_id for company_id in company_ids}
+    snapshots = {keys[key]: snapshot for key, snapshot in cache.get_many(list(keys)).items()}
+
+    missing = [company_id for company_id in company_ids if company_id not in snapshots]
+    if missing:
+        built = build_company_snapshots(missing)
+        cache.set_many(
+            {COMPANY_SNAPSHOT_KEY.format(company_id): snapshot for company_id, snapshot in built.items()},
+            _timeout()
+        )
+        snapshots.update(built)
+        logger.info(f"Built dashboard snapshots for {len(missing)} companies")
+
+    return snapshots
+
+
+def get_portfolio_snapshot(user) -> Dict[str, Any]:
+    """
+    Snapshot for a portfolio manager: their companies with per-company numbers,
+    portfolio totals and the most recent reports across all companies
+
+    Args:
+        user: The portfolio manager
+
+    Returns:
+        Dict[str, Any]: The portfolio snapshot
+    """
+    from companies.models import Company
+
+    key = PORTFOLIO_SNAPSHOT_KEY.format(user.id)
+    companies = cache.get(key)
+    if companies is None:
+        companies = list(
+            Company.objects.filter(user_relations__user=user)
+            .values('id', 'name', 'website', 'created_at')
+            .distinct()
+        )
+        cache.set(key, companies, _timeout())
+
+    snapshots = get_company_snapshots([company['id'] for company in companies])
+    rows = []
+    recent_reports = []
+    for company in companies:
+        snapshot = snapshots[company['id']]
+        rows.append(dict(company, **snapshot['counts']))
+        recent_reports.extend(dict(report, company_name=company['name']) for report in snapshot['recent_reports'])
+
+    recent_reports.sort(key=lambda report: report['created_at'], reverse=True)
+    return {
+        'companies': rows,
+        'company_count': len(rows),
+        'project_count': sum(row['project_count'] for row in rows),
+        'report_count': sum(row['report_count'] for row in rows),
+        'recent_reports': recent_reports[:RECENT_LIMIT],
+    }
+
+
+def get_portfolio_stats(user) -> Dict[str, Any]:
+    """
+    Aggregate statistics for all of a portfolio manager's companies
+
+    Args:
+        user: The portfolio manager
+
+    Returns:
+        Dict[str, Any]: Per-company statistics and portfolio totals
+    """
+    key = PORTFOLIO_STATS_KEY.format(user.id)
+    stats = cache.get(key)
+    if stats is not None:
+        return stats
+
+    companies = get_portfolio_snapshot(user)['companies']
+    by_company = build_company_stats([company['id'] for company in companies])
+
+    totals = _empty_stats()
+    for company_stats in by_company.values():
+        _add_stats(totals, company_stats)
+
+    stats = {
+        'companies': [
+            dict(by_company[company['id']], id=company['id'], name=company['name'])
+            for company in companies
+        ],
+        'totals': totals,
+        'windows': list(STATS_WINDOWS),
+        'generated_at': timezone.now().isoformat(),
+    }
+    cache.set(key, stats, getattr(settings, 'PORTFOLIO_STATS_TIMEOUT', 300))
+    return stats
+
+
+def build_company_stats(company_ids: List[int], now=None) -> Dict[int, Dict[str, Any]]:
+    """
+    Statistics for the given companies
+
+    Each model is read once with conditional aggregates grouped by company, so
+    the number of queries is fixed however many companies there are.
+
+    Args:
+        company_ids: Company IDs
+        now: Time the windows end at (defaults to now)
+
+    Returns:
+        Dict[int, Dict[str, Any]]: Statistics per company ID
+    """
+    from agents.models import MeetingTranscript
+    from datasilo.models import DataFile
+    from mail_receiver.models import IncomingEmail
+    from reports.models import Report
+
+    now = now or timezone.now()
+    stats = {company_id: _empty_stats() for company_id in company_ids}
+
+    files = (
+        DataFile.objects.filter(company_id__in=company_ids)
+        .values('company_id')
+        .annotate(
+            total=Count('id'),
+            total_size=Sum('size'),
+            processed=Count('id', filter=Q(status='processed')),
+            failed=Count('id', filter=Q(status='failed')),
+            vector_processed=Count('id', filter=Q(vector_store_status='processed')),
+            vector_failed=Count('id', filter=Q(vector_store_status='failed')),
+        )
+        .order_by()
+    )
+    for row in files:
+        company_id = row.pop('company_id')
+        row['total_size'] = row['total_size'] or 0
+        stats[company_id]['files'] = row
+
+    reports = (
+        Report.objects.filter(Q(company_id__in=company_ids) | Q(project__company_id__in=company_ids))
+        .annotate(owner_id=Coalesce('company_id', 'project__company_id'))
+        .values('owner_id', 'status')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for row in reports:
+        if row['owner_id'] in stats:
+            stats[row['owner_id']]['reports'][row['status']] = row['total']
+
+    for section, queryset, company_field, date_field in (
+        ('meetings', MeetingTranscript.objects.all(), 'company_id', 'created_at'),
+        ('emails', IncomingEmail.objects.all(), 'data_silo__company_id', 'received_at'),
+    ):
+        windows = {
+            f'last_{days}_days': Count('pk', filter=Q(**{f'{date_field}__gte': now - timedelta(days=days)}))
+            for days in STATS_WINDOWS
+        }
+        rows = (
+            queryset.filter(**{f'{company_field}__in': company_ids})
+            .values(company_field)
+            .annotate(total=Count('pk'), **windows)
+            .order_by()
+        )
+        for row in rows:
+            stats[row.pop(company_field)][section] = row
+
+    return stats
+
+
+def _empty_stats() -> Dict[str, Any]:
+    windows = {f'last_{days}_days': 0 for days in STATS_WINDOWS}
+    return {
+        'files': {
+            'total': 0,
+            'total_size': 0,
+            'processed': 0,
+            'failed': 0,
+            'vector_processed': 0,
+            'vector_failed': 0,
+        },
+        'reports': {},
+        'meetings': dict(windows, total=0),
+        'emails': dict(windows, total=0),
+    }
+
+
+def _add_stats(totals: Dict[str, Any], stats: Dict[str, Any]) -> None:
+    for section, values in stats.items():
+        for name, value in values.items():
+            totals[section][name] = totals[section].get(name, 0) + value
+
+
+def invalidate_company_snapshots(company_ids: Iterable[int]) -> None:
+    """Drop company snapshots once the current transaction commits"""
+    keys = [COMPANY_SNAPSHOT_KEY.format(company_id) for company_id in set(company_ids) if company_id]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_portfolio_snapshots(user_ids: Iterable[int]) -> None:
+    """Drop portfolio snapshots once the current transaction commits"""
+    keys = [PORTFOLIO_SNAPSHOT_KEY.format(user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def build_company_snapshots(company_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Build snapshots for the given companies
+
+    Every section is one grouped query across all the companies, so the number
+    of queries doesn't grow with the number of companies.
+
+    Returns:
+        Dict[int, Dict[str, Any]]: Snapshot per company ID
+    """
+    from agents.models import MeetingTranscript
+    from companies.models import UserCompanyRelation
+    from datasilo.models import DataSilo
+    from projects.models import Project
+    from reports.models import Report
+
+    snapshots = {
+        company_id: {
+            'counts': {
+                'member_count': 0,
+                'project_count': 0,
+                'report_count': 0,
+                'silo_count': 0,
+                'file_count': 0,
+                'meeting_count': 0,
+            },
+            'reports_by_status': {},
+            'projects': [],
+            'recent_reports': [],
+            'recent_meetings': [],
+            'silos': [],
+        }
+        for company_id in company_ids
+    }
+
+    members = (
+        UserCompanyRelation.objects.filter(company_id__in=company_ids)
+        .values('company_id').annotate(total=Count('id'))
+    )
+    for row in members:
+        snapshots[row['company_id']]['counts']['member_count'] = row['total']
+
+    projects = (
+        Project.objects.filter(company_id__in=company_ids)
+        .annotate(report_count=Count('reports'))
+        .values('id', 'company_id', 'name', 'slug', 'description', 'status', 'start_date', 'report_count')
+        .order_by('-created_at')
+    )
+    for project in projects:
+        snapshot = snapshots[project.pop('company_id')]
+        snapshot['projects'].append(project)
+        snapshot['counts']['project_count'] += 1
+
+    # Reports belong to a company directly or through their project
+    reports = Report.objects.filter(
+        Q(company_id__in=company_ids) | Q(project__company_id__in=company_ids)
+    ).annotate(owner_id=Coalesce('company_id', 'project__company_id'))
+
+    status_labels = dict(Report.STATUS_CHOICES)
+    for row in reports.values('owner_id', 'status').annotate(total=Count('id')).order_by():
+        snapshot = snapshots.get(row['owner_id'])
+        if snapshot is None:
+            continue
+        snapshot['reports_by_status'][row['status']] = row['total']
+        snapshot['counts']['report_count'] += row['total']
+
+    recent_reports = (
+        reports.annotate(position=Window(
+            RowNumber(), partition_by=[F('owner_id')], order_by=F('created_at').desc()
+        ))
+        .filter(position__lte=RECENT_LIMIT)
+        .values('owner_id', 'title', 'slug', 'status', 'created_at')
+        .order_by('owner_id', 'position')
+    )
+    for report in recent_reports:
+        snapshot = snapshots.get(report.pop('owner_id'))
+        if snapshot is not None:
+            report['status_display'] = status_labels.get(report['status'], report['status'])
+            snapshot['recent_reports'].append(report)
+
+    silos = (
+        DataSilo.objects.filter(company_id__in=company_ids)
+        .annotate(file_count=Count('files'), total_size=Sum('files__size'))
+        .values('id', 'company_id', 'name', 'slug', 'file_count', 'total_size')
+        .order_by('name')
+    )
+    for silo in silos:
+        snapshot = snapshots[silo.pop('company_id')]
+        silo['total_size'] = silo['total_size'] or 0
+        snapshot['silos'].append(silo)
+        snapshot['counts']['silo_count'] += 1
+        snapshot['counts']['file_count'] += silo['file_count']
+
+    meetings = MeetingTranscript.objects.filter(company_id__in=company_ids)
+    for row in meetings.values('company_id').annotate(total=Count('id')).order_by():
+        snapshots[row['company_id']]['counts']['meeting_count'] = row['total']
+
+    recent_meetings = (
+        meetings.annotate(position=Window(
+            RowNumber(), partition_by=[F('company_id')], order_by=F('created_at').desc()
+        ))
+        .filter(position__lte=RECENT_LIMIT)
+        .values('company_id', 'id', 'meeting_title', 'status', 'scheduled_time', 'created_at')
+        .order_by('company_id', 'position')
+    )
+    for meeting in recent_meetings:
+        snapshots[meeting.pop('company_id')]['recent_meetings'].append(meeting)
+
+    return snapshots
@@ -0,0 +1,11 @@
+from anymail.backends.mailgun import EmailBackend
+
+from core.profiling import track_external
+
+
+class MailgunEmailBackend(EmailBackend):
+    """Mailgun backend whose sends are timed in the request profile (see core.profiling)"""
+
+    def send_messages(self, email_messages):
+        with track_external('mailgun'):
+            return super().send_messages(email_messages)
@@ -0,0 +1,287 @@
+"""
+Token usage and latency instrumentation for LLM calls.
+
+Call sites wrap each logical call in track_llm_call(feature, company). The
+OpenAI transport from core.openai_scheduler reports every HTTP attempt made
+inside the block: the model, the usage block of the response, the time to the
+first response byte and any SDK retries. When the block exits one LLMCall row
+is buffered; rows are written with bulk_create in batches (see
+LLM_USAGE_FLUSH_SIZE and LLM_USAGE_FLUSH_INTERVAL) outside the caller's request.
+
+Completions made outside a tracked block are still recorded, attributed to
+the "other" feature.
+"""
+import atexit
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import httpx
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Endpoints whose responses carry a usage block
+METERED_PATHS = ('/chat/completions', '/embeddings', '/completions', '/responses')
+
+# Upper bound on response bytes kept for reading usage
+MAX_CAPTURED_BYTES = 2 * 1024 * 1024
+
+_current_call = ContextVar('llm_call', default=None)
+
+_buffer = []
+_buffer_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+class LLMCallRecorder:
+    """Measurements for one logical LLM call"""
+
+    def __init__(self, feature, company=None):
+        self.feature = feature
+        self.company_id = getattr(company, 'id', company)
+        self.model = ''
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.ttft_ms = None
+        self.retries = 0
+        self.status_code = None
+        self.attempts = 0
+        self.started = time.monotonic()
+        self._open_streams = 0
+        self._block_done = False
+        self._finished = False
+
+    def on_request(self, request):
+        self.attempts += 1
+        if request.headers.get('x-stainless-retry-count', '0') != '0':
+            self.retries += 1
+        model = _request_model(request)
+        if model:
+            self.model = model
+
+    def on_first_byte(self):
+        self.ttft_ms = int((time.monotonic() - self.started) * 1000)
+
+    def on_response(self, status_code):
+        self.status_code = status_code
+
+    def set_usage(self, usage, model=None):
+        """Record a usage block (dict or SDK object), e.g. from a completed assistant run"""
+        if usage is None:
+            return
+        get = usage.get if isinstance(usage, dict) else lambda key: getattr(usage, key, None)
+        self.prompt_tokens += get('prompt_tokens') or get('input_tokens') or 0
+        self.completion_tokens += get('completion_tokens') or get('output_tokens') or 0
+        if model:
+            self.model = model
+
+    def finish(self):
+        """Buffer the call's row; called once the call and its response bodies are done"""
+        if self._finished or not (self.attempts or self.prompt_tokens or self.completion_tokens):
+            return
+        self._finished = True
+        _enqueue(self.as_row())
+
+    def _block_exited(self):
+        self._block_done = True
+        if not self._open_streams:
+            self.finish()
+
+    def _stream_opened(self):
+        self._open_streams += 1
+
+    def _stream_closed(self):
+        self._open_streams -= 1
+        if self._block_done and not self._open_streams:
+            self.finish()
+
+    def as_row(self):
+        from core.models import LLMCall
+
+        return LLMCall(
+            feature=self.feature,
+            company_id=self.company_id,
+            model=self.model[:100],
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            ttft_ms=self.ttft_ms,
+            latency_ms=int((time.monotonic() - self.started) * 1000),
+            retries=self.retries,
+            status_code=self.status_code,
+            created_at=timezone.now(),
+        )
+
+
+@contextmanager
+def track_llm_call(feature, company=None):
+    """
+    Record one logical LLM call made inside the block
+
+    Blocks nest: inside an outer block the outer call is reused, so a caller
+    can attribute a call more specifically than the service that makes it.
+    A response still being streamed when the block exits is measured until
+    its body is closed.
+
+    Args:
+        feature: Calling feature, one of LLMCall.FEATURE_CHOICES
+        company: Company (or company id) the call is made for
+
+    Yields:
+        LLMCallRecorder: The recorder, for adding usage the transport can't see
+    """
+    outer = _current_call.get()
+    if outer is not None:
+        yield outer
+        return
+
+    recorder = LLMCallRecorder(feature, company)
+    token = _current_call.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_call.reset(token)
+        recorder._block_exited()
+
+
+def instrument_response(request, response, started):
+    """
+    Attach instrumentation to a response from the OpenAI transport
+
+    started is the time.monotonic() at which the request was sent.
+
+    Usage and time to first byte are read as the SDK consumes the body, so
+    streamed responses are measured without being buffered up front.
+    """
+    recorder = _current_call.get()
+    metered = request.url.path.endswith(METERED_PATHS)
+    if recorder is None:
+        if not metered:
+            return response
+        recorder = LLMCallRecorder('other')
+        recorder.started = started
+        recorder._block_done = True
+
+    recorder.on_request(request)
+    recorder.on_response(response.status_code)
+    recorder._stream_opened()
+    response.stream = _InstrumentedStream(response.stream, recorder, capture=metered)
+    return response
+
+
+class _InstrumentedStream(httpx.SyncByteStream):
+
+    def __init__(self, stream, recorder, capture):
+        self._stream = stream
+        self._recorder = recorder
+        self._capture = capture
+        self._closed = False
+        self._chunks = []
+        self._captured = 0
+        self._first = True
+
+    def __iter__(self):
+        for chunk in self._stream:
+            if self._first and self._capture and chunk:
+                self._first = False
+                self._recorder.on_first_byte()
+            if self._capture and self._captured < MAX_CAPTURED_BYTES:
+                self._chunks.append(chunk)
+                self._captured += len(chunk)
+            yield chunk
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._stream.close()
+        finally:
+            if self._capture:
+                usage, model = _parse_usage(b''.join(self._chunks))
+                self._recorder.set_usage(usage, model)
+                self._chunks = []
+            self._recorder._stream_closed()
+
+
+def _request_model(request):
+    try:
+        return json.loads(request.content or b'{}').get('model') or ''
+    except (httpx.RequestNotRead, ValueError, AttributeError):
+        return ''
+
+
+def _parse_usage(body):
+    """
+    Usage block and model from a JSON or server-sent-events response body
+
+    Returns:
+        tuple: (usage dict or None, model or None)
+    """
+    if not body:
+        return None, None
+    try:
+        payload = json.loads(body)
+        return payload.get('usage'), payload.get('model')
+    except ValueError:
+        pass
+
+    # Streamed completions carry usage in their final event (stream_options.include_usage)
+    usage, model = None, None
+    for line in body.decode('utf-8', errors='ignore').splitlines():
+        if not line.startswith('data:') or line.strip() == 'data: [DONE]':
+            continue
+        try:
+            event = json.loads(line[5:])
+        except ValueError:
+            continue
+        model = event.get('model') or model
+        usage = event.get('usage') or usage
+    return usage, model
+
+
+def _enqueue(row):
+    global _last_flush
+    with _buffer_lock:
+        _buffer.append(row)
+        due = (
+            len(_buffer) >= getattr(settings, 'LLM_USAGE_FLUSH_SIZE', 50)
+            or time.monotonic() - _last_flush >= getattr(settings, 'LLM_USAGE_FLUSH_INTERVAL', 30)
+        )
+        if not due:
+            return
+        batch = _buffer[:]
+        del _buffer[:]
+        _last_flush = time.monotonic()
+
+    from core.background import run_in_background
+    run_in_background(_write, batch)
+
+
+def flush_llm_usage():
+    """Write any buffered rows now (used at shutdown and by the admin)"""
+    global _last_flush
+    with _buffer_lock:
+        batch = _buffer[:]
+        del _buffer[:]
+        _last_flush = time.monotonic()
+    if batch:
+        _write(batch)
+
+
+def _write(batch):
+    from core.models import LLMCall
+
+    try:
+        LLMCall.objects.bulk_create(batch, batch_size=500)
+    except Exception as e:
+        # Instrumentation must never break the calling feature
+        logger.error(f"Error writing {len(batch)} LLM usage rows: {str(e)}")
+    return {"written": len(batch)}
+
+
+atexit.register(flush_llm_usage)
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.query_advisor import explain_hot_queries, hot_query_names
+
+
+class Command(BaseCommand):
+    help = "Explain the app's hot queries and flag the ones that fall back to sequential scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--query',
+            action='append',
+            choices=hot_query_names(),
+            help='Only explain this query (can be repeated)',
+        )
+        parser.add_argument(
+            '--plans',
+            action='store_true',
+            help='Print the full query plans',
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Exit with an error if any query uses a sequential scan (for CI)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            results = explain_hot_queries(options['query'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        flagged = []
+        for result in results:
+            if result['sequential_scans']:
+                flagged.append(result['name'])
+                tables = ', '.join(result['sequential_scans'])
+                self.stdout.write(self.style.ERROR(f"{result['name']}: sequential scan on {tables}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{result['name']}: OK"))
+            if options['plans']:
+                self.stdout.write(result['plan'])
+                self.stdout.write('')
+
+        if not flagged:
+            self.stdout.write(self.style.SUCCESS(f"All {len(results)} queries use indexes."))
+        elif options['strict']:
+            raise CommandError(f"{len(flagged)} queries use sequential scans: {', '.join(flagged)}")
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(flagged)} of {len(results)} queries use sequential scans."))
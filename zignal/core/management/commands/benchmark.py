@@ -0,0 +1,186 @@
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from core.benchmarks import compare, summarize
+from core.benchmarks.fake_openai import FakeOpenAIServer
+from core.benchmarks.object_storage import InMemoryObjectStorage
+from core.benchmarks.scenarios import SCENARIOS, BenchmarkData
+
+
+class Command(BaseCommand):
+    help = 'Run the offline benchmarks against local stand-ins for OpenAI, S3 and Mailgun and report latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=list(SCENARIOS),
+            help='Only run this scenario (can be repeated; default: all)',
+        )
+        parser.add_argument('--iterations', type=int, default=20, help='Measured runs per scenario (default: 20)')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured runs per scenario first (default: 2)')
+        parser.add_argument('--companies', type=int, default=10,
+                            help='Companies in the portfolio manager\'s dashboard (default: 10)')
+        parser.add_argument('--file-size', type=int, default=64 * 1024, help='Bytes per ingested file (default: 65536)')
+        parser.add_argument('--openai-latency', type=float, default=0.05,
+                            help='Seconds the fake OpenAI API takes per request (default: 0.05)')
+        parser.add_argument('--ttft', type=float, default=0.3,
+                            help='Seconds to the first completion token (default: 0.3)')
+        parser.add_argument('--token-interval', type=float, default=0.01,
+                            help='Seconds between completion tokens (default: 0.01)')
+        parser.add_argument('--completion-tokens', type=int, default=100,
+                            help='Tokens per completion (default: 100)')
+        parser.add_argument('--storage-latency', type=float, default=0.02,
+                            help='Seconds per storage operation (default: 0.02)')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for generated content (default: 0)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--compare', help='Compare with the results JSON of an earlier run')
+        parser.add_argument('--max-regression', type=float, default=10,
+                            help='Percent p50/p95 slowdown allowed with --compare before failing (default: 10)')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['compare']}: {str(e)}")
+
+        scenarios = options['scenario'] or list(SCENARIOS)
+        result = {
+            'commit': self._commit(),
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'config': {
+                name: options[name] for name in (
+                    'iterations', 'warmup', 'companies', 'file_size', 'openai_latency', 'ttft',
+                    'token_interval', 'completion_tokens', 'storage_latency', 'seed'
+                )
+            },
+            'metrics': {},
+            'scenarios': {},
+        }
+
+        old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        server = FakeOpenAIServer(
+            latency=options['openai_latency'],
+            ttft=options['ttft'],
+            token_interval=options['token_interval'],
+            completion_tokens=options['completion_tokens'],
+        ).start()
+        original_storage = default_storage._wrapped
+        original_base_url = os.environ.get('OPENAI_BASE_URL')
+        try:
+            os.environ['OPENAI_BASE_URL'] = server.base_url
+            default_storage._wrapped = InMemoryObjectStorage(latency=options['storage_latency'])
+            with override_settings(
+                OPENAI_API_KEY='sk-benchmark-00000000000000000000',
+                RUN_BACKGROUND_TASKS_INLINE=True,
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                AUTO_GENERATE_REPORT_PDF=False,
+                VALIDATE_DOCUMENTS_FOR_REPORTS=False,
+                PROFILING_ENABLED=False,
+                # The dashboard scenario clears the cache, so use a private one instead of a shared Redis;
+                # override_settings resets django.core.cache.caches for it and back afterwards
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'}},
+            ):
+                data = BenchmarkData(options['companies'], options['file_size'], options['seed'])
+                for name in scenarios:
+                    self.stdout.write(f"Running {name}...")
+                    result['scenarios'][name], metrics = self._run(name, data, options)
+                    result['metrics'].update(metrics)
+        finally:
+            default_storage._wrapped = original_storage
+            if original_base_url is None:
+                os.environ.pop('OPENAI_BASE_URL', None)
+            else:
+                os.environ['OPENAI_BASE_URL'] = original_base_url
+            server.stop()
+            connection.creation.destroy_test_db(old_database_name, verbosity=0)
+
+        self._report(result)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(result, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        if baseline is not None:
+            self._compare(result, baseline, options['max_regression'] / 100)
+
+    def _run(self, name, data, options):
+        scenario = SCENARIOS[name]
+        # The app prints and logs progress on these paths; keep it out of the report and the timings
+        logging.disable(logging.INFO)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                if options['warmup']:
+                    scenario(data, options['warmup'])
+                started = time.perf_counter()
+                outcome = scenario(data, options['iterations'])
+                elapsed = time.perf_counter() - started
+        finally:
+            logging.disable(logging.NOTSET)
+
+        summary = {
+            'elapsed_s': round(elapsed, 3),
+            'errors': outcome['errors'],
+            'per_second': round(outcome.get('operations', options['iterations']) / elapsed, 2) if elapsed else 0.0,
+        }
+        if 'bytes' in outcome:
+            summary['bytes_per_second'] = round(outcome['bytes'] / elapsed, 1) if elapsed else 0.0
+        metrics = {metric: summarize(samples) for metric, samples in outcome['metrics'].items()}
+        return summary, metrics
+
+    def _report(self, result):
+        self.stdout.write('')
+        self.stdout.write(f"{'metric':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+        for name, stats in result['metrics'].items():
+            self.stdout.write(
+                f"{name:<28}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['mean_ms']:>10.1f}"
+            )
+        self.stdout.write('')
+        for name, summary in result['scenarios'].items():
+            line = f"{name}: {summary['per_second']}/s over {summary['elapsed_s']}s"
+            if 'bytes_per_second' in summary:
+                line += f", {summary['bytes_per_second'] / 1024:.1f} KiB/s"
+            if summary['errors']:
+                self.stdout.write(self.style.ERROR(f"{line}, {summary['errors']} errors"))
+            else:
+                self.stdout.write(line)
+
+    def _compare(self, result, baseline, max_regression):
+        self.stdout.write('')
+        self.stdout.write(f"Compared with {baseline.get('commit') or 'baseline'}:")
+        regressed = []
+        for comparison in compare(result, baseline, max_regression):
+            line = (f"{comparison['metric']:<28}p50 {comparison['p50_change']:+.1%}"
+                    f"  p95 {comparison['p95_change']:+.1%}")
+            if comparison['regressed']:
+                regressed.append(comparison['metric'])
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressed:
+            raise CommandError(f"Slower than the baseline by more than {max_regression:.0%}: {', '.join(regressed)}")
+
+    @staticmethod
+    def _commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,51 @@
+import json
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core.profiling import QueryBudgetExceeded, profile_request
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    """
+    Profile each request (see core.profiling) and report it as a Server-Timing
+    header and a JSON log line
+
+    Only enabled when PROFILING_ENABLED is set. Streaming responses are
+    measured up to the point the response starts, not while it streams.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budgets = getattr(settings, 'PROFILING_QUERY_BUDGETS', {})
+        self.strict = getattr(settings, 'PROFILING_STRICT', False)
+
+    def __call__(self, request):
+        with profile_request() as profile:
+            response = self.get_response(request)
+
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        response['Server-Timing'] = profile.server_timing()
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            **profile.as_dict(),
+        }
+        budget = self.budgets.get(view_name)
+        if budget is not None and profile.queries > budget:
+            record['query_budget'] = budget
+            logger.warning(f"Query budget exceeded: {json.dumps(record)}")
+            if self.strict:
+                raise QueryBudgetExceeded(f"{view_name} ran {profile.queries} queries (budget {budget})")
+        else:
+            logger.info(f"Request profile: {json.dumps(record)}")
+
+        return response
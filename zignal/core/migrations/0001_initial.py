@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-19 09:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('companies', '0003_company_openai_assistant_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCall',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feature', models.CharField(choices=[('chat', 'Chat'), ('portfolio', 'Portfolio Chat'), ('report', 'Report Generation'), ('validation', 'Document Validation'), ('summary', 'Meeting Summary'), ('embedding', 'Embeddings'), ('search', 'Search'), ('other', 'Other')], max_length=20)),
+                ('model', models.CharField(blank=True, max_length=100)),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('ttft_ms', models.PositiveIntegerField(blank=True, help_text='Time to first response byte', null=True)),
+                ('latency_ms', models.PositiveIntegerField(default=0)),
+                ('retries', models.PositiveSmallIntegerField(default=0)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='llm_calls', to='companies.company')),
+            ],
+            options={
+                'verbose_name': 'LLM call',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at', 'feature'], name='llmcall_created_feature_idx'), models.Index(fields=['company', 'created_at'], name='llmcall_company_created_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,50 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class LLMCall(models.Model):
+    """
+    Token usage and latency of one LLM call, written in batches by core.llm_usage
+    """
+    FEATURE_CHOICES = (
+        ('chat', 'Chat'),
+        ('portfolio', 'Portfolio Chat'),
+        ('report', 'Report Generation'),
+        ('validation', 'Document Validation'),
+        ('summary', 'Meeting Summary'),
+        ('embedding', 'Embeddings'),
+        ('search', 'Search'),
+        ('other', 'Other'),
+    )
+    
+    feature = models.CharField(max_length=20, choices=FEATURE_CHOICES)
+    company = models.ForeignKey(
+        'companies.Company',
+        on_delete=models.SET_NULL,
+        related_name='llm_calls',
+        null=True,
+        blank=True
+    )
+    model = models.CharField(max_length=100, blank=True)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    ttft_ms = models.PositiveIntegerField(null=True, blank=True, help_text="Time to first response byte")
+    latency_ms = models.PositiveIntegerField(default=0)
+    retries = models.PositiveSmallIntegerField(default=0)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"{self.get_feature_display()} call to {self.model or 'unknown model'}"
+    
+    @property
+    def total_tokens(self):
+        return self.prompt_tokens + self.completion_tokens
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'LLM call'
+        indexes = [
+            models.Index(fields=['created_at', 'feature'], name='llmcall_created_feature_idx'),
+            models.Index(fields=['company', 'created_at'], name='llmcall_company_created_idx'),
+        ]
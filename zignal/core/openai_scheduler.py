@@ -0,0 +1,286 @@
+"""
+Process-wide scheduler for OpenAI API requests.
+
+Every service builds its OpenAI client through get_openai_client(), whose HTTP
+transport asks the shared scheduler for a slot before each request. The
+scheduler caps requests in flight, serves the interactive lane (chat, search)
+ahead of the batch lane (reports, validation, summaries, uploads), tracks the
+remaining request/token quota reported in OpenAI's x-ratelimit-* response
+headers, and pauses everything after a 429 until the quota resets.
+
+Batch work keeps a share of the concurrency slots and of the quota free for
+interactive requests, so month-end report runs can't starve chat.
+"""
+import heapq
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+import httpx
+from django.conf import settings
+from openai import DefaultHttpxClient, OpenAI
+
+from core.llm_usage import instrument_response
+from core.profiling import track_external
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+
+LANE_PRIORITIES = {INTERACTIVE: 0, BATCH: 1}
+
+# Only these endpoints count against the tokens-per-minute limit
+TOKEN_METERED_PATHS = ('/chat/completions', '/embeddings', '/completions', '/responses')
+
+DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_reset_duration(value):
+    """
+    Parse an x-ratelimit-reset-* header such as "1s", "6m0s" or "20ms"
+
+    Returns:
+        float: Seconds until the quota resets, or None if unparseable
+    """
+    if not value:
+        return None
+    matches = DURATION_PATTERN.findall(value)
+    if not matches:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in matches)
+
+
+def estimate_tokens(request):
+    """
+    Rough token estimate for a request: prompt characters / 4 plus the
+    completion allowance
+    """
+    if not request.url.path.endswith(TOKEN_METERED_PATHS):
+        return 0
+    try:
+        body = request.content
+    except httpx.RequestNotRead:
+        return 0
+    try:
+        payload = json.loads(body or b'{}')
+    except ValueError:
+        return len(body) // 4
+    completion = payload.get('max_completion_tokens') or payload.get('max_tokens') or 0
+    return len(body) // 4 + completion
+
+
+class _Quota:
+    """Remaining quota for one limit (requests or tokens) as last reported"""
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.resets_at = None
+
+    def update(self, limit, remaining, reset):
+        try:
+            self.limit = int(limit) if limit is not None else self.limit
+            self.remaining = int(remaining) if remaining is not None else self.remaining
+        except ValueError:
+            return
+        seconds = parse_reset_duration(reset)
+        if seconds is not None:
+            self.resets_at = time.monotonic() + seconds
+
+    def available(self, now):
+        """Remaining quota, or None once the window has reset or nothing is known"""
+        if self.remaining is None or self.resets_at is None or now >= self.resets_at:
+            return None
+        return self.remaining
+
+    def consume(self, amount):
+        if self.remaining is not None:
+            self.remaining -= amount
+
+
+class OpenAIRequestScheduler:
+    """
+    Grants request slots in priority order under concurrency and quota limits
+    """
+
+    def __init__(self, max_concurrent=None, interactive_reserved_slots=None, batch_quota_reserve=None):
+        self.max_concurrent = max_concurrent or getattr(settings, 'OPENAI_MAX_CONCURRENT_REQUESTS', 8)
+        reserved = interactive_reserved_slots
+        if reserved is None:
+            reserved = getattr(settings, 'OPENAI_INTERACTIVE_RESERVED_SLOTS', 2)
+        self.batch_max_concurrent = max(1, self.max_concurrent - reserved)
+        self.batch_quota_reserve = batch_quota_reserve
+        if self.batch_quota_reserve is None:
+            self.batch_quota_reserve = getattr(settings, 'OPENAI_BATCH_QUOTA_RESERVE', 0.2)
+
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._batch_in_flight = 0
+        self._paused_until = 0
+        self._requests = _Quota()
+        self._tokens = _Quota()
+
+    def acquire(self, lane, tokens=0):
+        """Block until a request in the given lane may be sent"""
+        entry = (LANE_PRIORITIES.get(lane, LANE_PRIORITIES[BATCH]), next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    wait = self._wait_time(entry, lane, tokens)
+                    if wait == 0:
+                        break
+                    self._condition.wait(timeout=wait)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+
+            self._in_flight += 1
+            if lane != INTERACTIVE:
+                self._batch_in_flight += 1
+            self._requests.consume(1)
+            self._tokens.consume(tokens)
+            # The next waiter may be able to go as well
+            self._condition.notify_all()
+
+    def release(self, lane, response=None):
+        """Return a slot and record the quota reported by the response"""
+        with self._condition:
+            self._in_flight -= 1
+            if lane != INTERACTIVE:
+                self._batch_in_flight -= 1
+            if response is not None:
+                self._record(response)
+            self._condition.notify_all()
+
+    def _wait_time(self, entry, lane, tokens):
+        """
+        Seconds to wait before re-checking, or 0 if the request may go now.
+        Called with the condition held.
+        """
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._waiters[0] != entry:
+            return 1.0
+        if self._in_flight >= self.max_concurrent:
+            return 1.0
+        if lane != INTERACTIVE and self._batch_in_flight >= self.batch_max_concurrent:
+            return 1.0
+
+        for quota, needed in ((self._requests, 1), (self._tokens, tokens)):
+            remaining = quota.available(now)
+            if remaining is None:
+                continue
+            reserve = 0
+            if lane != INTERACTIVE and quota.limit:
+                reserve = int(quota.limit * self.batch_quota_reserve)
+            if remaining - needed < reserve:
+                return max(quota.resets_at - now, 0.05)
+        return 0
+
+    def _record(self, response):
+        headers = response.headers
+        self._requests.update(
+            headers.get('x-ratelimit-limit-requests'),
+            headers.get('x-ratelimit-remaining-requests'),
+            headers.get('x-ratelimit-reset-requests'),
+        )
+        self._tokens.update(
+            headers.get('x-ratelimit-limit-tokens'),
+            headers.get('x-ratelimit-remaining-tokens'),
+            headers.get('x-ratelimit-reset-tokens'),
+        )
+
+        if response.status_code == 429:
+            delay = self._retry_delay(headers)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            logger.warning(f"OpenAI rate limit hit, pausing requests for {delay:.1f}s")
+
+    def _retry_delay(self, headers):
+        """Pause after a 429, with jitter so waiting workers don't all retry at once"""
+        for header in ('retry-after-ms', 'retry-after'):
+            value = headers.get(header)
+            try:
+                delay = float(value) / (1000 if header == 'retry-after-ms' else 1)
+                break
+            except (TypeError, ValueError):
+                continue
+        else:
+            delay = max(
+                parse_reset_duration(headers.get('x-ratelimit-reset-requests')) or 0,
+                parse_reset_duration(headers.get('x-ratelimit-reset-tokens')) or 0,
+            ) or 1.0
+        return min(delay, 60) * random.uniform(1.0, 1.25)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+_http_clients = {}
+
+
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = OpenAIRequestScheduler()
+        return _scheduler
+
+
+class ScheduledTransport(httpx.BaseTransport):
+    """HTTP transport that sends each request once the scheduler grants a slot"""
+
+    def __init__(self, lane):
+        self.lane = lane
+        self._transport = httpx.HTTPTransport(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+
+    def handle_request(self, request):
+        with track_external('openai'):
+            return self._send(request)
+
+    def _send(self, request):
+        scheduler = get_scheduler()
+        scheduler.acquire(self.lane, estimate_tokens(request))
+        started = time.monotonic()
+        try:
+            response = self._transport.handle_request(request)
+        except Exception:
+            scheduler.release(self.lane)
+            raise
+        scheduler.release(self.lane, response)
+        return instrument_response(request, response, started)
+
+    def close(self):
+        self._transport.close()
+
+
+def get_openai_client(lane=INTERACTIVE, **kwargs):
+    """
+    OpenAI client whose requests go through the shared scheduler
+
+    Args:
+        lane: INTERACTIVE for user-facing requests, BATCH for background work
+        **kwargs: Extra arguments for the OpenAI client (e.g. default_headers)
+
+    Returns:
+        OpenAI: The client
+    """
+    with _scheduler_lock:
+        http_client = _http_clients.get(lane)
+        if http_client is None:
+            http_client = DefaultHttpxClient(transport=ScheduledTransport(lane))
+            _http_clients[lane] = http_client
+    return OpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client, **kwargs)
@@ -0,0 +1,149 @@
+"""
+Pagination for the chat thread and agent conversation endpoints.
+
+Message history uses cursor pagination.
+
+Messages are paged by ID, which follows their order, so pages stay stable
+while new messages arrive:
+- no cursor: the latest page
+- before=<id>: the page of messages just older than <id> (scrolling back)
+- after=<id>: messages newer than <id>, oldest first (fetching new messages)
+- since=<ISO timestamp>: messages created after the timestamp, oldest first
+
+Pages are always returned oldest first. With content=false the message text
+is left out in favour of its length and a short preview, which keeps
+responses small for threads with long messages such as meeting transcripts.
+
+Thread and conversation lists are paged with offset and limit, most recently
+active first, and each row carries a preview of its last message and its
+message count, fetched in the same query as the list itself.
+"""
+from typing import Any, Dict
+
+from django.db.models import Count, F, IntegerField, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce, Length, Substr
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+PREVIEW_LENGTH = 200
+
+
+def message_page(messages: QuerySet, params) -> Dict[str, Any]:
+    """
+    One page of messages selected by the request's query parameters
+
+    Args:
+        messages: The thread's or conversation's messages
+        params: Query parameters (request.GET): before, after, since, limit, content
+
+    Returns:
+        dict: messages, has_more (whether more exist beyond the page in the
+            direction paged), and cursors for the previous and next pages
+
+    Raises:
+        ValueError: If a parameter is malformed
+    """
+    limit = min(max(int(params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    include_content = params.get('content', 'true').lower() != 'false'
+
+    fields = ['id', 'role', 'timestamp']
+    if include_content:
+        fields.append('content')
+    else:
+        messages = messages.annotate(
+            content_length=Length('content'),
+            preview=Substr('content', 1, PREVIEW_LENGTH),
+        )
+        fields += ['content_length', 'preview']
+    messages = messages.values(*fields)
+
+    before = int(params['before']) if params.get('before') else None
+    after = int(params['after']) if params.get('after') else None
+    since = params.get('since')
+    newest_first = not (after or since)
+    if after:
+        messages = messages.filter(id__gt=after).order_by('id')
+    elif since:
+        moment = parse_datetime(since)
+        if moment is None:
+            raise ValueError(f"Invalid since timestamp: {since}")
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        messages = messages.filter(timestamp__gt=moment).order_by('id')
+    else:
+        if before:
+            messages = messages.filter(id__lt=before)
+        messages = messages.order_by('-id')
+
+    page = list(messages[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    if newest_first:
+        page.reverse()
+
+    return {
+        'messages': page,
+        'has_more': has_more,
+        'cursors': {
+            'before': page[0]['id'] if page else before,
+            'after': page[-1]['id'] if page else after,
+        },
+    }
+
+
+def with_last_message(queryset: QuerySet, message_model, parent_field: str) -> QuerySet:
+    """
+    Annotate threads or conversations with their last message and message
+    count, and order them most recently active first: by their last message,
+    then those without messages, newest first
+
+    Args:
+        queryset: Threads or conversations
+        message_model: Their message model
+        parent_field: The message model's foreign key to them
+
+    Returns:
+        QuerySet: The queryset annotated with last_message_preview,
+            last_message_role, last_message_at and message_count, and ordered
+    """
+    messages = message_model.objects.filter(**{parent_field: OuterRef('pk')})
+    last = messages.order_by('-id')
+    return queryset.annotate(
+        last_message_preview=Subquery(last.annotate(
+            preview=Substr('content', 1, PREVIEW_LENGTH)
+        ).values('preview')[:1]),
+        last_message_role=Subquery(last.values('role')[:1]),
+        last_message_at=Subquery(last.values('timestamp')[:1]),
+        message_count=Coalesce(Subquery(
+            messages.order_by().values(parent_field).annotate(count=Count('id')).values('count'),
+            output_field=IntegerField()
+        ), 0),
+    ).order_by(F('last_message_at').desc(nulls_last=True), '-created_at', '-id')
+
+
+def list_page(queryset: QuerySet, params) -> Dict[str, Any]:
+    """
+    One page of a list selected by the request's offset and limit parameters
+
+    Args:
+        queryset: The ordered list
+        params: Query parameters (request.GET): offset, limit
+
+    Returns:
+        dict: items (model instances), has_more, and next_offset (None on the last page)
+
+    Raises:
+        ValueError: If a parameter is malformed
+    """
+    limit = min(max(int(params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    offset = max(int(params.get('offset', 0)), 0)
+
+    items = list(queryset[offset:offset + limit + 1])
+    has_more = len(items) > limit
+    return {
+        'items': items[:limit],
+        'has_more': has_more,
+        'next_offset': offset + limit if has_more else None,
+    }
@@ -0,0 +1,197 @@
+"""
+Per-request profiling: SQL queries, cache hits and external service calls.
+
+ProfilingMiddleware (opt-in, see PROFILING_ENABLED) opens a RequestProfile for
+each request. While it is open:
+- every query on the default database connection is counted and timed
+- cache reads through ProfiledLocMemCache / ProfiledRedisCache are counted as
+  hits or misses
+- blocks wrapped in track_external(service) are timed per service; the
+  OpenAI transport, MediaStorage (S3), the Mailgun email backend and the
+  Meeting BaaS client do this
+
+Outside a profiled request (background threads, management commands) all of
+this is a no-op apart from a context variable lookup.
+
+The totals are sent as a Server-Timing header and logged as one JSON line.
+Views can be given a query budget in PROFILING_QUERY_BUDGETS; going over it is
+logged, and raises QueryBudgetExceeded when PROFILING_STRICT is set so a CI
+run against the test client fails. query_budget() applies the same check to
+any block of code.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import connection
+
+_current_profile = ContextVar('request_profile', default=None)
+
+_missing = object()
+
+
+class QueryBudgetExceeded(Exception):
+    """A view or block ran more queries than its budget allows"""
+
+
+class RequestProfile:
+    """Measurements for one request"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.queries = 0
+        self.query_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.external = defaultdict(lambda: {'calls': 0, 'time': 0.0})
+        self.total_time = None
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.monotonic() - started
+
+    def finish(self):
+        self.total_time = time.monotonic() - self.started
+
+    def server_timing(self) -> str:
+        """The measurements as a Server-Timing header value (durations in ms)"""
+        metrics = [
+            f'db;dur={self.query_time * 1000:.1f};desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ]
+        for service, measured in sorted(self.external.items()):
+            metrics.append(f'{service};dur={measured["time"] * 1000:.1f};desc="{measured["calls"]} calls"')
+        if self.total_time is not None:
+            metrics.append(f'total;dur={self.total_time * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'queries': self.queries,
+            'query_ms': round(self.query_time * 1000, 1),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'external': {
+                service: {'calls': measured['calls'], 'ms': round(measured['time'] * 1000, 1)}
+                for service, measured in self.external.items()
+            },
+            'total_ms': round(self.total_time * 1000, 1) if self.total_time is not None else None,
+        }
+
+
+def current_profile():
+    """The profile of the request being handled on this thread, if any"""
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_request():
+    """
+    Profile the block: queries on the default connection, cache reads and external calls
+
+    Yields:
+        RequestProfile: The measurements, complete once the block exits
+    """
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        with connection.execute_wrapper(profile.execute_wrapper):
+            yield profile
+    finally:
+        _current_profile.reset(token)
+        profile.finish()
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = 'block'):
+    """
+    Fail if the block runs more than max_queries queries
+
+    Raises:
+        QueryBudgetExceeded: When the budget is exceeded
+    """
+    with profile_request() as profile:
+        yield profile
+    if profile.queries > max_queries:
+        raise QueryBudgetExceeded(f"{label} ran {profile.queries} queries (budget {max_queries})")
+
+
+@contextmanager
+def track_external(service: str):
+    """Time a call to an external service as part of the current request's profile"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        measured = profile.external[service]
+        measured['calls'] += 1
+        measured['time'] += time.monotonic() - started
+
+
+def record_cache_read(hit: bool):
+    profile = _current_profile.get()
+    if profile is None:
+        return
+    if hit:
+        profile.cache_hits += 1
+    else:
+        profile.cache_misses += 1
+
+
+class ProfiledCacheMixin:
+    """Count cache hits and misses of get() on a cache backend"""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _missing, version=version)
+        record_cache_read(value is not _missing)
+        return default if value is _missing else value
+
+
+class ProfiledLocMemCache(ProfiledCacheMixin, LocMemCache):
+    """Local memory cache that counts hits and misses (get_many and get_or_set read through get)"""
+
+
+class ProfiledRedisCache(ProfiledCacheMixin, RedisCache):
+    """Redis cache that counts hits and misses of get() (get_many is a single MGET and is not counted)"""
+
+
+class ProfiledStorageMixin:
+    """Times a storage backend's remote operations as calls to the given service"""
+
+    profiling_service = 's3'
+
+    def _save(self, name, content):
+        with track_external(self.profiling_service):
+            return super()._save(name, content)
+
+    def _open(self, name, mode='rb'):
+        with track_external(self.profiling_service):
+            return super()._open(name, mode)
+
+    def delete(self, name):
+        with track_external(self.profiling_service):
+            return super().delete(name)
+
+    def exists(self, name):
+        with track_external(self.profiling_service):
+            return super().exists(name)
+
+    def size(self, name):
+        with track_external(self.profiling_service):
+            return super().size(name)
+
+    def listdir(self, path):
+        with track_external(self.profiling_service):
+            return super().listdir(path)
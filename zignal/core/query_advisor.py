@@ -0,0 +1,111 @@
+"""
+Registry of the application's hot queries and a check of their query plans
+
+Each entry builds the queryset a hot path runs, with placeholder parameters
+(the plan does not depend on the rows existing). The advisor runs EXPLAIN on
+each one and reports the tables read with a sequential scan, which is what a
+missing index looks like once a table holds millions of rows.
+
+On PostgreSQL sequential scans are discouraged while explaining (SET LOCAL
+enable_seqscan = off), so the planner picks an index whenever one is usable
+even on a small development database. A sequential scan that remains means
+no index fits the query.
+"""
+import re
+from datetime import timedelta
+from typing import Any, Callable, Dict, List
+
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+
+def _hot_queries() -> Dict[str, Callable[[], QuerySet]]:
+    from agents.models import MeetingTranscript, Message as AgentMessage
+    from chat.models import Message as ChatMessage
+    from core.models import LLMCall
+    from datasilo.models import DataFile
+    from mail_receiver.models import IncomingEmail
+    from reports.models import Report, ReportSchedule
+
+    return {
+        'silo_files': lambda: DataFile.objects.filter(data_silo_id=1).order_by('-created_at'),
+        'company_vector_store_files': lambda: DataFile.objects.filter(company_id=1, vector_store_status='pending'),
+        'files_by_status': lambda: DataFile.objects.filter(status='pending'),
+        'email_by_message_id': lambda: IncomingEmail.objects.filter(message_id='<message@example.com>'),
+        'email_by_mailgun_id': lambda: IncomingEmail.objects.filter(mailgun_id='token'),
+        'thread_messages': lambda: ChatMessage.objects.filter(thread_id=1).order_by('timestamp'),
+        'conversation_messages': lambda: AgentMessage.objects.filter(conversation_id=1).order_by('timestamp'),
+        'company_meetings': lambda: MeetingTranscript.objects.filter(company_id=1).order_by('-created_at'),
+        'project_reports': lambda: Report.objects.filter(project_id=1).order_by('-created_at'),
+        'due_report_schedules': lambda: ReportSchedule.objects.filter(is_active=True, next_run__lte=timezone.now()),
+        'company_llm_calls': lambda: LLMCall.objects.filter(
+            company_id=1, created_at__gte=timezone.now() - timedelta(days=30)
+        ),
+    }
+
+
+# Sequential scan lines in EXPLAIN output, by database vendor
+SEQUENTIAL_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    # SQLite reports index scans as "SCAN table USING [COVERING] INDEX ..."
+    'sqlite': re.compile(r'\bSCAN (\w+)(?! USING)(?:\s|$)'),
+}
+
+
+def hot_query_names() -> List[str]:
+    """Names of the registered hot queries"""
+    return list(_hot_queries())
+
+
+def sequential_scans(plan: str, vendor: str = None) -> List[str]:
+    """
+    Tables a query plan reads with a sequential scan
+
+    Args:
+        plan: EXPLAIN output
+        vendor: Database vendor (defaults to the default connection's)
+
+    Returns:
+        list: Table names, in plan order
+    """
+    pattern = SEQUENTIAL_SCAN_PATTERNS.get(vendor or connection.vendor)
+    if pattern is None:
+        raise ValueError(f"Query plans cannot be checked on {vendor or connection.vendor}")
+    return [match.group(1) for match in pattern.finditer(plan)]
+
+
+def explain_hot_queries(names: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    Explain the registered hot queries and flag sequential scans
+
+    Args:
+        names: Queries to explain (defaults to all)
+
+    Returns:
+        list: One dict per query with its name, plan and sequential_scans
+
+    Raises:
+        ValueError: If a name is not registered or the database vendor is not supported
+    """
+    if connection.vendor not in SEQUENTIAL_SCAN_PATTERNS:
+        raise ValueError(f"Query plans cannot be checked on {connection.vendor}")
+
+    queries = _hot_queries()
+    unknown = set(names or []) - set(queries)
+    if unknown:
+        raise ValueError(f"Unknown queries: {', '.join(sorted(unknown))}")
+
+    results = []
+    for name in names or queries:
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queries[name]().explain()
+        results.append({
+            'name': name,
+            'plan': plan,
+            'sequential_scans': sequential_scans(plan),
+        })
+    return results
@@ -0,0 +1,53 @@
+"""
+Signal handlers that keep the dashboard snapshots in core.dashboard current
+
+Each change drops only the snapshots of the company it belongs to; they are
+rebuilt on the next dashboard load.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from agents.models import MeetingTranscript
+from companies.models import Company, UserCompanyRelation
+from core.dashboard import invalidate_company_snapshots, invalidate_portfolio_snapshots
+from datasilo.models import DataFile, DataSilo
+from projects.models import Project
+from reports.models import Report
+
+
+def _project_company_id(project_id):
+    if not project_id:
+        return None
+    return Project.objects.filter(id=project_id).values_list('company_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=DataSilo)
+@receiver([post_save, post_delete], sender=DataFile)
+@receiver([post_save, post_delete], sender=MeetingTranscript)
+def company_content_changed(sender, instance, **kwargs):
+    """Drop the snapshot of the company a project, silo, file or meeting belongs to"""
+    invalidate_company_snapshots([instance.company_id])
+
+
+@receiver([post_save, post_delete], sender=Report)
+def report_changed(sender, instance, **kwargs):
+    """Drop the snapshot of the company a report belongs to, directly or through its project"""
+    invalidate_company_snapshots([instance.company_id or _project_company_id(instance.project_id)])
+
+
+@receiver([post_save, post_delete], sender=UserCompanyRelation)
+def membership_changed(sender, instance, **kwargs):
+    """Membership changes the company's member count and the user's company list"""
+    invalidate_company_snapshots([instance.company_id])
+    invalidate_portfolio_snapshots([instance.user_id])
+
+
+@receiver(post_save, sender=Company)
+def company_changed(sender, instance, created, **kwargs):
+    """Company details are listed in the portfolio snapshots of its members"""
+    if created:
+        return
+    invalidate_portfolio_snapshots(
+        UserCompanyRelation.objects.filter(company=instance).values_list('user_id', flat=True)
+    )
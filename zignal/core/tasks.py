@@ -183,7 +183,7 @@ def process_file_for_vector_store(file_id, max_retries=3):
                 # Continue processing anyway in case the previous attempt failed
                 
             # Update status
-            DataFile.objects.filter(id=file_id).update(vector_store_status='processing')
+            DataFile.objects.filter(id=file_id).update(vector_store_status='processing', updated_at=timezone.now())
             
             # Try to get company
             company = None
@@ -210,25 +210,32 @@ def process_file_for_vector_store(file_id, max_retries=3):
                 logger.warning(f"Company {company.name} has no vector store ID. Creating one...")
                 
                 try:
-                    # Create vector store if not exists
-                    from companies.services.openai_service import CompanyOpenAIService
-                    openai_service = CompanyOpenAIService()
-                    setup_result = openai_service.setup_company_ai(company)
+                    # Provision the company's AI resources if no other run is already doing so
+                    provision_company_ai(company.id, max_retries=0)
+                    company = Company.objects.get(id=company.id)
                     
-                    if setup_result.get('success') and setup_result.get('vector_store_id'):
-                        Company.objects.filter(id=company.id).update(
-                            openai_vector_store_id=setup_result.get('vector_store_id'),
-                            openai_assistant_id=setup_result.get('assistant_id') or company.openai_assistant_id
-                        )
-                        # Refresh company from database
-                        company = Company.objects.get(id=company.id)
+                    if company.openai_vector_store_id:
                         logger.info(f"Created vector store for company: {company.openai_vector_store_id}")
+                    elif company.ai_status == 'provisioning':
+                        # Another run is still provisioning; it queues the pending files once it is done
+                        logger.info(f"AI resources for company {company.name} are still being set up, leaving file {file_id} pending")
+                        DataFile.objects.filter(id=file_id).update(vector_store_status='pending', updated_at=timezone.now())
+                        if not Company.objects.filter(id=company.id, ai_status='provisioning').exists():
+                            # It finished meanwhile and may have missed this file
+                            from core.background import run_in_background
+                            run_in_background(process_file_for_vector_store, file_id)
+                        return {
+                            "success": False,
+                            "pending": True,
+                            "error": "AI resources are still being set up"
+                        }
                     else:
-                        logger.error(f"Failed to create vector store: {setup_result.get('error')}")
+                        error = company.ai_error or "AI resources are still being set up"
+                        logger.error(f"Failed to create vector store: {error}")
                         DataFile.objects.filter(id=file_id).update(vector_store_status='failed')
                         return {
                             "success": False,
-                            "error": f"Failed to create vector store: {setup_result.get('error')}"
+                            "error": f"Failed to create vector store: {error}"
                         }
                 except Exception as e:
                     logger.error(f"Error creating vector store: {str(e)}")
@@ -726,4 +733,431 @@ def process_file_for_vector_store_core(file_path=None, data_file=None, metadata=
         return {
             "success": False,
             "error": str(e)
-        } 
\ No newline at end of file
+        }
+
+def embed_file_chunks(file_id):
+    """
+    Chunk a DataFile's text and store batched embeddings for local retrieval
+    
+    Args:
+        file_id (int): ID of the DataFile to embed
+        
+    Returns:
+        dict: Result of the embedding
+    """
+    from datasilo.models import DataFile
+    from datasilo.services.embedding_service import EmbeddingService
+    
+    data_file = DataFile.objects.filter(id=file_id).select_related('data_silo').first()
+    if not data_file:
+        logger.error(f"File with ID {file_id} not found")
+        return {
+            "success": False,
+            "error": f"File with ID {file_id} not found"
+        }
+    
+    try:
+        return EmbeddingService().embed_data_file(data_file)
+    except Exception as e:
+        logger.error(f"Error embedding file {file_id}: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+def generate_report(report_id):
+    """
+    Generate a report's content (run via core.background.run_in_background)
+    
+    Args:
+        report_id (int): ID of the Report to generate
+        
+    Returns:
+        dict: Result of the generation
+    """
+    from reports.models import Report
+    from reports.services.report_generation_service import ReportGenerationService
+    
+    report = Report.objects.filter(id=report_id).select_related(
+        'template', 'project', 'company', 'created_by'
+    ).first()
+    if not report:
+        logger.error(f"Report with ID {report_id} not found")
+        return {
+            "success": False,
+            "error": f"Report with ID {report_id} not found"
+        }
+    
+    success = ReportGenerationService().generate_report(report)
+    return {
+        "success": success,
+        "report_id": report_id
+    }
+
+
+
+def render_report_pdf(report_id):
+    """
+    Render a report's PDF (run via core.background.run_in_background)
+    
+    Args:
+        report_id (int): ID of the Report to render
+        
+    Returns:
+        dict: Result of the rendering
+    """
+    from django.core.cache import cache
+    from reports.models import Report
+    from reports.services.pdf_service import ReportPDFService
+    
+    try:
+        report = Report.objects.filter(id=report_id).first()
+        if not report:
+            logger.error(f"Report with ID {report_id} not found")
+            return {
+                "success": False,
+                "error": f"Report with ID {report_id} not found"
+            }
+        
+        pdf_path = ReportPDFService().render(report)
+        return {
+            "success": pdf_path is not None,
+            "pdf_path": pdf_path
+        }
+    finally:
+        cache.delete(f"report_pdf_rendering:{report_id}")
+
+
+
+def process_meeting_webhook(meeting_id, webhook_data):
+    """
+    Process a Meeting BaaS webhook event (run via core.background.run_in_background)
+    
+    Args:
+        meeting_id (int): ID of the MeetingTranscript the event is for
+        webhook_data (dict): Parsed webhook payload
+        
+    Returns:
+        dict: Result of the processing
+    """
+    from agents.models import MeetingTranscript
+    from agents.services.meetingbaas_service import MeetingBaaSService
+    
+    meeting = MeetingTranscript.objects.filter(id=meeting_id).select_related('conversation', 'scheduled_by').first()
+    if not meeting:
+        logger.error(f"Meeting transcript with ID {meeting_id} not found")
+        return {
+            "success": False,
+            "error": f"Meeting transcript with ID {meeting_id} not found"
+        }
+    
+    success = MeetingBaaSService().process_webhook(meeting, webhook_data)
+    return {
+        "success": success,
+        "event": webhook_data.get('event')
+    }
+
+
+def schedule_meeting_bot(meeting_id):
+    """
+    Create the Meeting BaaS bot for a meeting (run via core.background.run_in_background)
+    
+    Args:
+        meeting_id (int): ID of the MeetingTranscript to schedule a bot for
+        
+    Returns:
+        dict: Result of the scheduling
+    """
+    from django.conf import settings
+    from agents.models import MeetingTranscript
+    from agents.services.meetingbaas_service import MeetingBaaSService
+    
+    meeting = MeetingTranscript.objects.filter(id=meeting_id).first()
+    if not meeting:
+        logger.error(f"Meeting transcript with ID {meeting_id} not found")
+        return {
+            "success": False,
+            "error": f"Meeting transcript with ID {meeting_id} not found"
+        }
+    
+    if meeting.meetingbaas_bot_id:
+        return {
+            "success": True,
+            "bot_id": meeting.meetingbaas_bot_id
+        }
+    
+    try:
+        data = MeetingBaaSService().create_bot(meeting, settings.HOST_URL)
+    except Exception as e:
+        logger.error(f"Error scheduling meeting bot for meeting {meeting_id}: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    
+    logger.info(f"Scheduled meeting bot for meeting {meeting_id}")
+    return {
+        "success": True,
+        "bot_id": data.get('botId')
+    }
+
+
+def schedule_meeting_bots_for_day(day=None):
+    """
+    Create Meeting BaaS bots for all of a day's scheduled meetings that don't have one yet
+    
+    Args:
+        day (date): Day to schedule (defaults to today)
+        
+    Returns:
+        dict: Number of bots scheduled and failed
+    """
+    from django.conf import settings
+    from django.db.models import Q
+    from agents.models import MeetingTranscript
+    from agents.services.meetingbaas_service import MeetingBaaSService
+    
+    day = day or timezone.localdate()
+    meetings = MeetingTranscript.objects.filter(
+        Q(meetingbaas_bot_id__isnull=True) | Q(meetingbaas_bot_id=''),
+        scheduled_time__date=day,
+        status='scheduled'
+    ).exclude(meeting_url='')
+    
+    results = MeetingBaaSService().schedule_bots(meetings, settings.HOST_URL)
+    scheduled = sum(1 for result in results.values() if result is True)
+    return {
+        "success": True,
+        "scheduled": scheduled,
+        "failed": len(results) - scheduled
+    }
+
+
+def refill_chat_thread_pool(company_id):
+    """
+    Top up a company's pool of pre-created chat threads (run via core.background.run_in_background)
+    
+    Args:
+        company_id (int): ID of the Company
+        
+    Returns:
+        dict: Number of threads created
+    """
+    from django.core.cache import cache
+    from companies.models import Company
+    from chat.services.openai_service import ChatOpenAIService
+    
+    try:
+        company = Company.objects.filter(id=company_id).first()
+        if not company:
+            return {
+                "success": False,
+                "error": f"Company with ID {company_id} not found"
+            }
+        
+        created = ChatOpenAIService().refill_pool(company)
+        logger.info(f"Added {created} pre-created chat threads for company {company_id}")
+        return {
+            "success": True,
+            "created": created
+        }
+    except Exception as e:
+        logger.error(f"Error refilling chat thread pool for company {company_id}: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    finally:
+        cache.delete(f"chat_thread_pool_refill:{company_id}")
+
+
+def delete_chat_threads(thread_ids):
+    """
+    Delete OpenAI threads that are no longer used, e.g. expired pre-created ones (run via core.background.run_in_background)
+    
+    Args:
+        thread_ids (list): OpenAI thread IDs
+        
+    Returns:
+        dict: Number of threads deleted
+    """
+    from chat.services.openai_service import ChatOpenAIService
+    
+    deleted = ChatOpenAIService().delete_remote_threads(thread_ids)
+    return {
+        "success": deleted == len(thread_ids),
+        "deleted": deleted
+    }
+
+
+def provision_company_ai(company_id, max_retries=None):
+    """
+    Set up a company's OpenAI assistant and vector store (run via core.background.run_in_background)
+    
+    Temporary failures are retried with exponential backoff. The outcome is
+    recorded in Company.ai_status; a run for a company that is ready, or
+    already being provisioned, does nothing.
+    
+    Args:
+        company_id (int): ID of the Company
+        max_retries (int): Retries after the first attempt (defaults to COMPANY_AI_PROVISION_MAX_RETRIES)
+        
+    Returns:
+        dict: Result of the provisioning
+    """
+    import random
+    from datetime import timedelta
+    from django.conf import settings
+    from django.db.models import Q
+    from companies.models import Company
+    from companies.services.openai_service import CompanyOpenAIService
+    
+    if max_retries is None:
+        max_retries = getattr(settings, 'COMPANY_AI_PROVISION_MAX_RETRIES', 3)
+    backoff = getattr(settings, 'COMPANY_AI_PROVISION_BACKOFF', 5)
+    
+    # A run that died mid-way leaves the status at provisioning; take over once it is stale
+    stale = timezone.now() - timedelta(minutes=10)
+    started = Company.objects.filter(id=company_id).filter(
+        Q(ai_status__in=['pending', 'failed'])
+        | Q(ai_status='provisioning', ai_status_updated_at__lt=stale)
+        | Q(ai_status='provisioning', ai_status_updated_at__isnull=True)
+    ).update(ai_status='provisioning', ai_status_updated_at=timezone.now())
+    if not started:
+        return {
+            "success": True,
+            "skipped": True
+        }
+    
+    company = Company.objects.get(id=company_id)
+    service = CompanyOpenAIService()
+    attempt = 0
+    while True:
+        result = service.provision(company)
+        if result['success'] or not result.get('retryable', True) or attempt >= max_retries:
+            break
+        delay = backoff * (2 ** attempt) * random.uniform(1, 1.5)
+        attempt += 1
+        logger.info(f"Provisioning OpenAI resources for company {company_id} failed, retrying in {delay:.0f} seconds (attempt {attempt + 1})")
+        time.sleep(delay)
+    
+    # Queryset update so edits made to the company meanwhile aren't overwritten
+    Company.objects.filter(id=company_id).update(
+        openai_assistant_id=company.openai_assistant_id,
+        openai_vector_store_id=company.openai_vector_store_id,
+        ai_status='ready' if result['success'] else 'failed',
+        ai_error='' if result['success'] else result.get('error', 'Unknown error'),
+        ai_status_updated_at=timezone.now()
+    )
+    
+    if result['success']:
+        logger.info(f"Provisioned OpenAI resources for company {company_id} - Assistant ID: {company.openai_assistant_id}")
+        _queue_pending_vector_store_files(company_id)
+    else:
+        logger.error(f"Failed to provision OpenAI resources for company {company_id}: {result.get('error')}")
+    return {
+        "success": result['success'],
+        "attempts": attempt + 1,
+        "error": result.get('error')
+    }
+
+
+def _queue_pending_vector_store_files(company_id):
+    """Queue a company's files that were left pending while its vector store was being set up"""
+    from core.background import run_in_background
+    from datasilo.models import DataFile
+    
+    file_ids = list(DataFile.objects.filter(
+        company_id=company_id, vector_store_status='pending', vector_store_file_id__isnull=True
+    ).values_list('id', flat=True))
+    for file_id in file_ids:
+        run_in_background(process_file_for_vector_store, file_id)
+    if file_ids:
+        logger.info(f"Queued {len(file_ids)} pending files for company {company_id}'s new vector store")
+
+
+def refill_company_ai_pool():
+    """
+    Top up the pool of pre-created assistants and vector stores (run via core.background.run_in_background)
+    
+    Returns:
+        dict: Number of pairs created
+    """
+    from django.core.cache import cache
+    from companies.services.openai_service import CompanyOpenAIService
+    
+    try:
+        created = CompanyOpenAIService().refill_pool()
+        logger.info(f"Added {created} pre-created assistants to the company AI pool")
+        return {
+            "success": True,
+            "created": created
+        }
+    except Exception as e:
+        logger.error(f"Error refilling company AI pool: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    finally:
+        cache.delete("company_ai_pool_refill")
+
+
+def reconcile_vector_stores(company_id=None, dry_run=False):
+    """
+    Reconcile DataFile rows with the companies' OpenAI vector stores (see VectorStoreSyncService)
+    
+    Companies whose AI setup failed are provisioned again first, so they get
+    a vector store to reconcile, and the pool of pre-created assistants is
+    topped up.
+    
+    Args:
+        company_id (int): Only reconcile this company (defaults to all companies)
+        dry_run (bool): Only count what would change
+        
+    Returns:
+        dict: Totals of orphans deleted, statuses fixed and files requeued, and
+            of companies whose AI setup was retried
+    """
+    from companies.models import Company
+    from companies.services.openai_service import CompanyOpenAIService
+    from datasilo.services.vector_store_sync_service import VectorStoreSyncService
+    
+    companies = None
+    if company_id:
+        companies = Company.objects.filter(id=company_id)
+    
+    failed_ids = list((companies if companies is not None else Company.objects.all())
+                      .filter(ai_status='failed').values_list('id', flat=True))
+    provisioned = 0
+    if not dry_run:
+        for failed_id in failed_ids:
+            if provision_company_ai(failed_id, max_retries=0)['success']:
+                provisioned += 1
+        CompanyOpenAIService().schedule_pool_refill()
+    
+    result = VectorStoreSyncService(dry_run=dry_run).reconcile_all(companies)
+    result = dict(result, ai_setup_retried=len(failed_ids), ai_setup_fixed=provisioned)
+    logger.info(f"Vector store reconciliation finished: {result}")
+    return dict(result, success=True)
+
+
+def delete_vector_store_files(vector_store_id, file_ids):
+    """
+    Remove deleted DataFiles' uploads from OpenAI (run via core.background.run_in_background)
+    
+    Args:
+        vector_store_id (str): OpenAI vector store ID, or None if the company has none
+        file_ids (list): OpenAI file IDs
+        
+    Returns:
+        dict: Number of files deleted
+    """
+    from datasilo.services.vector_store_sync_service import VectorStoreSyncService
+    
+    deleted = VectorStoreSyncService().delete_remote_files(vector_store_id, file_ids)
+    return {
+        "success": deleted == len(file_ids),
+        "deleted": deleted
+    }
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DataSilo, DataFile
+from .models import DataSilo, DataFile, ReingestRun
 
 class DataFileInline(admin.TabularInline):
     model = DataFile
@@ -81,3 +81,8 @@ class DataFileAdmin(admin.ModelAdmin):
         else:
             return f"{size / (1024 * 1024 * 1024):.1f} GB"
     size_display.short_description = 'Size'
+
+@admin.register(ReingestRun)
+class ReingestRunAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_file_id', 'processed', 'failed', 'bytes_processed', 'started_at', 'finished_at')
+    readonly_fields = ('filters', 'last_file_id', 'processed', 'failed', 'bytes_processed', 'started_at', 'updated_at', 'finished_at')
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DatasiloConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'datasilo'
+
+    def ready(self):
+        # Import signal handlers
+        import datasilo.signals
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.tasks import reconcile_vector_stores
+
+
+class Command(BaseCommand):
+    help = ('Reconcile data files with the OpenAI vector stores: delete orphans, fix statuses and requeue stuck '
+            'files. Also retries failed company AI setups and tops up the pool of pre-created assistants')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            type=int,
+            help='Only reconcile the company with this ID',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without changing anything',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Reconcile once and exit',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=3600,
+            help='Seconds between reconciliation runs (default: 3600)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                result = reconcile_vector_stores(options['company'], dry_run=options['dry_run'])
+                prefix = 'Would have: ' if options['dry_run'] else ''
+                self.stdout.write(self.style.SUCCESS(
+                    f"{prefix}Checked {result.get('remote_files', 0)} vector store files, "
+                    f"deleted {result.get('orphans_deleted', 0)} orphans, "
+                    f"fixed {result.get('statuses_fixed', 0)} statuses, "
+                    f"requeued {result.get('requeued', 0)} files, "
+                    f"gave up on {result.get('gave_up', 0)} files, "
+                    f"retried AI setup of {result.get('ai_setup_retried', 0)} companies "
+                    f"({result.get('ai_setup_fixed', 0)} fixed)"
+                ))
+                if result.get('errors'):
+                    self.stdout.write(self.style.ERROR(f"{result['errors']} companies could not be reconciled"))
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Error reconciling vector stores: {str(e)}'))
+            
+            if options['once'] or options['dry_run']:
+                return
+            time.sleep(options['interval'])
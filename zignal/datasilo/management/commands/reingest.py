@@ -0,0 +1,122 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from datasilo.models import ReingestRun
+from datasilo.services.reingest_service import ReingestService, select_files
+
+
+class Command(BaseCommand):
+    help = 'Re-ingest data files into the OpenAI vector stores with a worker pool, resuming interrupted runs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--run',
+            help='Name of the run; rerunning with the same name resumes it (default: a new timestamped run)',
+        )
+        parser.add_argument('--company', type=int, help='Only files of the company with this ID')
+        parser.add_argument('--silo', type=int, help='Only files in the data silo with this ID')
+        parser.add_argument(
+            '--status',
+            action='append',
+            dest='statuses',
+            help='Only files with this vector store status (repeatable, e.g. --status failed --status pending)',
+        )
+        parser.add_argument('--since', help='Only files created on or after this date (YYYY-MM-DD or ISO datetime)')
+        parser.add_argument('--until', help='Only files created before this date (YYYY-MM-DD or ISO datetime)')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Files processed concurrently (default: 4)',
+        )
+        parser.add_argument(
+            '--retries',
+            type=int,
+            default=0,
+            help='Retries per file for temporary errors (default: 0; failed files can be re-run with --status failed)',
+        )
+        parser.add_argument(
+            '--embeddings',
+            action='store_true',
+            help='Also regenerate the local chunk embeddings of each file',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Start the named run again from the first file',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the files that would be processed',
+        )
+
+    def handle(self, *args, **options):
+        filters = {
+            name: options[name]
+            for name in ('company', 'silo', 'statuses', 'since', 'until')
+            if options[name]
+        }
+        name = options['run'] or f"reingest-{timezone.now():%Y%m%d-%H%M%S}"
+        
+        run = ReingestRun.objects.filter(name=name).first()
+        if run and options['restart']:
+            run.delete()
+            run = None
+        if run:
+            if filters and filters != run.filters:
+                raise CommandError(f"Run '{name}' was started with {run.filters}; use --restart to change the selection")
+            if run.finished_at:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Run '{name}' already finished: {run.processed} processed, {run.failed} failed"
+                ))
+                return
+            self.stdout.write(self.style.WARNING(f"Resuming run '{name}' after file {run.last_file_id}"))
+        else:
+            try:
+                select_files(filters).exists()
+            except ValueError as e:
+                raise CommandError(str(e))
+            if options['dry_run']:
+                run = ReingestRun(name=name, filters=filters)
+            else:
+                run = ReingestRun.objects.create(name=name, filters=filters)
+                self.stdout.write(f"Started run '{name}' (resume with --run {name})")
+        
+        service = ReingestService(
+            run,
+            workers=options['workers'],
+            retries=options['retries'],
+            embeddings=options['embeddings'],
+            on_progress=self._report,
+        )
+        
+        if options['dry_run']:
+            remaining = service.pending_files()
+            total_bytes = sum(remaining.values_list('size', flat=True))
+            self.stdout.write(f"{remaining.count()} files ({self._format_bytes(total_bytes)}) would be re-ingested")
+            return
+        
+        stats = service.execute()
+        self.stdout.write(self.style.SUCCESS(
+            f"Run '{name}' finished: {stats['processed']} processed, {stats['failed']} failed, "
+            f"{self._format_bytes(stats['bytes_processed'])} in {stats['elapsed']:.0f}s"
+        ))
+        if stats['failed']:
+            self.stdout.write(self.style.WARNING(
+                "Re-run failed files with: manage.py reingest --status failed"
+            ))
+
+    def _report(self, stats):
+        self.stdout.write(
+            f"[{stats['run']}] up to file {stats['last_file_id']}: "
+            f"{stats['processed']} processed, {stats['failed']} failed, "
+            f"{stats['files_per_second']:.2f} files/s, {self._format_bytes(stats['bytes_per_second'])}/s"
+        )
+
+    @staticmethod
+    def _format_bytes(size):
+        for unit in ('B', 'KB', 'MB', 'GB'):
+            if size < 1024 or unit == 'GB':
+                return f"{size:.1f} {unit}" if unit != 'B' else f"{size:.0f} B"
+            size /= 1024
@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-19 08:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_company_openai_assistant_id_and_more'),
+        ('datasilo', '0004_remove_datafile_original_file_path'),
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataFileChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chunk_index', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('token_count', models.PositiveIntegerField(default=0)),
+                ('embedding', models.BinaryField(blank=True, null=True)),
+                ('embedding_model', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='file_chunks', to='companies.company')),
+                ('data_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='datasilo.datafile')),
+                ('data_silo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='datasilo.datasilo')),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='file_chunks', to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'Data File Chunk',
+                'verbose_name_plural': 'Data File Chunks',
+                'ordering': ['data_file', 'chunk_index'],
+                'indexes': [models.Index(fields=['company', 'embedding_model'], name='datasilo_da_company_536d47_idx'), models.Index(fields=['data_silo', 'embedding_model'], name='datasilo_da_data_si_36dfe4_idx')],
+                'constraints': [models.UniqueConstraint(fields=('data_file', 'chunk_index'), name='unique_chunk_index_per_file')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-19 08:51
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_company_openai_assistant_id_and_more'),
+        ('datasilo', '0005_datafilechunk'),
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datafilechunk',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='datafilechunk',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='datafilechunk_search_gin'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datasilo', '0006_datafilechunk_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datafile',
+            name='vector_store_attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Times the vector store reconciler has requeued this file'),
+        ),
+    ]
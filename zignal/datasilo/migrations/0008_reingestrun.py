@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-19 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datasilo', '0007_datafile_vector_store_attempts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReingestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('filters', models.JSONField(blank=True, default=dict, help_text='File selection the run was started with')),
+                ('last_file_id', models.BigIntegerField(default=0)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('bytes_processed', models.BigIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Re-ingest Run',
+                'verbose_name_plural': 'Re-ingest Runs',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 09:26
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('companies', '0004_company_ai_status'),
+        ('datasilo', '0008_reingestrun'),
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='datafile',
+            index=models.Index(fields=['data_silo', 'created_at'], name='datafile_silo_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='datafile',
+            index=models.Index(fields=['company', 'vector_store_status'], name='datafile_company_vs_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='datafile',
+            index=models.Index(fields=['status'], name='datafile_status_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 import uuid
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings
 from django.utils.text import slugify
 from projects.models import Project
@@ -160,6 +162,8 @@ class DataFile(models.Model):
                                              ('skipped', 'Skipped (Unsupported Format)')
                                          ])
     vector_store_processed_at = models.DateTimeField(null=True, blank=True)
+    vector_store_attempts = models.PositiveSmallIntegerField(default=0,
+                                                             help_text="Times the vector store reconciler has requeued this file")
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -175,6 +179,13 @@ class DataFile(models.Model):
         verbose_name = 'Data File'
         verbose_name_plural = 'Data Files'
         ordering = ['-created_at']
+        indexes = [
+            # Silo file listings, newest first
+            models.Index(fields=['data_silo', 'created_at'], name='datafile_silo_created_idx'),
+            # Vector store processing and reconciliation per company
+            models.Index(fields=['company', 'vector_store_status'], name='datafile_company_vs_idx'),
+            models.Index(fields=['status'], name='datafile_status_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -186,3 +197,94 @@ class DataFile(models.Model):
         if self.data_silo and not self.company and self.data_silo.company:
             self.company = self.data_silo.company
         super().save(*args, **kwargs)
+
+
+class DataFileChunk(models.Model):
+    """
+    Model representing a chunk of extracted text from a data file together
+    with its embedding vector. Embeddings are stored as raw float32 bytes so
+    a whole silo can be loaded into a NumPy matrix in a single query.
+    """
+    data_file = models.ForeignKey(
+        DataFile,
+        on_delete=models.CASCADE,
+        related_name='chunks'
+    )
+    # Denormalised from the data file so similarity search can be scoped
+    # without joining through DataFile
+    data_silo = models.ForeignKey(
+        DataSilo,
+        on_delete=models.CASCADE,
+        related_name='chunks'
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='file_chunks',
+        null=True,
+        blank=True
+    )
+    company = models.ForeignKey(
+        'companies.Company',
+        on_delete=models.CASCADE,
+        related_name='file_chunks',
+        null=True,
+        blank=True
+    )
+    chunk_index = models.PositiveIntegerField()
+    text = models.TextField()
+    token_count = models.PositiveIntegerField(default=0)
+    
+    # Embedding vector (L2-normalised float32, little endian)
+    embedding = models.BinaryField(null=True, blank=True)
+    embedding_model = models.CharField(max_length=100, blank=True, null=True)
+    
+    # Full-text search vector over the chunk text (PostgreSQL only)
+    search_vector = SearchVectorField(null=True, blank=True)
+    
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Data File Chunk'
+        verbose_name_plural = 'Data File Chunks'
+        ordering = ['data_file', 'chunk_index']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['data_file', 'chunk_index'],
+                name='unique_chunk_index_per_file'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['company', 'embedding_model']),
+            models.Index(fields=['data_silo', 'embedding_model']),
+            GinIndex(fields=['search_vector'], name='datafilechunk_search_gin'),
+        ]
+    
+    def __str__(self):
+        return f"{self.data_file.name} [{self.chunk_index}]"
+
+
+class ReingestRun(models.Model):
+    """
+    Progress of a bulk re-ingestion (manage.py reingest), so an interrupted
+    run can be resumed. Files are processed in ID order and last_file_id is
+    the highest ID below which every selected file has been handled.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    filters = models.JSONField(default=dict, blank=True, help_text="File selection the run was started with")
+    last_file_id = models.BigIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    bytes_processed = models.BigIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Re-ingest Run'
+        verbose_name_plural = 'Re-ingest Runs'
+        ordering = ['-started_at']
+    
+    def __str__(self):
+        return f"{self.name} (up to file {self.last_file_id})"
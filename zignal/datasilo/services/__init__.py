@@ -0,0 +1,3 @@
+"""
+Services for data silo ingestion and retrieval
+""" 
\ No newline at end of file
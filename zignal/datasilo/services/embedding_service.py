@@ -0,0 +1,255 @@
+"""
+Service for chunking data files and storing their embeddings
+"""
+import io
+import json
+import logging
+import os
+from typing import Dict, Any, List
+
+import numpy as np
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from agents.services.openai_service import OpenAIService
+from core.llm_usage import track_llm_call
+from core.openai_scheduler import BATCH
+from datasilo.models import DataFile, DataFileChunk
+
+logger = logging.getLogger(__name__)
+
+# File extensions we can read as plain text without extra libraries
+TEXT_EXTENSIONS = ('.txt', '.md', '.csv', '.tsv', '.json', '.html', '.htm', '.xml', '.log')
+
+# Text search configuration used for chunk search vectors and queries
+SEARCH_CONFIG = 'english'
+
+
+def extract_text(data_file: DataFile) -> str:
+    """
+    Extract plain text from a data file
+
+    Args:
+        data_file: DataFile object
+
+    Returns:
+        str: The extracted text, or an empty string for unsupported formats
+    """
+    ext = os.path.splitext(data_file.file.name)[1].lower()
+    content_type = (data_file.content_type or '').lower()
+
+    with data_file.file.open('rb') as f:
+        raw = f.read()
+
+    if ext == '.pdf' or 'pdf' in content_type:
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            logger.warning("pypdf is not installed, skipping PDF text extraction")
+            return ''
+        reader = PdfReader(io.BytesIO(raw))
+        return '\n\n'.join(page.extract_text() or '' for page in reader.pages)
+
+    if ext == '.json' or 'json' in content_type:
+        try:
+            # Re-serialise so nested structures chunk on line boundaries
+            return json.dumps(json.loads(raw.decode('utf-8')), indent=2, ensure_ascii=False)
+        except (ValueError, UnicodeDecodeError):
+            pass
+
+    if ext in TEXT_EXTENSIONS or content_type.startswith('text/'):
+        return raw.decode('utf-8', errors='replace')
+
+    return ''
+
+
+def chunk_text(text: str, chunk_size: int = None, overlap: int = None) -> List[str]:
+    """
+    Split text into overlapping chunks, preferring paragraph and line breaks
+
+    Args:
+        text: Text to split
+        chunk_size: Target chunk size in characters
+        overlap: Number of characters shared between consecutive chunks
+
+    Returns:
+        List[str]: The chunks
+    """
+    if chunk_size is None:
+        chunk_size = getattr(settings, 'EMBEDDING_CHUNK_SIZE', 2000)
+    if overlap is None:
+        overlap = getattr(settings, 'EMBEDDING_CHUNK_OVERLAP', 200)
+
+    text = text.strip()
+    if not text:
+        return []
+
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            # Break on the last paragraph, line or word boundary in the window
+            window = text[start:end]
+            for separator in ('\n\n', '\n', ' '):
+                cut = window.rfind(separator)
+                if cut > chunk_size // 2:
+                    end = start + cut
+                    break
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+
+    return chunks
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token for English text)"""
+    return max(1, len(text) // 4)
+
+
+def to_vector_bytes(embeddings: List[List[float]]) -> List[bytes]:
+    """
+    Convert embeddings to L2-normalised float32 bytes
+
+    Normalising at write time means similarity search is a single dot product.
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix = matrix / norms
+    return [row.astype('<f4').tobytes() for row in matrix]
+
+
+class EmbeddingService:
+    """
+    Service for splitting data files into chunks and embedding them in batches
+    """
+
+    def __init__(self):
+        self.openai_service = OpenAIService(lane=BATCH, feature='embedding')
+        self.embeddings_model = settings.OPENAI_EMBEDDINGS_MODEL
+
+    def embed_data_file(self, data_file: DataFile) -> Dict[str, Any]:
+        """
+        Extract, chunk and embed a data file, replacing any existing chunks
+
+        Args:
+            data_file: DataFile object
+
+        Returns:
+            dict: Result of the operation
+        """
+        try:
+            text = extract_text(data_file)
+        except Exception as e:
+            logger.error(f"Error extracting text from file {data_file.id}: {str(e)}")
+            return {"success": False, "error": f"Error extracting text: {str(e)}"}
+
+        chunks = chunk_text(text)
+        if not chunks:
+            logger.info(f"No text to embed for file {data_file.id} ({data_file.name})")
+            return {"success": False, "error": "No extractable text", "skipped": True}
+
+        try:
+            with track_llm_call('embedding', data_file.company_id):
+                embeddings = self.openai_service.generate_embeddings_batch(chunks)
+        except Exception as e:
+            logger.error(f"Error embedding file {data_file.id}: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+        vectors = to_vector_bytes(embeddings)
+
+        with transaction.atomic():
+            DataFileChunk.objects.filter(data_file=data_file).delete()
+            DataFileChunk.objects.bulk_create([
+                DataFileChunk(
+                    data_file=data_file,
+                    data_silo_id=data_file.data_silo_id,
+                    project_id=data_file.project_id,
+                    company_id=data_file.company_id,
+                    chunk_index=index,
+                    text=chunk,
+                    token_count=estimate_tokens(chunk),
+                    embedding=vector,
+                    embedding_model=self.embeddings_model,
+                )
+                for index, (chunk, vector) in enumerate(zip(chunks, vectors))
+            ], batch_size=500)
+            if connection.vendor == 'postgresql':
+                DataFileChunk.objects.filter(data_file=data_file).update(
+                    search_vector=SearchVector('text', config=SEARCH_CONFIG)
+                )
+            DataFile.objects.filter(id=data_file.id).update(
+                embedding_available=True,
+                processed_at=timezone.now()
+            )
+
+        logger.info(f"Stored {len(chunks)} embedded chunks for file {data_file.id} ({data_file.name})")
+        return {"success": True, "chunk_count": len(chunks)}
+
+    def append_text(self, data_file: DataFile, text: str) -> Dict[str, Any]:
+        """
+        Chunk and embed text that was appended to a data file, keeping the
+        file's existing chunks
+
+        Args:
+            data_file: DataFile object
+            text: The new text
+
+        Returns:
+            dict: Result of the operation
+        """
+        chunks = chunk_text(text)
+        if not chunks:
+            return {"success": False, "error": "No text to embed", "skipped": True}
+
+        try:
+            with track_llm_call('embedding', data_file.company_id):
+                embeddings = self.openai_service.generate_embeddings_batch(chunks)
+        except Exception as e:
+            logger.error(f"Error embedding appended text for file {data_file.id}: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+        vectors = to_vector_bytes(embeddings)
+
+        with transaction.atomic():
+            # Lock the file so concurrent appends get consecutive chunk indexes
+            DataFile.objects.select_for_update().filter(id=data_file.id).first()
+            last_index = DataFileChunk.objects.filter(data_file=data_file).aggregate(last=Max('chunk_index'))['last']
+            start_index = 0 if last_index is None else last_index + 1
+
+            DataFileChunk.objects.bulk_create([
+                DataFileChunk(
+                    data_file=data_file,
+                    data_silo_id=data_file.data_silo_id,
+                    project_id=data_file.project_id,
+                    company_id=data_file.company_id,
+                    chunk_index=start_index + offset,
+                    text=chunk,
+                    token_count=estimate_tokens(chunk),
+                    embedding=vector,
+                    embedding_model=self.embeddings_model,
+                )
+                for offset, (chunk, vector) in enumerate(zip(chunks, vectors))
+            ], batch_size=500)
+            if connection.vendor == 'postgresql':
+                DataFileChunk.objects.filter(data_file=data_file, chunk_index__gte=start_index).update(
+                    search_vector=SearchVector('text', config=SEARCH_CONFIG)
+                )
+            DataFile.objects.filter(id=data_file.id).update(
+                embedding_available=True,
+                processed_at=timezone.now()
+            )
+
+        logger.info(f"Appended {len(chunks)} embedded chunks to file {data_file.id} ({data_file.name})")
+        return {"success": True, "start_index": start_index, "chunk_count": len(chunks)}
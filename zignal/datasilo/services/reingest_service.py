@@ -0,0 +1,219 @@
+"""
+Service for re-ingesting data files in bulk
+"""
+import logging
+import time
+from datetime import datetime
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from django.db import close_old_connections, connection
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from datasilo.models import DataFile, ReingestRun
+from datasilo.services.vector_store_sync_service import VectorStoreSyncService, is_vector_store_id
+
+logger = logging.getLogger(__name__)
+
+
+def select_files(filters: Dict[str, Any]) -> QuerySet:
+    """
+    Data files matching a re-ingest selection
+
+    Args:
+        filters: Any of company (ID), silo (ID), statuses (vector store
+            statuses), since and until (ISO dates or datetimes, on created_at)
+
+    Returns:
+        QuerySet: The matching data files
+    """
+    files = DataFile.objects.all()
+    if filters.get('company'):
+        files = files.filter(Q(company_id=filters['company']) | Q(data_silo__company_id=filters['company']))
+    if filters.get('silo'):
+        files = files.filter(data_silo_id=filters['silo'])
+    if filters.get('statuses'):
+        files = files.filter(vector_store_status__in=filters['statuses'])
+    if filters.get('since'):
+        files = files.filter(created_at__gte=_parse_moment(filters['since']))
+    if filters.get('until'):
+        files = files.filter(created_at__lt=_parse_moment(filters['until']))
+    return files
+
+
+def _parse_moment(value: str):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        moment = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    elif timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class ReingestService:
+    """
+    Service for re-processing a selection of data files for the vector store
+
+    Files are handled in ID order by a pool of worker threads. The run's
+    checkpoint (ReingestRun.last_file_id) only moves past a file once it and
+    every file before it have finished, so a rerun after an interruption
+    carries on without skipping or repeating files beyond those in flight.
+    A file's previous vector store upload is deleted once its new one succeeds.
+    """
+
+    def __init__(self,
+                 run: ReingestRun,
+                 workers: int = 4,
+                 retries: int = 0,
+                 embeddings: bool = False,
+                 checkpoint_interval: float = 5,
+                 on_progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.run = run
+        self.workers = workers
+        self.retries = retries
+        self.embeddings = embeddings
+        self.checkpoint_interval = checkpoint_interval
+        self.on_progress = on_progress
+        self.sync = VectorStoreSyncService()
+
+        self._in_order = deque()
+        self._finished = {}
+        self._session = {'processed': 0, 'failed': 0, 'bytes': 0}
+        self._started = None
+        self._last_checkpoint = 0
+
+    def pending_files(self) -> QuerySet:
+        """Files of the run that are still to be processed"""
+        return select_files(self.run.filters).filter(id__gt=self.run.last_file_id).order_by('id')
+
+    def execute(self) -> Dict[str, Any]:
+        """
+        Process the run's remaining files
+
+        Returns:
+            dict: Progress statistics for this session
+        """
+        self._started = time.monotonic()
+        self._last_checkpoint = self._started
+        files = self.pending_files().values_list(
+            'id', 'size', 'vector_store_file_id', 'vector_store_status', 'company__openai_vector_store_id'
+        )
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='zignal-reingest') as executor:
+            in_flight = {}
+            for file_id, size, old_file_id, old_status, vector_store_id in files.iterator(chunk_size=500):
+                # Keep a bounded number of files queued so progress is checkpointed as we go
+                while len(in_flight) >= self.workers * 2:
+                    self._collect(in_flight, wait(in_flight, return_when=FIRST_COMPLETED).done)
+                future = executor.submit(self._process, file_id, old_file_id, old_status, vector_store_id)
+                in_flight[future] = (file_id, size or 0)
+                self._in_order.append(file_id)
+            while in_flight:
+                self._collect(in_flight, wait(in_flight, return_when=FIRST_COMPLETED).done)
+
+        self._checkpoint(finished=True)
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals for the run and throughput for this session"""
+        elapsed = max(time.monotonic() - self._started, 0.001) if self._started else 0.001
+        return {
+            'run': self.run.name,
+            'last_file_id': self.run.last_file_id,
+            'processed': self.run.processed,
+            'failed': self.run.failed,
+            'bytes_processed': self.run.bytes_processed,
+            'elapsed': elapsed,
+            'files_per_second': (self._session['processed'] + self._session['failed']) / elapsed,
+            'bytes_per_second': self._session['bytes'] / elapsed,
+        }
+
+    def _process(self, file_id: int, old_file_id: Optional[str], old_status: str,
+                 vector_store_id: Optional[str]) -> bool:
+        """
+        Re-upload one file (runs on a worker thread)
+
+        If the new upload fails the old one is put back on the row, so it keeps
+        being searched and the reconciler doesn't delete it as an orphan.
+        """
+        from core.tasks import embed_file_chunks, process_file_for_vector_store
+
+        close_old_connections()
+        try:
+            # Processing skips files that already have an upload, so clear it first
+            DataFile.objects.filter(id=file_id).update(vector_store_file_id=None)
+            result = process_file_for_vector_store(file_id, max_retries=self.retries)
+            if not result.get('success'):
+                logger.warning(f"Re-ingesting file {file_id} failed: {result.get('error')}")
+                self._restore(file_id, old_file_id, old_status)
+                return False
+
+            if old_file_id and old_file_id != result.get('file_id'):
+                self.sync.delete_remote_files(
+                    vector_store_id if is_vector_store_id(vector_store_id) else None,
+                    [old_file_id]
+                )
+            if self.embeddings:
+                embed_file_chunks(file_id)
+            return True
+        except Exception as e:
+            logger.error(f"Error re-ingesting file {file_id}: {str(e)}")
+            self._restore(file_id, old_file_id, old_status)
+            return False
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _restore(file_id: int, old_file_id: Optional[str], old_status: str):
+        """Put the previous upload back on a file whose re-upload failed, unless a new one was recorded"""
+        if not old_file_id:
+            return
+        try:
+            DataFile.objects.filter(id=file_id, vector_store_file_id__isnull=True).update(
+                vector_store_file_id=old_file_id,
+                vector_store_status=old_status
+            )
+        except Exception as e:
+            logger.error(f"Could not restore the previous upload of file {file_id}: {str(e)}")
+
+    def _collect(self, in_flight: dict, done):
+        for future in done:
+            file_id, size = in_flight.pop(future)
+            self._finished[file_id] = (future.result(), size)
+
+        # Advance the checkpoint over the files that are finished in ID order
+        advanced = {'processed': 0, 'failed': 0, 'bytes': 0}
+        while self._in_order and self._in_order[0] in self._finished:
+            file_id = self._in_order.popleft()
+            succeeded, size = self._finished.pop(file_id)
+            advanced['processed' if succeeded else 'failed'] += 1
+            if succeeded:
+                advanced['bytes'] += size
+            self.run.last_file_id = file_id
+
+        for name, value in advanced.items():
+            self._session[name] += value
+        self.run.processed += advanced['processed']
+        self.run.failed += advanced['failed']
+        self.run.bytes_processed += advanced['bytes']
+
+        if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self._checkpoint()
+
+    def _checkpoint(self, finished: bool = False):
+        """Save the run's progress and report it"""
+        fields = ['last_file_id', 'processed', 'failed', 'bytes_processed', 'updated_at']
+        if finished:
+            self.run.finished_at = timezone.now()
+            fields.append('finished_at')
+        self.run.save(update_fields=fields)
+        self._last_checkpoint = time.monotonic()
+
+        if self.on_progress:
+            self.on_progress(self.stats())
@@ -0,0 +1,154 @@
+"""
+Service for hybrid lexical and vector retrieval over a company's data silos
+"""
+import logging
+import time
+from typing import Dict, Any, List, Optional
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F
+
+from datasilo.models import DataSilo, DataFileChunk
+from datasilo.services.embedding_service import SEARCH_CONFIG
+from datasilo.services.vector_search_service import VectorSearchService
+from permissions import has_silo_permission
+
+logger = logging.getLogger(__name__)
+
+# Reciprocal-rank fusion constant; 60 is the value from the original RRF paper
+RRF_K = 60
+
+
+class RetrievalService:
+    """
+    Service combining full-text search and vector similarity with
+    reciprocal-rank fusion, restricted to silos the user may access
+    """
+
+    def __init__(self, user=None):
+        """
+        Initialize the retrieval service
+
+        Args:
+            user: User to check silo permissions for. None skips the check
+                  (for internal callers that already resolved their scope).
+        """
+        self.user = user
+        self.vector_search = VectorSearchService()
+
+    def accessible_silos(self, company=None, silos=None) -> List[DataSilo]:
+        """
+        Resolve the silos to search, dropping any the user cannot access
+
+        Args:
+            company: Optional Company whose silos should be searched
+            silos: Optional iterable of DataSilo objects to search
+
+        Returns:
+            List[DataSilo]: The permitted silos
+        """
+        if silos is None:
+            if company is None:
+                return []
+            silos = DataSilo.objects.filter(company=company).select_related('project', 'company', 'created_by')
+
+        if self.user is None:
+            return list(silos)
+        return [silo for silo in silos if has_silo_permission(self.user, silo)]
+
+    def search(self,
+               query: str,
+               company=None,
+               silos=None,
+               top_k: int = 10,
+               candidates: int = 50,
+               query_vector=None) -> Dict[str, Any]:
+        """
+        Run a hybrid search
+
+        Args:
+            query: Search text
+            company: Optional Company whose silos should be searched
+            silos: Optional iterable of DataSilo objects to search
+            top_k: Number of fused results to return
+            candidates: Number of results taken from each ranker before fusion
+            query_vector: Pre-computed normalised query embedding
+
+        Returns:
+            dict: Results ordered by fused score, plus timing information
+        """
+        start_time = time.monotonic()
+        query = (query or '').strip()
+        silo_ids = [silo.id for silo in self.accessible_silos(company=company, silos=silos)]
+        if not query or not silo_ids:
+            return {"results": [], "took_ms": 0}
+
+        lexical_ids = self._lexical_rank(query, silo_ids, candidates)
+
+        try:
+            ranked = self.vector_search.rank(query, data_silo=silo_ids, top_k=candidates,
+                                             query_vector=query_vector)
+            vector_ids = [chunk_id for chunk_id, _ in ranked]
+        except Exception as e:
+            # Keyword results are still useful if the embeddings API is unavailable
+            logger.error(f"Vector ranking failed, using lexical results only: {str(e)}")
+            vector_ids = []
+
+        fused = self._fuse([lexical_ids, vector_ids])[:top_k]
+        lexical_positions = {chunk_id: position for position, chunk_id in enumerate(lexical_ids, start=1)}
+        vector_positions = {chunk_id: position for position, chunk_id in enumerate(vector_ids, start=1)}
+        chunks = DataFileChunk.objects.select_related('data_file').in_bulk([chunk_id for chunk_id, _ in fused])
+
+        results = []
+        for chunk_id, score in fused:
+            chunk = chunks.get(chunk_id)
+            if chunk is None:
+                continue
+            results.append({
+                "chunk_id": chunk.id,
+                "file_id": chunk.data_file_id,
+                "file_name": chunk.data_file.name,
+                "data_silo_id": chunk.data_silo_id,
+                "chunk_index": chunk.chunk_index,
+                "text": chunk.text,
+                "score": round(score, 6),
+                "lexical_rank": lexical_positions.get(chunk_id),
+                "vector_rank": vector_positions.get(chunk_id),
+            })
+
+        took_ms = int((time.monotonic() - start_time) * 1000)
+        logger.info(f"Hybrid search over {len(silo_ids)} silos returned {len(results)} results in {took_ms} ms")
+        return {"results": results, "took_ms": took_ms}
+
+    def _lexical_rank(self, query: str, silo_ids: List[int], limit: int) -> List[int]:
+        """
+        Rank chunk ids with PostgreSQL full-text search, falling back to a
+        substring match on other databases
+        """
+        chunks = DataFileChunk.objects.filter(data_silo_id__in=silo_ids)
+
+        if connection.vendor == 'postgresql':
+            search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+            chunks = chunks.filter(search_vector=search_query).annotate(
+                rank=SearchRank(F('search_vector'), search_query)
+            ).order_by('-rank')
+        else:
+            chunks = chunks.filter(text__icontains=query).order_by('id')
+
+        return list(chunks.values_list('id', flat=True)[:limit])
+
+    @staticmethod
+    def _fuse(rankings: List[List[int]], k: Optional[int] = None) -> List[tuple]:
+        """
+        Merge ranked id lists with reciprocal-rank fusion
+
+        Returns:
+            List[tuple]: (chunk id, fused score) pairs ordered by descending score
+        """
+        k = RRF_K if k is None else k
+        scores = {}
+        for ranking in rankings:
+            for position, chunk_id in enumerate(ranking, start=1):
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + position)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
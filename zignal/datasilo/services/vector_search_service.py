@@ -0,0 +1,170 @@
+"""
+Service for similarity search over embedded data file chunks
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from agents.services.openai_service import OpenAIService
+from datasilo.models import DataFileChunk
+
+logger = logging.getLogger(__name__)
+
+# Per-process cache of scope matrices: scope key -> (version, chunk ids, matrix)
+_MATRIX_CACHE = OrderedDict()
+_MATRIX_CACHE_LOCK = threading.Lock()
+_MATRIX_CACHE_SIZE = 32
+
+
+class VectorSearchService:
+    """
+    Service for top-k cosine similarity search scoped by company, project or data silo
+    """
+
+    def __init__(self):
+        self.openai_service = OpenAIService(feature='search')
+        self.embeddings_model = settings.OPENAI_EMBEDDINGS_MODEL
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query and normalise it to unit length
+
+        Query embeddings are cached so repeated searches skip the API round-trip.
+        """
+        digest = hashlib.sha256(f"{self.embeddings_model}:{query}".encode('utf-8')).hexdigest()
+        cache_key = f"query_embedding:{digest}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return np.frombuffer(cached, dtype='<f4')
+
+        vector = np.asarray(self.openai_service.generate_embeddings(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+        cache.set(cache_key, vector.astype('<f4').tobytes(), 60 * 60 * 24)
+        return vector
+
+    def search(self,
+               query: str,
+               company=None,
+               project=None,
+               data_silo=None,
+               top_k: int = 5,
+               query_vector: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Find the chunks most similar to a query
+
+        Args:
+            query: Text to search for
+            company: Optional Company to restrict the search to
+            project: Optional Project to restrict the search to
+            data_silo: Optional DataSilo (or list of silos) to restrict the search to
+            top_k: Number of results to return
+            query_vector: Pre-computed normalised query embedding
+
+        Returns:
+            List[Dict[str, Any]]: Matching chunks ordered by descending score
+        """
+        ranked = self.rank(query, company=company, project=project, data_silo=data_silo,
+                           top_k=top_k, query_vector=query_vector)
+        if not ranked:
+            return []
+
+        chunks = DataFileChunk.objects.select_related('data_file').in_bulk([chunk_id for chunk_id, _ in ranked])
+        results = []
+        for chunk_id, score in ranked:
+            chunk = chunks.get(chunk_id)
+            if chunk is None:
+                continue
+            results.append({
+                "chunk_id": chunk.id,
+                "file_id": chunk.data_file_id,
+                "file_name": chunk.data_file.name,
+                "data_silo_id": chunk.data_silo_id,
+                "chunk_index": chunk.chunk_index,
+                "text": chunk.text,
+                "score": score,
+            })
+        return results
+
+    def rank(self,
+             query: str,
+             company=None,
+             project=None,
+             data_silo=None,
+             top_k: int = 5,
+             query_vector: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Rank chunk ids by similarity without loading chunk text
+
+        Returns:
+            List[Tuple[int, float]]: (chunk id, score) pairs ordered by descending score
+        """
+        chunk_ids, matrix = self._load_matrix(self._scope_queryset(company, project, data_silo))
+        if matrix is None or not len(chunk_ids):
+            return []
+
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+        if query_vector.shape[0] != matrix.shape[1]:
+            logger.error(f"Query embedding has {query_vector.shape[0]} dimensions, index has {matrix.shape[1]}")
+            return []
+
+        scores = matrix @ query_vector
+        k = min(top_k, len(scores))
+        # argpartition is O(n); only the k winners get sorted
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(chunk_ids[i]), float(scores[i])) for i in top]
+
+    def _scope_queryset(self, company=None, project=None, data_silo=None):
+        chunks = DataFileChunk.objects.filter(
+            embedding_model=self.embeddings_model,
+            embedding__isnull=False
+        )
+        if company is not None:
+            chunks = chunks.filter(company=company)
+        if project is not None:
+            chunks = chunks.filter(project=project)
+        if data_silo is not None:
+            if isinstance(data_silo, (list, tuple, set)) or hasattr(data_silo, 'model'):
+                chunks = chunks.filter(data_silo__in=data_silo)
+            else:
+                chunks = chunks.filter(data_silo=data_silo)
+        return chunks
+
+    def _load_matrix(self, chunks) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Load the embedding matrix for a scope, reusing the cached copy while
+        the scope's chunk count and newest chunk id are unchanged
+        """
+        key = str(chunks.query)
+        stats = chunks.aggregate(count=Count('id'), newest=Max('id'))
+        version = (stats['count'], stats['newest'])
+        if not stats['count']:
+            return np.empty(0, dtype=np.int64), None
+
+        with _MATRIX_CACHE_LOCK:
+            cached = _MATRIX_CACHE.get(key)
+            if cached and cached[0] == version:
+                _MATRIX_CACHE.move_to_end(key)
+                return cached[1], cached[2]
+
+        rows = list(chunks.order_by().values_list('id', 'embedding'))
+        chunk_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        matrix = np.vstack([np.frombuffer(bytes(row[1]), dtype='<f4') for row in rows])
+
+        with _MATRIX_CACHE_LOCK:
+            _MATRIX_CACHE[key] = (version, chunk_ids, matrix)
+            _MATRIX_CACHE.move_to_end(key)
+            while len(_MATRIX_CACHE) > _MATRIX_CACHE_SIZE:
+                _MATRIX_CACHE.popitem(last=False)
+
+        return chunk_ids, matrix
@@ -0,0 +1,224 @@
+"""
+Service for keeping DataFile vector store state in line with OpenAI
+"""
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Any, Iterable, List
+
+import openai
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.openai_scheduler import get_openai_client, BATCH
+from datasilo.models import DataFile
+
+logger = logging.getLogger(__name__)
+
+# Vector store file statuses and the DataFile.vector_store_status they correspond to
+REMOTE_STATUSES = {
+    'completed': 'processed',
+    'in_progress': 'processing',
+    'failed': 'failed',
+    'cancelled': 'failed',
+}
+
+
+def is_vector_store_id(vector_store_id) -> bool:
+    """Whether a company's vector store ID is a real vector store rather than the assistant_files_ placeholder"""
+    return bool(vector_store_id) and not vector_store_id.startswith("assistant_files_")
+
+
+class VectorStoreSyncService:
+    """
+    Service for reconciling a company's DataFile rows with the files that are
+    actually in its OpenAI vector store
+
+    One pass per company lists the vector store's files page by page and
+    compares them with the company's rows in one query, then:
+    - deletes remote files that no DataFile refers to (older than a grace
+      period, so uploads still being recorded are left alone)
+    - copies the remote processing status onto rows whose status is out of date
+    - resets rows whose remote file failed or has disappeared, and rows stuck
+      in pending or processing, and requeues them for processing until they
+      reach VECTOR_STORE_MAX_ATTEMPTS
+    """
+
+    def __init__(self, dry_run: bool = False):
+        self.client = get_openai_client(BATCH)
+        self.dry_run = dry_run
+        self.stuck_after = timedelta(minutes=getattr(settings, 'VECTOR_STORE_STUCK_AFTER_MINUTES', 60))
+        self.orphan_grace = timedelta(minutes=getattr(settings, 'VECTOR_STORE_ORPHAN_GRACE_MINUTES', 60))
+        self.max_attempts = getattr(settings, 'VECTOR_STORE_MAX_ATTEMPTS', 3)
+        self.concurrency = getattr(settings, 'VECTOR_STORE_SYNC_CONCURRENCY', 4)
+
+    def reconcile_all(self, companies: Iterable = None) -> Dict[str, int]:
+        """
+        Reconcile every company that has a vector store
+
+        Args:
+            companies: Companies to reconcile (defaults to all)
+
+        Returns:
+            dict: Totals of the per-company results
+        """
+        from companies.models import Company
+
+        if companies is None:
+            companies = Company.objects.exclude(openai_vector_store_id__isnull=True).exclude(openai_vector_store_id='')
+
+        totals = defaultdict(int)
+        for company in companies:
+            try:
+                result = self.reconcile_company(company)
+            except Exception as e:
+                logger.error(f"Error reconciling vector store for company {company.id}: {str(e)}")
+                totals['errors'] += 1
+                continue
+            for name, value in result.items():
+                totals[name] += value
+        return dict(totals)
+
+    def reconcile_company(self, company) -> Dict[str, int]:
+        """
+        Reconcile one company's vector store with its DataFile rows
+
+        Args:
+            company: Company model instance
+
+        Returns:
+            dict: Number of remote files, orphans deleted, statuses fixed,
+                files requeued and files given up on
+        """
+        if not is_vector_store_id(company.openai_vector_store_id):
+            return {}
+
+        vector_store_id = company.openai_vector_store_id
+        now = timezone.now()
+        remote = self.list_remote_files(vector_store_id)
+        files = list(
+            DataFile.objects.filter(Q(company=company) | Q(data_silo__company=company))
+            .values('id', 'vector_store_file_id', 'vector_store_status', 'vector_store_attempts', 'updated_at')
+        )
+
+        known = {row['vector_store_file_id'] for row in files if row['vector_store_file_id']}
+        grace_cutoff = (now - self.orphan_grace).timestamp()
+        orphans = [
+            file_id for file_id, remote_file in remote.items()
+            if file_id not in known and remote_file.created_at < grace_cutoff
+        ]
+
+        status_fixes = defaultdict(list)
+        needs_requeue = []
+        stuck_cutoff = now - self.stuck_after
+        for row in files:
+            file_id = row['vector_store_file_id']
+            if file_id and file_id in remote:
+                status = REMOTE_STATUSES.get(remote[file_id].status)
+                if status == 'failed':
+                    # Indexing failed on OpenAI's side: remove the remote file and upload again
+                    orphans.append(file_id)
+                    needs_requeue.append(row)
+                elif status and status != row['vector_store_status']:
+                    status_fixes[status].append(row['id'])
+            elif file_id:
+                # The row points at a file the vector store no longer has
+                needs_requeue.append(row)
+            elif row['vector_store_status'] == 'failed' or (
+                row['vector_store_status'] in ('pending', 'processing') and row['updated_at'] < stuck_cutoff
+            ):
+                needs_requeue.append(row)
+
+        requeue = [row['id'] for row in needs_requeue if row['vector_store_attempts'] < self.max_attempts]
+        give_up = [
+            row['id'] for row in needs_requeue
+            if row['vector_store_attempts'] >= self.max_attempts and row['vector_store_status'] != 'failed'
+        ]
+
+        result = {
+            'remote_files': len(remote),
+            'orphans_deleted': len(orphans),
+            'statuses_fixed': sum(len(ids) for ids in status_fixes.values()),
+            'requeued': len(requeue),
+            'gave_up': len(give_up),
+        }
+        if self.dry_run:
+            return result
+
+        result['orphans_deleted'] = self.delete_remote_files(vector_store_id, orphans)
+        with transaction.atomic():
+            for status, ids in status_fixes.items():
+                DataFile.objects.filter(id__in=ids).update(vector_store_status=status, updated_at=now)
+            if give_up:
+                DataFile.objects.filter(id__in=give_up).update(
+                    vector_store_file_id=None,
+                    vector_store_status='failed',
+                    updated_at=now
+                )
+            if requeue:
+                DataFile.objects.filter(id__in=requeue).update(
+                    vector_store_file_id=None,
+                    vector_store_status='pending',
+                    vector_store_attempts=F('vector_store_attempts') + 1,
+                    updated_at=now
+                )
+                transaction.on_commit(lambda: self._requeue(requeue))
+
+        logger.info(f"Reconciled vector store for company {company.id}: {result}")
+        return result
+
+    def list_remote_files(self, vector_store_id: str) -> Dict[str, Any]:
+        """
+        All files in a vector store, fetched page by page
+
+        Returns:
+            dict: Vector store file objects by file ID
+        """
+        files = {}
+        for remote_file in self.client.vector_stores.files.list(vector_store_id=vector_store_id, limit=100):
+            files[remote_file.id] = remote_file
+        return files
+
+    def delete_remote_files(self, vector_store_id: str, file_ids: List[str]) -> int:
+        """
+        Remove files from a vector store and delete the uploaded files themselves
+
+        Args:
+            vector_store_id: OpenAI vector store ID (None to only delete the files)
+            file_ids: OpenAI file IDs
+
+        Returns:
+            int: Number of files deleted
+        """
+        if not file_ids:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            deleted = list(executor.map(lambda file_id: self._delete_remote_file(vector_store_id, file_id), file_ids))
+        return sum(deleted)
+
+    def _delete_remote_file(self, vector_store_id: str, file_id: str) -> bool:
+        try:
+            if vector_store_id:
+                try:
+                    self.client.vector_stores.files.delete(file_id, vector_store_id=vector_store_id)
+                except openai.NotFoundError:
+                    pass
+            try:
+                self.client.files.delete(file_id)
+            except openai.NotFoundError:
+                pass
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting file {file_id} from vector store {vector_store_id}: {str(e)}")
+            return False
+
+    @staticmethod
+    def _requeue(file_ids: List[int]):
+        from core.background import run_in_background
+        from core.tasks import process_file_for_vector_store
+
+        for file_id in file_ids:
+            run_in_background(process_file_for_vector_store, file_id)
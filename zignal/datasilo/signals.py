@@ -0,0 +1,33 @@
+"""
+Signal handlers for the datasilo app
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from datasilo.models import DataFile
+
+
+@receiver(post_delete, sender=DataFile)
+def remove_vector_store_file(sender, instance, **kwargs):
+    """
+    Delete a removed file's upload from the company's vector store and from
+    OpenAI's file storage, once the deletion commits. Covers files deleted
+    with their silo or project as well as single deletes.
+    """
+    if not instance.vector_store_file_id:
+        return
+    
+    from companies.models import Company
+    from core.background import run_in_background
+    from core.tasks import delete_vector_store_files
+    from datasilo.services.vector_store_sync_service import is_vector_store_id
+    
+    vector_store_id = (
+        Company.objects.filter(id=instance.company_id).values_list('openai_vector_store_id', flat=True).first()
+        if instance.company_id else None
+    )
+    if not is_vector_store_id(vector_store_id):
+        vector_store_id = None
+    file_ids = [instance.vector_store_file_id]
+    transaction.on_commit(lambda: run_in_background(delete_vector_store_files, vector_store_id, file_ids))
@@ -13,4 +13,5 @@ urlpatterns = [
     path('files/<int:file_id>/', views.file_detail, name='file_detail'),
     path('files/<int:file_id>/delete/', views.file_delete, name='file_delete'),
     path('company/<int:company_id>/silos/', views.company_data_silos, name='company_silo'),
+    path('silos-search/', views.silo_search, name='silo_search'),
 ] 
\ No newline at end of file
@@ -5,11 +5,15 @@ from django.http import JsonResponse
 from django.db.models import Q
 from django.urls import reverse
 from django.core.exceptions import PermissionDenied
+from django.db import transaction
+import logging
 
 from .models import DataSilo, DataFile
 from .forms import DataSiloForm, DataFileForm
 from permissions import has_silo_permission, has_file_permission
 
+logger = logging.getLogger(__name__)
+
 
 @login_required
 def data_silo_list(request):
@@ -364,7 +368,15 @@ def file_upload(request, slug):
                     print(error_msg)
                     data_file.vector_store_status = 'failed'
                     data_file.save(update_fields=['vector_store_status'])
-                
+
+                # Chunk and embed the file for local retrieval once the upload commits
+                if getattr(settings, 'GENERATE_FILE_EMBEDDINGS', False):
+                    from core.background import run_in_background
+                    from core.tasks import embed_file_chunks
+                    file_id = data_file.id
+                    transaction.on_commit(lambda: run_in_background(embed_file_chunks, file_id))
+                    logger.info(f"Queued embedding for file ID {file_id}")
+
                 if is_ajax:
                     # Return JSON response for AJAX requests
                     return JsonResponse({
@@ -495,3 +507,46 @@ def company_data_silos(request, company_id):
         'company': company,
         'data_silos': data_silos
     })
+
+
+@login_required
+def silo_search(request):
+    """
+    Hybrid keyword and semantic search over the user's data silos
+    
+    Query parameters:
+        q: Search text (required)
+        company_id: Search all permitted silos of this company
+        silo: Silo slug to search (may be repeated)
+        top_k: Number of results to return (default 10, max 50)
+    """
+    from companies.models import Company
+    from .services.retrieval_service import RetrievalService
+    
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'error': 'Query parameter "q" is required'}, status=400)
+    
+    try:
+        top_k = min(max(int(request.GET.get('top_k', 10)), 1), 50)
+    except ValueError:
+        return JsonResponse({'error': 'top_k must be an integer'}, status=400)
+    
+    company = None
+    silos = None
+    silo_slugs = request.GET.getlist('silo')
+    if silo_slugs:
+        silos = DataSilo.objects.filter(slug__in=silo_slugs).select_related('project', 'company', 'created_by')
+    else:
+        company_id = request.GET.get('company_id')
+        if company_id:
+            company = get_object_or_404(Company, id=company_id)
+        else:
+            relation = request.user.company_relations.select_related('company').first()
+            company = relation.company if relation else None
+        if company is None:
+            return JsonResponse({'error': 'No company or silo to search'}, status=400)
+    
+    service = RetrievalService(request.user)
+    result = service.search(query, company=company, silos=silos, top_k=top_k)
+    return JsonResponse(result)
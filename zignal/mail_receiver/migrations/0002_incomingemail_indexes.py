@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 09:26
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('mail_receiver', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='incomingemail',
+            index=models.Index(fields=['message_id'], name='incomingemail_message_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='incomingemail',
+            index=models.Index(fields=['mailgun_id'], name='incomingemail_mailgun_id_idx'),
+        ),
+    ]
@@ -63,6 +63,11 @@ class IncomingEmail(models.Model):
         verbose_name = 'Incoming Email'
         verbose_name_plural = 'Incoming Emails'
         ordering = ['-received_at']
+        indexes = [
+            # For finding an incoming email by its Message-ID or Mailgun token, e.g. when tracing a delivery
+            models.Index(fields=['message_id'], name='incomingemail_message_id_idx'),
+            models.Index(fields=['mailgun_id'], name='incomingemail_mailgun_id_idx'),
+        ]
     
     def __str__(self):
         return f"Email from {self.sender}: {self.subject}"
@@ -14,6 +14,8 @@ from .models import IncomingEmail, EmailAttachment
 from datasilo.models import DataSilo, DataFile
 from agents.models import MeetingTranscript
 from agents.services.meetingbaas_service import MeetingBaaSService
+from core.background import run_in_background
+from core.tasks import schedule_meeting_bot
 from .signals import email_received, email_with_attachments_received, meeting_email_received
 
 logger = logging.getLogger(__name__)
@@ -388,13 +390,10 @@ Date: {email.received_at.strftime('%Y-%m-%d %H:%M:%S')}
             email.meeting_transcript = meeting
             email.save()
             
-            # Schedule the Meeting BaaS bot
+            # Schedule the Meeting BaaS bot outside email processing, so a slow
+            # or unavailable API can't hold up the rest of the inbox
             if settings.MEETINGBAAS_API_KEY:
-                try:
-                    self.meetingbaas_service.create_bot(meeting, settings.HOST_URL)
-                    logger.info(f"Scheduled meeting bot for meeting {meeting.id}")
-                except Exception as e:
-                    logger.error(f"Error scheduling meeting bot: {str(e)}")
+                transaction.on_commit(lambda: run_in_background(schedule_meeting_bot, meeting.id))
             
             return meeting
             
@@ -27,7 +27,7 @@ class ReportAdmin(admin.ModelAdmin):
     list_filter = ('status', 'template', 'company', 'project')
     search_fields = ('title', 'description', 'content')
     prepopulated_fields = {'slug': ('title',)}
-    readonly_fields = ('created_at', 'updated_at', 'generated_at')
+    readonly_fields = ('created_at', 'updated_at', 'generated_at', 'progress', 'progress_stage', 'error_message')
     autocomplete_fields = ['template', 'project', 'company', 'created_by']
     fieldsets = (
         (None, {
@@ -36,6 +36,9 @@ class ReportAdmin(admin.ModelAdmin):
         ('Report Details', {
             'fields': ('template', 'project', 'company', 'status', 'parameters', 'pdf_file')
         }),
+        ('Generation', {
+            'fields': ('progress', 'progress_stage', 'error_message')
+        }),
         ('Metadata', {
             'fields': ('created_by', 'created_at', 'updated_at', 'generated_at')
         }),
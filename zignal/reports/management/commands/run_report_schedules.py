@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reports.services.schedule_service import ReportScheduleService
+
+
+class Command(BaseCommand):
+    help = 'Run due report schedules, creating and generating their reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run due schedules once, wait for their reports and exit',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=60,
+            help='Seconds between checks for due schedules (default: 60)',
+        )
+
+    def handle(self, *args, **options):
+        service = ReportScheduleService()
+        
+        if options['once']:
+            result = service.run_due()
+            self.stdout.write(self.style.WARNING(
+                f"Claimed {result['claimed']} due schedules and requeued {result['requeued']} stranded reports, "
+                f"generating reports..."
+            ))
+            service.wait()
+            self.stdout.write(self.style.SUCCESS('Scheduled reports completed.'))
+            return
+        
+        self.stdout.write(self.style.SUCCESS(f"Report scheduler started (checking every {options['interval']}s)"))
+        while True:
+            try:
+                result = service.run_due()
+                if result['claimed']:
+                    self.stdout.write(f"Claimed {result['claimed']} due schedules")
+                if result['requeued']:
+                    self.stdout.write(f"Requeued {result['requeued']} stranded reports")
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Error running report schedules: {str(e)}'))
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-19 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='error_message',
+            field=models.TextField(blank=True, help_text='Error from the last failed generation', null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Generation progress in percent'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='progress_stage',
+            field=models.CharField(blank=True, help_text='Current generation stage', max_length=100),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-19 08:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_company_openai_assistant_id_and_more'),
+        ('projects', '0001_initial'),
+        ('reports', '0002_report_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reportschedule',
+            index=models.Index(fields=['is_active', 'next_run'], name='schedule_due_idx'),
+        ),
+    ]
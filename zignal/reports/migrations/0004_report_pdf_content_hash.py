@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_reportschedule_due_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='pdf_content_hash',
+            field=models.CharField(blank=True, help_text='Hash of the content the PDF was rendered from', max_length=64),
+        ),
+    ]
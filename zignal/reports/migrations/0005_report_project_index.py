@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 09:26
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('companies', '0004_company_ai_status'),
+        ('projects', '0001_initial'),
+        ('reports', '0004_report_pdf_content_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='report',
+            index=models.Index(fields=['project', 'created_at'], name='report_project_created_idx'),
+        ),
+    ]
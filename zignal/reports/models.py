@@ -1,5 +1,9 @@
+import calendar
+from datetime import datetime, timedelta
+
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from django.utils.text import slugify
 from projects.models import Project
 
@@ -87,8 +91,14 @@ class Report(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     parameters = models.JSONField(default=dict, blank=True, help_text="Parameters used to generate the report")
     
+    # Generation progress
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Generation progress in percent")
+    progress_stage = models.CharField(max_length=100, blank=True, help_text="Current generation stage")
+    error_message = models.TextField(blank=True, null=True, help_text="Error from the last failed generation")
+    
     # PDF generation
     pdf_file = models.FileField(upload_to='reports/pdfs/', null=True, blank=True)
+    pdf_content_hash = models.CharField(max_length=64, blank=True, help_text="Hash of the content the PDF was rendered from")
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -111,6 +121,9 @@ class Report(models.Model):
                 name='report_project_or_company_not_null'
             )
         ]
+        indexes = [
+            models.Index(fields=['project', 'created_at'], name='report_project_created_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -181,6 +194,57 @@ class ReportSchedule(models.Model):
                 name='schedule_project_or_company_not_null'
             )
         ]
+        indexes = [
+            # The scheduler polls for active schedules whose next_run has passed
+            models.Index(fields=['is_active', 'next_run'], name='schedule_due_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.get_frequency_display()})"
+    
+    def save(self, *args, **kwargs):
+        if self.is_active and self.next_run is None:
+            self.next_run = self.compute_next_run()
+        super().save(*args, **kwargs)
+    
+    def compute_next_run(self, after=None):
+        """
+        Calculate the first run time strictly after the given time
+        
+        Runs happen at REPORT_SCHEDULE_HOUR (UTC). Weekly schedules default to
+        Monday, and monthly and quarterly schedules to the 1st; a day_of_month
+        past the end of a month runs on the month's last day.
+        
+        Args:
+            after: Datetime to schedule after (defaults to now)
+            
+        Returns:
+            datetime: The next run time
+        """
+        after = after or timezone.now()
+        hour = getattr(settings, 'REPORT_SCHEDULE_HOUR', 6)
+        
+        def at(day):
+            return datetime(day.year, day.month, day.day, hour, tzinfo=after.tzinfo)
+        
+        if self.frequency == 'daily':
+            candidate = at(after)
+            return candidate if candidate > after else candidate + timedelta(days=1)
+        
+        if self.frequency == 'weekly':
+            weekday = self.day_of_week if self.day_of_week is not None else 0
+            candidate = at(after) + timedelta(days=(weekday - after.weekday()) % 7)
+            return candidate if candidate > after else candidate + timedelta(days=7)
+        
+        # Monthly and quarterly: walk forward month by month until a valid run month
+        step = 3 if self.frequency == 'quarterly' else 1
+        year, month = after.year, after.month
+        while True:
+            if (month - 1) % step == 0:
+                day = min(self.day_of_month or 1, calendar.monthrange(year, month)[1])
+                candidate = datetime(year, month, day, hour, tzinfo=after.tzinfo)
+                if candidate > after:
+                    return candidate
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
@@ -0,0 +1,162 @@
+"""
+Service for selecting data silo content to ground report generation
+"""
+import hashlib
+import json
+import logging
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+
+from datasilo.models import DataSilo, DataFile, DataFileChunk
+from datasilo.services.retrieval_service import RetrievalService
+from reports.models import Report
+from reports.services.template_sections import split_sections
+
+logger = logging.getLogger(__name__)
+
+
+class ReportContextAssembler:
+    """
+    Service for picking the most relevant document chunks for each template
+    section under a token budget
+    """
+
+    def __init__(self, token_budget: int = None, chunks_per_section: int = None):
+        self.token_budget = token_budget or getattr(settings, 'REPORT_CONTEXT_TOKEN_BUDGET', 6000)
+        self.chunks_per_section = chunks_per_section or getattr(settings, 'REPORT_CONTEXT_CHUNKS_PER_SECTION', 8)
+        self.retrieval_service = RetrievalService()
+
+    def assemble(self, report: Report) -> List[Dict[str, Any]]:
+        """
+        Assemble document excerpts for a report, reusing the cached selection
+        while the report's documents are unchanged
+
+        Args:
+            report: The Report object
+
+        Returns:
+            List[Dict[str, Any]]: Excerpts with their source file and section
+        """
+        silos = self._report_silos(report)
+        if not silos or not DataFileChunk.objects.filter(data_silo__in=silos).exists():
+            return []
+
+        cache_key = self._cache_key(report, silos)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached context for report {report.id}")
+            return cached
+
+        sections = self._section_queries(report)
+        try:
+            context = self._select(sections, silos)
+        except Exception as e:
+            # A report without excerpts is still better than a failed report
+            logger.error(f"Error assembling context for report {report.id}: {str(e)}")
+            return []
+
+        cache.set(cache_key, context, 60 * 60 * 24)
+        logger.info(f"Assembled {len(context)} excerpts across {len(sections)} sections for report {report.id}")
+        return context
+
+    def _report_silos(self, report: Report) -> List[DataSilo]:
+        """Silos belonging to the report's project and company"""
+        company = report.company or (report.project.company if report.project else None)
+        scope = Q()
+        if report.project:
+            scope |= Q(project=report.project)
+        if company:
+            scope |= Q(company=company)
+        if not scope:
+            return []
+        return list(DataSilo.objects.filter(scope).distinct())
+
+    def _section_queries(self, report: Report) -> List[Tuple[str, str]]:
+        """
+        One retrieval query per template section, each prefixed with the report
+        title so short headings like "Outlook" stay on topic
+
+        Returns:
+            List[Tuple[str, str]]: (section heading, query) pairs. The heading is
+            empty for templates without headings.
+        """
+        template_content = report.template.template_content if report.template else ''
+        headings = []
+        for section in split_sections(template_content):
+            if section["heading"] and section["heading"] not in headings:
+                headings.append(section["heading"])
+
+        if not headings:
+            return [('', ' '.join(filter(None, [report.title, report.description])))]
+        return [(heading, f"{report.title}: {heading}") for heading in headings]
+
+    def _select(self, sections: List[Tuple[str, str]], silos: List[DataSilo]) -> List[Dict[str, Any]]:
+        """
+        Retrieve candidates for every section, then fill the budget round-robin
+        so each section gets its best excerpts before any gets its second best
+        """
+        # Embed all section queries in one API call
+        queries = [query for _, query in sections]
+        vectors = self.retrieval_service.vector_search.openai_service.generate_embeddings_batch(queries)
+
+        ranked_sections = []
+        for (section, query), vector in zip(sections, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector = vector / norm
+            results = self.retrieval_service.search(
+                query, silos=silos, top_k=self.chunks_per_section, query_vector=vector
+            )["results"]
+            ranked_sections.append((section, results))
+
+        chunk_ids = {result["chunk_id"] for _, results in ranked_sections for result in results}
+        token_counts = dict(DataFileChunk.objects.filter(id__in=chunk_ids).values_list('id', 'token_count'))
+
+        selected = []
+        seen = set()
+        used_tokens = 0
+        for position in range(self.chunks_per_section):
+            for section, results in ranked_sections:
+                if position >= len(results):
+                    continue
+                result = results[position]
+                tokens = token_counts.get(result["chunk_id"], 0)
+                if result["chunk_id"] in seen or used_tokens + tokens > self.token_budget:
+                    continue
+                seen.add(result["chunk_id"])
+                used_tokens += tokens
+                selected.append({
+                    "section": section,
+                    "source": result["file_name"],
+                    "excerpt": result["text"],
+                })
+
+        return selected
+
+    def _cache_key(self, report: Report, silos: List[DataSilo]) -> str:
+        """
+        Cache key for a report's context, versioned by the files and chunks in
+        its silos and by the inputs that shape the section queries
+        """
+        silo_ids = [silo.id for silo in silos]
+        files = DataFile.objects.filter(data_silo_id__in=silo_ids).aggregate(
+            count=Count('id'), updated=Max('updated_at')
+        )
+        chunks = DataFileChunk.objects.filter(data_silo_id__in=silo_ids).aggregate(
+            count=Count('id'), newest=Max('id')
+        )
+        version = json.dumps([
+            sorted(silo_ids),
+            files['count'], str(files['updated']),
+            chunks['count'], chunks['newest'],
+            report.title, report.description,
+            report.template.template_content if report.template else '',
+            self.token_budget, self.chunks_per_section,
+        ])
+        digest = hashlib.sha256(version.encode('utf-8')).hexdigest()
+        return f"report_context:{report.id}:{digest}"
@@ -1,24 +1,40 @@
 """
 Service for validating documents against requirements for reports
 """
+import hashlib
+import json
 import logging
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Tuple, Optional
 
 from django.conf import settings
-from openai import OpenAI
+from django.core.cache import cache
+from django.db.models import Prefetch, Q
 
+from core.llm_usage import track_llm_call
+from core.openai_scheduler import get_openai_client, BATCH
 from reports.models import Report
 
 logger = logging.getLogger(__name__)
 
+# Caps validation completions in flight across all reports in this process
+_VALIDATION_SEMAPHORE = threading.BoundedSemaphore(getattr(settings, 'DOCUMENT_VALIDATION_MAX_IN_FLIGHT', 4))
+
+# Verdicts for unchanged documents are reused for 30 days
+VERDICT_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+# Number of characters of each document sent for validation
+MAX_DOCUMENT_CHARS = 12000
+
 class DocumentValidationService:
     """
     Service for validating documents against requirements for reports
     """
     
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client(BATCH)
         self.default_model = settings.OPENAI_MODEL
     
     def validate_documents(self, report: Report) -> Tuple[bool, Dict[str, Any]]:
@@ -44,16 +60,37 @@ class DocumentValidationService:
             if not requirements:
                 return True, {"message": "No specific requirements to validate against"}
             
-            # Validate each document against requirements
+            # Validate documents concurrently, reusing verdicts for unchanged documents
+            requirements_hash = self._hash(json.dumps(requirements, sort_keys=True))
             validation_results = {}
-            all_valid = True
-            
+            pending = {}
             for doc_id, document in documents.items():
-                doc_result = self._validate_document(document, requirements)
-                validation_results[doc_id] = doc_result
-                
-                if not doc_result["is_valid"]:
-                    all_valid = False
+                cache_key = f"doc_validation:{self.default_model}:{document['content_hash']}:{requirements_hash}"
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    validation_results[doc_id] = cached
+                else:
+                    pending[doc_id] = cache_key
+            
+            logger.info(f"Validating {len(pending)} of {len(documents)} documents for report {report.id} "
+                        f"({len(documents) - len(pending)} cached)")
+            
+            if pending:
+                company_id = report.company_id or (report.project.company_id if report.project else None)
+                max_workers = min(getattr(settings, 'DOCUMENT_VALIDATION_CONCURRENCY', 8), len(pending))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        doc_id: executor.submit(self._validate_document, documents[doc_id], requirements, company_id)
+                        for doc_id in pending
+                    }
+                    for doc_id, future in futures.items():
+                        doc_result = future.result()
+                        validation_results[doc_id] = doc_result
+                        # Errors are retried on the next run rather than remembered
+                        if "error" not in doc_result:
+                            cache.set(pending[doc_id], doc_result, VERDICT_CACHE_TIMEOUT)
+            
+            all_valid = all(result["is_valid"] for result in validation_results.values())
             
             return all_valid, {
                 "overall_valid": all_valid,
@@ -69,57 +106,64 @@ class DocumentValidationService:
         """
         Get documents related to the report from project or company data silos
         
+        Files and their extracted text are loaded with one joined query plus a
+        single prefetch, however many silos the report spans.
+        
         Args:
             report: The report to get documents for
             
         Returns:
             Dict[str, Any]: Dictionary of document IDs to document content
         """
-        documents = {}
+        from datasilo.models import DataFile, DataFileChunk
         
-        # If report is associated with a project, get documents from project data silos
+        scope = Q()
         if report.project:
-            from datasilo.models import DataSilo, DataFile
-            
-            # Get data silos associated with the project
-            silos = DataSilo.objects.filter(project=report.project)
-            
-            # Get files from these silos
-            for silo in silos:
-                files = DataFile.objects.filter(data_silo=silo)
-                
-                for file in files:
-                    # Only consider text-based files
-                    if file.file_type in ['document', 'spreadsheet', 'code']:
-                        # In a real implementation, we would extract and process the text
-                        # For now, just use the file name and description as placeholder
-                        documents[f"file_{file.id}"] = {
-                            "name": file.name,
-                            "description": file.description,
-                            "type": file.file_type,
-                            "content": "Sample content from the file"  # Placeholder
-                        }
-        
-        # Similarly for company-associated reports
+            scope |= Q(data_silo__project=report.project)
         if report.company:
-            from datasilo.models import DataSilo, DataFile
-            
-            silos = DataSilo.objects.filter(company=report.company)
-            
-            for silo in silos:
-                files = DataFile.objects.filter(data_silo=silo)
-                
-                for file in files:
-                    if file.file_type in ['document', 'spreadsheet', 'code']:
-                        documents[f"file_{file.id}"] = {
-                            "name": file.name,
-                            "description": file.description,
-                            "type": file.file_type,
-                            "content": "Sample content from the file"  # Placeholder
-                        }
+            scope |= Q(data_silo__company=report.company)
+        if not scope:
+            return {}
+        
+        files = DataFile.objects.filter(scope, file_type__in=['document', 'spreadsheet', 'code']).select_related(
+            'data_silo'
+        ).prefetch_related(
+            Prefetch('chunks', queryset=DataFileChunk.objects.only('data_file_id', 'chunk_index', 'text'))
+        ).distinct()
+        
+        documents = {}
+        for file in files:
+            content = self._document_content(file)
+            documents[f"file_{file.id}"] = {
+                "name": file.name,
+                "description": file.description,
+                "type": file.file_type,
+                "content": content,
+                "content_hash": self._hash(f"{file.name}\n{file.description or ''}\n{content}"),
+            }
         
         return documents
     
+    def _document_content(self, file) -> str:
+        """
+        Text to validate for a file, taken from its extracted chunks and capped at
+        MAX_DOCUMENT_CHARS. Chunks overlap, so only the new part of each is kept.
+        """
+        overlap = getattr(settings, 'EMBEDDING_CHUNK_OVERLAP', 200)
+        parts = []
+        length = 0
+        for index, chunk in enumerate(file.chunks.all()):
+            text = chunk.text if index == 0 else chunk.text[overlap:]
+            parts.append(text)
+            length += len(text)
+            if length >= MAX_DOCUMENT_CHARS:
+                break
+        return '\n'.join(parts)[:MAX_DOCUMENT_CHARS]
+    
+    @staticmethod
+    def _hash(value: str) -> str:
+        return hashlib.sha256(value.encode('utf-8')).hexdigest()
+    
     def _extract_requirements(self, report: Report) -> List[Dict[str, Any]]:
         """
         Extract requirements from the report template
@@ -142,7 +186,6 @@ class DocumentValidationService:
         regex = r"<!--\s*REQUIRE:\s*({.*?})\s*-->"
         matches = re.findall(regex, template.template_content)
         
-        import json
         for match in matches:
             try:
                 req = json.loads(match)
@@ -152,21 +195,19 @@ class DocumentValidationService:
         
         return requirements
     
-    def _validate_document(self, document: Dict[str, Any], requirements: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _validate_document(self, document: Dict[str, Any], requirements: List[Dict[str, Any]],
+                           company_id: Optional[int] = None) -> Dict[str, Any]:
         """
         Validate a document against requirements using AI
         
         Args:
             document: The document to validate
             requirements: The requirements to validate against
+            company_id: Company the validation's LLM usage is attributed to
             
         Returns:
             Dict[str, Any]: Validation results
         """
-        # In a real implementation, this would use more sophisticated validation
-        # including NLP/AI to check if document contents match requirements
-        
-        # For now, use OpenAI to evaluate if the document meets the requirements
         try:
             # Prepare prompt
             prompt = f"""
@@ -178,7 +219,7 @@ Description: {document.get('description')}
 Content: {document.get('content')}
 
 Requirements:
-{requirements}
+{json.dumps(requirements)}
 
 Your task:
 1. Analyze if the document contains the information needed to satisfy each requirement
@@ -187,30 +228,36 @@ Your task:
 
 Format your response as a JSON object with:
 - overall_valid: true/false
-- requirement_results: [list of results for each requirement]
+- requirement_results: [list of objects with requirement, is_met (true/false) and explanation]
 - explanation: your overall explanation
 """
             
-            # For demonstration purposes, we'll return a mock result instead of calling OpenAI
-            # In a real implementation, you would call the API here
-            mock_result = {
-                "is_valid": True,
-                "requirement_results": [
-                    {
-                        "requirement": req,
-                        "is_met": True,
-                        "explanation": f"The document contains information related to {req.get('type', 'unknown')}"
-                    }
-                    for req in requirements
-                ],
-                "explanation": "The document meets all the specified requirements."
-            }
+            with track_llm_call('validation', company_id):
+                response = self._complete(prompt)
+            verdict = json.loads(response.choices[0].message.content)
             
-            return mock_result
+            return {
+                "is_valid": bool(verdict.get("overall_valid")),
+                "requirement_results": verdict.get("requirement_results", []),
+                "explanation": verdict.get("explanation", "")
+            }
             
         except Exception as e:
             logger.error(f"Error validating document {document.get('name')}: {str(e)}")
             return {
                 "is_valid": False,
                 "error": str(e)
-            } 
\ No newline at end of file
+            }
+    
+    def _complete(self, prompt: str):
+        """
+        Run a validation completion under the shared semaphore. Rate limits are
+        handled by the OpenAI scheduler and the SDK's own retries.
+        """
+        with _VALIDATION_SEMAPHORE:
+            return self.client.chat.completions.create(
+                model=self.default_model,
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                temperature=0
+            )
@@ -0,0 +1,101 @@
+"""
+Service for rendering report content to PDF
+"""
+import hashlib
+import logging
+from typing import Optional
+
+from django.core.files.base import ContentFile
+
+from reports.models import Report
+
+logger = logging.getLogger(__name__)
+
+# Core PDF fonts only cover Latin-1, so map common typographic characters first
+UNICODE_REPLACEMENTS = {
+    '‘': "'", '’': "'", '“': '"', '”': '"',
+    '–': '-', '—': '-', '…': '...', '•': '*',
+    ' ': ' ', '−': '-',
+}
+
+
+def content_hash(content: str) -> str:
+    """Hash of report content, used to tell whether a stored PDF is current"""
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+
+def pdf_is_current(report: Report) -> bool:
+    """Whether the report's stored PDF was rendered from its current content"""
+    return bool(report.pdf_file) and report.pdf_content_hash == content_hash(report.content)
+
+
+class ReportPDFService:
+    """
+    Service for turning report markdown into PDF files
+    """
+
+    def render(self, report: Report) -> Optional[str]:
+        """
+        Render the report's content to PDF and store it on the report
+
+        Rendering is skipped when the stored PDF was made from the same content.
+
+        Args:
+            report: The Report object
+
+        Returns:
+            Optional[str]: Storage name of the PDF, or None if rendering failed
+        """
+        if not report.content:
+            logger.warning(f"Report {report.id} has no content to render")
+            return None
+
+        if pdf_is_current(report):
+            return report.pdf_file.name
+
+        digest = content_hash(report.content)
+        try:
+            pdf_bytes = self._render_pdf(report.title, report.content)
+        except ImportError:
+            logger.error("fpdf2 and markdown are required for PDF rendering")
+            return None
+        except Exception as e:
+            logger.error(f"Error rendering PDF for report {report.id}: {str(e)}")
+            return None
+
+        report.pdf_file.save(f"{report.slug}-{digest[:12]}.pdf", ContentFile(pdf_bytes), save=False)
+        Report.objects.filter(id=report.id).update(pdf_file=report.pdf_file.name, pdf_content_hash=digest)
+        report.pdf_content_hash = digest
+
+        logger.info(f"Rendered PDF for report {report.id} ({len(pdf_bytes)} bytes)")
+        return report.pdf_file.name
+
+    def _render_pdf(self, title: str, content: str) -> bytes:
+        """
+        Convert markdown to HTML and lay it out with fpdf2
+
+        Args:
+            title: Report title, used for the document metadata
+            content: Report markdown
+
+        Returns:
+            bytes: The PDF document
+        """
+        import markdown
+        from fpdf import FPDF
+
+        html = markdown.markdown(self._to_latin1(content), extensions=['tables', 'sane_lists'])
+
+        pdf = FPDF(format='A4')
+        pdf.set_title(self._to_latin1(title))
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.add_page()
+        pdf.set_font('Helvetica', size=11)
+        pdf.write_html(html)
+        return bytes(pdf.output())
+
+    @staticmethod
+    def _to_latin1(text: str) -> str:
+        for char, replacement in UNICODE_REPLACEMENTS.items():
+            text = text.replace(char, replacement)
+        return text.encode('latin-1', errors='replace').decode('latin-1')
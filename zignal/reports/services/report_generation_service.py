@@ -1,30 +1,44 @@
 """
 Service for AI-based report generation
 """
+import hashlib
 import logging
 import json
-from datetime import datetime
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
 
 from django.conf import settings
-from openai import OpenAI
+from django.core.cache import cache
+from django.utils import timezone
 
+from core.dashboard import invalidate_company_snapshots
+from core.llm_usage import track_llm_call
+from core.openai_scheduler import get_openai_client, BATCH
 from reports.models import Report, ReportTemplate
 from reports.services.document_validation_service import DocumentValidationService
 from reports.services.notification_service import ReportNotificationService
+from reports.services.context_assembler import ReportContextAssembler
+from reports.services.template_sections import split_sections
+from reports.services.pdf_service import ReportPDFService
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = "You are a professional report generation assistant. Your task is to produce comprehensive, well-structured reports based on provided data and template instructions."
+
+# Generated sections are reused across regenerations for a week
+SECTION_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
 class ReportGenerationService:
     """
     Service for generating reports using AI
     """
     
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client(BATCH)
         self.default_model = settings.OPENAI_MODEL
         self.validation_service = DocumentValidationService()
         self.notification_service = ReportNotificationService()
+        self.context_assembler = ReportContextAssembler()
     
     def generate_report(self, report: Report) -> bool:
         """
@@ -38,8 +52,7 @@ class ReportGenerationService:
         """
         try:
             # Update report status
-            report.status = 'generating'
-            report.save()
+            self._update_progress(report, 5, "Starting", status='generating', error_message=None)
             
             # Get template
             template = report.template
@@ -48,6 +61,7 @@ class ReportGenerationService:
             
             # Validate documents against requirements if enabled
             if getattr(settings, 'VALIDATE_DOCUMENTS_FOR_REPORTS', False):
+                self._update_progress(report, 10, "Validating documents")
                 is_valid, validation_results = self.validation_service.validate_documents(report)
                 
                 if not is_valid:
@@ -55,42 +69,35 @@ class ReportGenerationService:
                     logger.warning(f"Document validation failed for report {report.id}: {error_message}")
                     
                     # We proceed anyway, but store validation results in report parameters
-                    if 'validation_results' not in report.parameters:
-                        report.parameters['validation_results'] = {}
-                    
                     report.parameters['validation_results'] = validation_results
-                    report.save()
+                    Report.objects.filter(id=report.id).update(parameters=report.parameters)
             
             # Gather data needed for the report
+            self._update_progress(report, 25, "Gathering data")
             report_data = self._gather_report_data(report)
             
-            # Build the prompt
-            prompt = self._build_prompt(template.template_content, report_data)
-            
-            # Generate content using OpenAI
-            response = self.client.chat.completions.create(
-                model=self.default_model,
-                messages=[
-                    {"role": "system", "content": "You are a professional report generation assistant. Your task is to produce comprehensive, well-structured reports based on provided data and template instructions."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,  # Lower temperature for more consistent, factual reports
-                max_tokens=4000
-            )
-            
-            # Extract generated content
-            content = response.choices[0].message.content
-            
-            # Update report with generated content
-            report.content = content
-            report.status = 'generated'
-            report.generated_at = datetime.now()
-            report.save()
+            # Generate content, section by section where the template allows it
+            self._update_progress(report, 40, "Writing report")
+            sections = split_sections(template.template_content)
+            if len(sections) > 1:
+                content = self._generate_sections(report, sections, report_data)
+            else:
+                content = self._generate_single(report, template.template_content, report_data)
             
             # Generate PDF if needed
             if getattr(settings, 'AUTO_GENERATE_REPORT_PDF', False):
+                report.content = content
+                self._update_progress(report, 90, "Rendering PDF")
                 self._generate_pdf(report)
             
+            # Update report with generated content
+            self._update_progress(
+                report, 100, "Complete",
+                content=content,
+                status='generated',
+                generated_at=timezone.now()
+            )
+            
             # Send notifications
             self.notification_service.notify_report_completion(report)
             
@@ -98,14 +105,155 @@ class ReportGenerationService:
             
         except Exception as e:
             logger.error(f"Error generating report {report.id}: {str(e)}")
-            report.status = 'failed'
-            report.save()
+            self._update_progress(report, report.progress, "Failed", status='failed', error_message=str(e))
             
             # Send failure notifications
             self.notification_service.notify_report_failure(report, str(e))
             
             return False
     
+    def _generate_single(self, report: Report, template_content: str, data: Dict[str, Any]) -> str:
+        """
+        Generate the whole report in one completion
+        
+        Args:
+            report: The Report object
+            template_content: The template content
+            data: Data to be used in the report
+            
+        Returns:
+            str: The generated report content
+        """
+        prompt = self._build_prompt(template_content, data)
+        with track_llm_call('report', self._company_id(report)):
+            response = self.client.chat.completions.create(
+                model=self.default_model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,  # Lower temperature for more consistent, factual reports
+                max_tokens=4000
+            )
+        return response.choices[0].message.content
+    
+    def _generate_sections(self, report: Report, sections: List[Dict[str, Any]], data: Dict[str, Any]) -> str:
+        """
+        Generate each template section concurrently, then stitch them together
+        
+        Each section gets its own completion and output-token budget. Sections
+        whose template, data and outline are unchanged are served from the cache,
+        so regenerating a report only pays for the sections that changed.
+        
+        Args:
+            report: The Report object
+            sections: Template sections from split_sections
+            data: Data to be used in the report
+            
+        Returns:
+            str: The stitched report content
+        """
+        outline = [section["heading"] for section in sections if section["heading"]]
+        documents = data.get("documents", [])
+        shared_data = {key: value for key, value in data.items() if key != "documents"}
+        
+        outputs = [None] * len(sections)
+        pending = {}
+        for index, section in enumerate(sections):
+            section_data = dict(shared_data)
+            excerpts = [doc for doc in documents if doc["section"] == (section["heading"] or '')]
+            if excerpts:
+                section_data["documents"] = excerpts
+            
+            prompt = self._build_section_prompt(section["content"], outline, section_data)
+            cache_key = self._section_cache_key(prompt)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                outputs[index] = cached
+            else:
+                pending[index] = (prompt, cache_key)
+        
+        logger.info(f"Report {report.id}: {len(sections)} sections, {len(sections) - len(pending)} cached")
+        
+        if pending:
+            max_workers = min(getattr(settings, 'REPORT_SECTION_CONCURRENCY', 4), len(pending))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._complete_section, prompt, self._company_id(report)): (index, cache_key)
+                    for index, (prompt, cache_key) in pending.items()
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    index, cache_key = futures[future]
+                    outputs[index] = future.result()
+                    cache.set(cache_key, outputs[index], SECTION_CACHE_TIMEOUT)
+                    self._update_progress(
+                        report, 40 + (45 * done) // len(pending), f"Writing sections ({done}/{len(pending)})"
+                    )
+        
+        return self._stitch(sections, outputs)
+    
+    def _complete_section(self, prompt: str, company_id: Optional[int] = None) -> str:
+        """Run the completion for a single section"""
+        with track_llm_call('report', company_id):
+            response = self.client.chat.completions.create(
+                model=self.default_model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=getattr(settings, 'REPORT_SECTION_MAX_TOKENS', 1500)
+            )
+        choice = response.choices[0]
+        if choice.finish_reason == 'length':
+            logger.warning("Report section hit the output token limit and was truncated")
+        return choice.message.content or ''
+    
+    @staticmethod
+    def _company_id(report: Report) -> Optional[int]:
+        """Company a report belongs to, directly or through its project"""
+        return report.company_id or (report.project.company_id if report.project else None)
+    
+    def _section_cache_key(self, prompt: str) -> str:
+        digest = hashlib.sha256(f"{self.default_model}:{prompt}".encode('utf-8')).hexdigest()
+        return f"report_section:{digest}"
+    
+    def _stitch(self, sections: List[Dict[str, Any]], outputs: List[str]) -> str:
+        """
+        Join generated sections in template order, restoring any heading the
+        model left out so the report keeps the template's structure
+        """
+        parts = []
+        for section, output in zip(sections, outputs):
+            output = (output or '').strip()
+            if section["heading"] and not output.lstrip().startswith('#'):
+                heading_line = section["content"].splitlines()[0].strip()
+                output = f"{heading_line}\n\n{output}"
+            if output:
+                parts.append(output)
+        return '\n\n'.join(parts)
+    
+    def _update_progress(self, report: Report, progress: int, stage: str, **fields) -> None:
+        """
+        Record the current generation stage
+        
+        Uses a queryset update so a progress write never overwrites edits made to
+        other report fields while generation is running.
+        
+        Args:
+            report: The Report object
+            progress: Progress in percent
+            stage: Human readable stage name
+            **fields: Other report fields to update alongside the progress
+        """
+        fields.update(progress=progress, progress_stage=stage, updated_at=timezone.now())
+        Report.objects.filter(id=report.id).update(**fields)
+        for name, value in fields.items():
+            setattr(report, name, value)
+        if 'status' in fields:
+            # Queryset updates send no signals, so refresh the dashboard here
+            invalidate_company_snapshots([self._company_id(report)])
+    
     def _gather_report_data(self, report: Report) -> Dict[str, Any]:
         """
         Gather all data needed for the report
@@ -141,11 +289,10 @@ class ReportGenerationService:
                 # Add more company data as needed
             }
         
-        # Here we would add more data sources as needed:
-        # - Data from connected data silos
-        # - Financial data
-        # - Performance metrics
-        # - etc.
+        # Add the most relevant excerpts from connected data silos
+        documents = self.context_assembler.assemble(report)
+        if documents:
+            data["documents"] = documents
         
         return data
     
@@ -176,8 +323,46 @@ Generate a professional report based on the following template and data.
 4. Include visualizations instructions where appropriate (describe what charts/graphs would be included).
 5. Use a professional business tone.
 6. The length should be appropriate for the content, typically 1000-2000 words.
+7. Base factual statements on the document excerpts in the data where available, and do not invent figures that are not in the data.
 
 Please generate the complete report content now:
+"""
+        return prompt
+    
+    def _build_section_prompt(self, section_content: str, outline: List[str], data: Dict[str, Any]) -> str:
+        """
+        Build the prompt for a single report section
+        
+        Args:
+            section_content: The section's template content
+            outline: Headings of all sections in the report
+            data: Data to be used in this section
+            
+        Returns:
+            str: The prompt for the OpenAI API
+        """
+        outline_text = '\n'.join(f"- {heading}" for heading in outline)
+        prompt = f"""
+Generate one section of a professional report. The other sections are written separately, so write only this section.
+
+# REPORT OUTLINE:
+{outline_text}
+
+# SECTION TEMPLATE:
+{section_content}
+
+# DATA:
+{json.dumps(data, indent=2, default=str)}
+
+# INSTRUCTIONS:
+1. Follow the section template exactly, starting with its heading and replacing placeholders with actual data.
+2. Generate professional, factual content based on the provided data.
+3. Do not repeat content that belongs to other sections in the outline.
+4. Include visualizations instructions where appropriate (describe what charts/graphs would be included).
+5. Use a professional business tone.
+6. Base factual statements on the document excerpts in the data where available, and do not invent figures that are not in the data.
+
+Please generate the section content now:
 """
         return prompt
     
@@ -191,8 +376,4 @@ Please generate the complete report content now:
         Returns:
             Optional[str]: Path to the generated PDF or None if generation failed
         """
-        # Placeholder for PDF generation logic
-        # This would typically use a library like WeasyPrint or a service like wkhtmltopdf
-        # For now, we'll just log that it would be generated
-        logger.info(f"PDF generation for report {report.id} would happen here")
-        return None 
\ No newline at end of file
+        return ReportPDFService().render(report)
@@ -0,0 +1,220 @@
+"""
+Service for running scheduled report generation
+"""
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import timedelta
+from typing import Dict, Any, List
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from core.background import run_in_background
+from core.dashboard import invalidate_company_snapshots
+from core.tasks import generate_report
+from reports.models import Report, ReportSchedule
+
+logger = logging.getLogger(__name__)
+
+
+class ReportScheduleService:
+    """
+    Service for claiming due report schedules and dispatching their reports
+
+    Due schedules are claimed with SELECT ... FOR UPDATE SKIP LOCKED and advanced
+    to their next run in the same transaction, so concurrent schedulers never
+    fire the same schedule twice. Generation jobs are dispatched with at most
+    REPORT_SCHEDULE_COMPANY_CONCURRENCY reports per company in flight; overall
+    concurrency is bounded by the background worker pool.
+
+    Queues only live in the scheduler process, so scheduled reports left in
+    generating by a scheduler that stopped (a deploy or crash) are picked up
+    again once they have made no progress for REPORT_SCHEDULE_STALE_MINUTES.
+    """
+
+    def __init__(self, batch_size: int = None, company_concurrency: int = None):
+        self.batch_size = batch_size or getattr(settings, 'REPORT_SCHEDULE_BATCH_SIZE', 100)
+        self.company_concurrency = company_concurrency or getattr(settings, 'REPORT_SCHEDULE_COMPANY_CONCURRENCY', 2)
+        self.stale_after = timedelta(minutes=getattr(settings, 'REPORT_SCHEDULE_STALE_MINUTES', 30))
+        self._lock = threading.Lock()
+        self._queues = defaultdict(deque)
+        self._in_flight = defaultdict(int)
+        # Reports queued or generating in this process, and the futures of the generating ones
+        self._report_ids = set()
+        self._futures = set()
+
+    def run_due(self, now=None) -> Dict[str, Any]:
+        """
+        Claim all due schedules, create their reports and queue generation
+
+        Args:
+            now: Time to treat as the current time (defaults to now)
+
+        Returns:
+            dict: Number of schedules claimed and of stranded reports requeued
+        """
+        now = now or timezone.now()
+        self._initialise_next_runs(now)
+        requeued = self._requeue_stranded(now)
+
+        claimed = 0
+        while True:
+            reports = self._claim_batch(now)
+            if not reports:
+                break
+            claimed += len(reports)
+            for report in reports:
+                self._enqueue(report)
+            if len(reports) < self.batch_size:
+                break
+
+        if claimed:
+            logger.info(f"Claimed {claimed} due report schedules")
+        return {"claimed": claimed, "requeued": requeued}
+
+    def wait(self):
+        """Block until every dispatched report has finished generating"""
+        while True:
+            with self._lock:
+                pending = [future for future in self._futures if not future.done()]
+                queued = sum(len(queue) for queue in self._queues.values())
+            if not pending and not queued:
+                return
+            if not pending:
+                # Queued reports are about to be dispatched by a completion callback
+                time.sleep(0.1)
+            for future in pending:
+                try:
+                    future.result()
+                except Exception:
+                    # Failures are recorded on the report by the generation service
+                    pass
+
+    def _initialise_next_runs(self, now):
+        """Give active schedules created before the scheduler existed a next run"""
+        for schedule in ReportSchedule.objects.filter(is_active=True, next_run__isnull=True):
+            ReportSchedule.objects.filter(id=schedule.id, next_run__isnull=True).update(
+                next_run=schedule.compute_next_run(now)
+            )
+
+    def _requeue_stranded(self, now) -> int:
+        """Queue again scheduled reports that another scheduler process left in generating"""
+        with self._lock:
+            tracked = set(self._report_ids)
+        stale = now - self.stale_after
+        stranded = (
+            Report.objects.filter(status='generating', parameters__has_key='schedule_id', updated_at__lt=stale)
+            .exclude(id__in=tracked)
+            .select_related('project')
+        )
+
+        requeued = 0
+        for report in stranded:
+            # Touch the report first so a concurrent scheduler doesn't requeue it as well
+            if not Report.objects.filter(id=report.id, status='generating', updated_at__lt=stale).update(
+                progress_stage='Queued', updated_at=now
+            ):
+                continue
+            logger.warning(f"Requeueing scheduled report {report.id}, which made no progress since {report.updated_at}")
+            self._enqueue(report)
+            requeued += 1
+        return requeued
+
+    def _claim_batch(self, now) -> List[Report]:
+        """
+        Lock a batch of due schedules, advance them and create their reports
+
+        Returns:
+            List[Report]: The reports created for the claimed schedules
+        """
+        with transaction.atomic():
+            schedules = list(
+                ReportSchedule.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(is_active=True, next_run__lte=now)
+                .select_related('template', 'project')
+                .order_by('next_run')[:self.batch_size]
+            )
+            if not schedules:
+                return []
+
+            title_max_length = Report._meta.get_field('title').max_length
+            slug_max_length = Report._meta.get_field('slug').max_length
+            reports = []
+            for schedule in schedules:
+                run_time = schedule.next_run
+                # Shorten the name, not the date and ID that keep the slug unique, to fit the fields
+                title_suffix = f" - {run_time:%Y-%m-%d}"
+                slug_suffix = f"-{run_time:%Y%m%d%H%M}-{schedule.id}"
+                reports.append(Report(
+                    title=schedule.name[:title_max_length - len(title_suffix)] + title_suffix,
+                    slug=slugify(slugify(schedule.name)[:slug_max_length - len(slug_suffix)] + slug_suffix),
+                    template=schedule.template,
+                    project=schedule.project,
+                    company_id=schedule.company_id,
+                    parameters=dict(schedule.parameters, schedule_id=schedule.id),
+                    created_by_id=schedule.created_by_id,
+                    status='generating',
+                    progress_stage='Queued',
+                ))
+                schedule.last_run = now
+                schedule.next_run = schedule.compute_next_run(max(now, run_time))
+                schedule.updated_at = now
+
+            ReportSchedule.objects.bulk_update(schedules, ['last_run', 'next_run', 'updated_at'])
+            Report.objects.bulk_create(reports)
+            invalidate_company_snapshots(
+                report.company_id or (report.project.company_id if report.project else None)
+                for report in reports
+            )
+
+        # bulk_create only returns primary keys on some databases
+        slugs = [report.slug for report in reports]
+        return list(Report.objects.filter(slug__in=slugs).select_related('project'))
+
+    def _company_key(self, report: Report):
+        return report.company_id or (report.project.company_id if report.project else None)
+
+    def _enqueue(self, report: Report):
+        with self._lock:
+            self._queues[self._company_key(report)].append(report.id)
+            self._report_ids.add(report.id)
+        self._dispatch(self._company_key(report))
+
+    def _dispatch(self, company_key):
+        """Start queued reports for a company while it is under its limit"""
+        while True:
+            with self._lock:
+                queue = self._queues[company_key]
+                if not queue:
+                    # Don't keep an entry for every company that ever had a report
+                    del self._queues[company_key]
+                    if not self._in_flight[company_key]:
+                        del self._in_flight[company_key]
+                    return
+                if self._in_flight[company_key] >= self.company_concurrency:
+                    return
+                report_id = queue.popleft()
+                self._in_flight[company_key] += 1
+
+            future = run_in_background(generate_report, report_id)
+            with self._lock:
+                if future.done():
+                    # Ran inline (RUN_BACKGROUND_TASKS_INLINE); carry on without recursing
+                    self._in_flight[company_key] -= 1
+                    self._report_ids.discard(report_id)
+                    continue
+                self._futures.add(future)
+            future.add_done_callback(
+                lambda done, key=company_key, queued_id=report_id: self._on_done(key, queued_id, done)
+            )
+
+    def _on_done(self, company_key, report_id, future):
+        with self._lock:
+            self._in_flight[company_key] -= 1
+            self._report_ids.discard(report_id)
+            self._futures.discard(future)
+        self._dispatch(company_key)
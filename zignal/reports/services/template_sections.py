@@ -0,0 +1,56 @@
+"""
+Helpers for splitting report templates into independently generated sections
+"""
+import re
+from typing import Dict, List, Optional
+
+# Markdown headings mark section boundaries
+HEADING_PATTERN = re.compile(r'^\s{0,3}(#{1,6})\s+(.+?)\s*#*\s*$', re.MULTILINE)
+
+# Requirement blocks (see DocumentValidationService) mark boundaries in templates without headings
+REQUIRE_PATTERN = re.compile(r'<!--\s*REQUIRE:\s*{.*?}\s*-->', re.DOTALL)
+
+
+def split_sections(template_content: str) -> List[Dict[str, Optional[str]]]:
+    """
+    Split a template into sections
+
+    Sections start at each heading of the shallowest level used in the template,
+    so nested subheadings stay with their parent. Templates without headings are
+    split at their REQUIRE blocks. Text before the first boundary becomes its own
+    section with no heading.
+
+    Args:
+        template_content: The template content
+
+    Returns:
+        List[Dict[str, Optional[str]]]: Sections in order, each with a heading
+        (or None) and the section's template content
+    """
+    template_content = template_content or ''
+    headings = HEADING_PATTERN.findall(template_content)
+
+    if headings:
+        top_level = min(len(hashes) for hashes, _ in headings)
+        boundaries = [
+            (match.start(), match.group(2))
+            for match in HEADING_PATTERN.finditer(template_content)
+            if len(match.group(1)) == top_level
+        ]
+    else:
+        boundaries = [(match.start(), None) for match in REQUIRE_PATTERN.finditer(template_content)]
+
+    if not boundaries:
+        content = template_content.strip()
+        return [{"heading": None, "content": content}] if content else []
+
+    sections = []
+    preamble = template_content[:boundaries[0][0]].strip()
+    if preamble:
+        sections.append({"heading": None, "content": preamble})
+
+    for index, (start, heading) in enumerate(boundaries):
+        end = boundaries[index + 1][0] if index + 1 < len(boundaries) else len(template_content)
+        sections.append({"heading": heading, "content": template_content[start:end].strip()})
+
+    return sections
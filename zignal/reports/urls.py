@@ -12,6 +12,7 @@ urlpatterns = [
     path('reports/<slug:slug>/delete/', views.report_delete, name='report_delete'),
     path('reports/<slug:slug>/generate/', views.report_generate, name='report_generate'),
     path('reports/<slug:slug>/export-pdf/', views.report_export_pdf, name='report_export_pdf'),
+    path('reports/<slug:slug>/progress/', views.report_progress, name='report_progress'),
     
     # Templates
     path('templates/', views.template_list, name='template_list'),
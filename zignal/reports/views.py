@@ -1,17 +1,23 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse
 from django.contrib import messages
 from django.utils import timezone
 from django.db.models import Q
 from django.urls import reverse
 from django.core.paginator import Paginator
+from django.conf import settings
+from django.core.cache import cache
+from datetime import timedelta
+from storages.backends.s3boto3 import S3Boto3Storage
 
 from .models import ReportTemplate, Report, ReportSchedule
-from .services.report_generation_service import ReportGenerationService
+from .services.pdf_service import pdf_is_current
 from .forms import ReportForm, ReportTemplateForm, ReportScheduleForm
 from permissions import has_project_permission, has_company_permission
 from companies.models import Company
+from core.background import run_in_background
+from core.tasks import generate_report as generate_report_task, render_report_pdf
 
 
 @login_required
@@ -82,6 +88,7 @@ def report_detail(request, slug):
     
     context = {
         'report': report,
+        'pdf_pending': request.GET.get('pdf') == '1' and not pdf_is_current(report),
     }
     
     return render(request, 'reports/report_detail.html', context)
@@ -217,18 +224,52 @@ def report_generate(request, slug):
         messages.error(request, "The report must have a template to generate content.")
         return redirect('reports:report_detail', slug=report.slug)
     
-    # Generate report content
-    service = ReportGenerationService()
-    success = service.generate_report(report)
-    
-    if success:
-        messages.success(request, f"Report '{report.title}' generated successfully.")
+    # Queue generation unless it is already running. A report left in 'generating'
+    # past the timeout (e.g. the process restarted mid-run) may be queued again.
+    stale_before = timezone.now() - timedelta(seconds=getattr(settings, 'REPORT_GENERATION_TIMEOUT', 900))
+    queued = Report.objects.filter(id=report.id).filter(
+        ~Q(status='generating') | Q(updated_at__lt=stale_before)
+    ).update(
+        status='generating',
+        progress=0,
+        progress_stage='Queued',
+        error_message=None,
+        updated_at=timezone.now()
+    )
+    
+    if queued:
+        run_in_background(generate_report_task, report.id)
+        messages.success(request, f"Report '{report.title}' is being generated.")
     else:
-        messages.error(request, f"Failed to generate report '{report.title}'.")
+        messages.info(request, f"Report '{report.title}' is already being generated.")
     
     return redirect('reports:report_detail', slug=report.slug)
 
 
+@login_required
+def report_progress(request, slug):
+    """
+    Return the generation status and progress of a report as JSON
+    """
+    report = get_object_or_404(Report, slug=slug)
+    
+    # Check permissions
+    if report.project and not has_project_permission(request.user, report.project):
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    
+    if report.company and not has_company_permission(request.user, report.company):
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    
+    return JsonResponse({
+        'status': report.status,
+        'status_display': report.get_status_display(),
+        'progress': report.progress,
+        'stage': report.progress_stage,
+        'error': report.error_message,
+        'pdf_ready': pdf_is_current(report),
+    })
+
+
 @login_required
 def report_export_pdf(request, slug):
     """
@@ -250,24 +291,19 @@ def report_export_pdf(request, slug):
         messages.error(request, "The report must be generated before exporting as PDF.")
         return redirect('reports:report_detail', slug=report.slug)
     
-    # If PDF already exists
-    if report.pdf_file:
-        response = HttpResponse(report.pdf_file.read(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{report.slug}.pdf"'
-        return response
-    
-    # Generate PDF
-    service = ReportGenerationService()
-    pdf_path = service._generate_pdf(report)
-    
-    if pdf_path:
-        messages.success(request, f"Report '{report.title}' exported as PDF successfully.")
-        report.pdf_file = pdf_path
-        report.save()
-        return redirect('reports:report_detail', slug=report.slug)
-    else:
-        messages.error(request, f"Failed to export report '{report.title}' as PDF.")
-        return redirect('reports:report_detail', slug=report.slug)
+    # Serve the stored PDF if it matches the current content, without buffering it
+    if pdf_is_current(report):
+        if isinstance(report.pdf_file.storage, S3Boto3Storage):
+            # Private bucket, so this is a short-lived presigned URL
+            return redirect(report.pdf_file.url)
+        return FileResponse(report.pdf_file.open('rb'), as_attachment=True, filename=f"{report.slug}.pdf",
+                            content_type='application/pdf')
+    
+    # Otherwise render it in the background; the detail page polls until it is ready
+    if cache.add(f"report_pdf_rendering:{report.id}", True, 300):
+        run_in_background(render_report_pdf, report.id)
+    messages.info(request, f"The PDF for '{report.title}' is being prepared and will download when ready.")
+    return redirect(f"{reverse('reports:report_detail', kwargs={'slug': report.slug})}?pdf=1")
 
 
 # Template views